@@ -0,0 +1,88 @@
+"""Worker scaling benchmark for estimate-area
+
+    $ python benchmarks/estimate_area.py --precision 1cm --workers 4
+
+Burns a few large polygons, the input --workers is meant for, once in
+this process and once in a process pool, and reports both wall times
+along with how the rows of tiles were split into bands for the workers.
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from mapbox_tilesets import area, tiles
+from mapbox_tilesets.utils import _convert_precision_to_zoom
+
+
+def make_features(count, vertices, radius):
+    """Returns count overlapping circular polygons of vertices points"""
+    features = []
+    for i in range(count):
+        cx, cy = i * radius / 4, 45.0
+        ring = [
+            [
+                cx + radius * math.cos(2 * math.pi * j / vertices),
+                cy + radius * math.sin(2 * math.pi * j / vertices) / 2,
+            ]
+            for j in range(vertices)
+        ]
+        ring.append(ring[0])
+        features.append(
+            {
+                "type": "Feature",
+                "geometry": {"type": "Polygon", "coordinates": [ring]},
+                "properties": {},
+            }
+        )
+    return features
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--features", type=int, default=4)
+    parser.add_argument("--vertices", type=int, default=20000)
+    parser.add_argument("--radius", type=float, default=10.0)
+    parser.add_argument("--precision", default="1cm")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    features = make_features(args.features, args.vertices, args.radius)
+    zoom = _convert_precision_to_zoom(args.precision)
+    ranges = [
+        tiles.tile_range(tiles.feature_bounds(feature), zoom) for feature in features
+    ]
+    first = np.array([ymin for xmin, ymin, xmax, ymax in ranges])
+    last = np.array([ymax for xmin, ymin, xmax, ymax in ranges])
+    starts = area._row_bands(first, last, args.workers * area.SHARD_BANDS)
+    widths = np.diff(np.append(starts, last.max() + 1))
+    print(
+        f"{len(starts)} bands of {widths.min()} to {widths.max()} rows "
+        f"over {last.max() - first.min() + 1} rows"
+    )
+
+    serial, serial_time = timed(
+        lambda: area.calculate_tiles_area(features, args.precision)
+    )
+    print(f"{'1 worker':<12} {serial_time:>8.2f} s  {serial:,.0f} km2")
+    sharded, sharded_time = timed(
+        lambda: area.calculate_tiles_area(
+            features, args.precision, workers=args.workers
+        )
+    )
+    print(
+        f"{f'{args.workers} workers':<12} {sharded_time:>8.2f} s  {sharded:,.0f} km2"
+        f"  ({serial_time / sharded_time:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
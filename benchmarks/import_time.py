@@ -0,0 +1,90 @@
+"""Start-up time benchmark for the tilesets command
+
+    $ python benchmarks/import_time.py --runs 20 --max-ms 150
+
+Runs each command in a fresh interpreter and reports the median wall
+time, along with any heavy dependency the command loaded that it does
+not need. Exits with 1 if a median exceeds --max-ms or if a heavy
+dependency was loaded, so it can guard against import-time regressions.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+# Modules only the commands that use them should load
+HEAVY_MODULES = [
+    "numpy",
+    "jsonschema",
+    "geojson",
+    "requests",
+    "requests_toolbelt",
+    "multiprocessing",
+    "mapbox_tilesets.area",
+    "cligj",
+]
+
+COMMANDS = {
+    "tilesets --version": ["--version"],
+    "tilesets status --help": ["status", "--help"],
+    "tilesets estimate-area --help": ["estimate-area", "--help"],
+}
+
+SCRIPT = """
+import sys
+from mapbox_tilesets.scripts.cli import cli
+try:
+    cli.main({args!r}, standalone_mode=False)
+finally:
+    loaded = [name for name in {heavy!r} if name in sys.modules]
+    print(",".join(loaded), file=sys.stderr)
+"""
+
+
+def run(args):
+    """Returns the wall time and heavy modules loaded by one command"""
+    script = SCRIPT.format(args=args, heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    elapsed = time.perf_counter() - start
+    loaded = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else ""
+    return elapsed, [name for name in loaded.split(",") if name]
+
+
+def _python_startup():
+    """Returns the wall time of an interpreter that imports nothing"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    baseline = statistics.median(_python_startup() for _ in range(args.runs))
+    print(f"{'python -c pass':<40} {baseline * 1000:>8.1f} ms")
+
+    failed = False
+    for label, command in COMMANDS.items():
+        times = []
+        for _ in range(args.runs):
+            elapsed, loaded = run(command)
+            times.append(elapsed)
+        median = statistics.median(times) * 1000
+        note = ", loaded " + ", ".join(loaded) if loaded else ""
+        print(f"{label:<40} {median:>8.1f} ms{note}")
+        if loaded or (args.max_ms is not None and median > args.max_ms):
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
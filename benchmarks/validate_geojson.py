@@ -0,0 +1,69 @@
+"""Feature-rate benchmark for GeoJSON source validation
+
+    $ python benchmarks/validate_geojson.py --features 50000
+
+Reports how many features per second pass through the schema check alone
+and through the full validate_geojson used by validate-source and
+upload-source.
+"""
+
+import argparse
+import time
+
+from jsonschema import validate
+
+from mapbox_tilesets import utils
+
+
+def make_features(count, vertices):
+    """Returns count polygon features with closed rings of vertices points"""
+    features = []
+    for i in range(count):
+        x = (i % 360) - 180.0
+        ring = [[x + j / vertices, (j % 2) / 10.0] for j in range(vertices)]
+        ring.append(ring[0])
+        features.append(
+            {
+                "type": "Feature",
+                "geometry": {"type": "Polygon", "coordinates": [ring]},
+                "properties": {"id": i, "name": f"feature {i}"},
+            }
+        )
+    return features
+
+
+def rate(label, func, features):
+    start = time.perf_counter()
+    for index, feature in enumerate(features):
+        func(index, feature)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {len(features) / elapsed:>12,.0f} features/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--features", type=int, default=20000)
+    parser.add_argument("--vertices", type=int, default=16)
+    args = parser.parse_args()
+
+    features = make_features(args.features, args.vertices)
+
+    rate(
+        "schema: jsonschema.validate per feature",
+        lambda i, f: validate(instance=f, schema=utils.GEOJSON_SCHEMA),
+        features,
+    )
+    validator = utils._get_validator("feature")
+    rate(
+        "schema: compiled Draft7Validator", lambda i, f: validator.validate(f), features
+    )
+    rate(
+        "validate_geojson --strict-validation",
+        lambda i, f: utils.validate_geojson(i, f, strict=True),
+        features,
+    )
+    rate("validate_geojson", utils.validate_geojson, features)
+
+
+if __name__ == "__main__":
+    main()
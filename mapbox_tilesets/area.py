@@ -0,0 +1,425 @@
+"""Estimated tiled area of GeoJSON features
+
+The estimates here rasterize features with NumPy, which is only imported
+when an area is calculated.
+"""
+
+import array
+import functools
+import itertools
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from mapbox_tilesets import tiles, trace
+from mapbox_tilesets.utils import _convert_precision_to_zoom
+
+
+def _tile2lng(tile_x, zoom):
+    """Returns tile longitude
+
+    Parameters
+    ----------
+    tile_x: int
+        x coordinate
+    zoom: int
+        zoom level
+
+    Returns
+    -------
+        longitude
+    """
+    return ((tile_x / 2**zoom) * 360.0) - 180.0
+
+
+def _tile2lat(tile_y, zoom):
+    """Returns tile latitude
+
+    Parameters
+    ----------
+    tile_y: int
+        y coordinate
+    zoom: int
+        zoom level
+
+    Returns
+    -------
+        latitude
+    """
+    n = np.pi - 2 * np.pi * tile_y / 2**zoom
+    return (180.0 / np.pi) * np.arctan(0.5 * (np.exp(n) - np.exp(-n)))
+
+
+def _calculate_tile_area(tile):
+    """Returns tile area in square kilometers
+
+    Parameters
+    ----------
+    tile: list
+        tile in format [x,y,z]
+
+    Returns
+    -------
+        area of tile
+
+    """
+    EARTH_RADIUS = 6371.0088
+    left = np.deg2rad(_tile2lng(tile[:, 0], tile[:, 2]))
+    top = np.deg2rad(_tile2lat(tile[:, 1], tile[:, 2]))
+    right = np.deg2rad(_tile2lng(tile[:, 0] + 1, tile[:, 2]))
+    bottom = np.deg2rad(_tile2lat(tile[:, 1] + 1, tile[:, 2]))
+    return (
+        (np.pi / np.deg2rad(180))
+        * EARTH_RADIUS**2
+        * np.abs(np.sin(top) - np.sin(bottom))
+        * np.abs(left - right)
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _row_areas(zoom):
+    """Returns the area of a tile in each row at a zoom level
+
+    Every tile in a row of the Web Mercator grid has the same area, so the
+    area of any set of tiles follows from how many of them each row holds.
+
+    Parameters
+    ----------
+    zoom: int
+        zoom level
+
+    Returns
+    -------
+        read-only array of 2**zoom tile areas in square kilometers
+    """
+    rows = np.arange(2**zoom)
+    areas = _calculate_tile_area(
+        np.stack([np.zeros_like(rows), rows, np.full_like(rows, zoom)], axis=1)
+    )
+    areas.flags.writeable = False
+    return areas
+
+
+def _calculate_rows_area(rows, counts, zoom):
+    """Returns the area of counts tiles in each of rows in square kilometers"""
+    return float(np.dot(counts, _row_areas(zoom)[rows]))
+
+
+# Number of features rasterized at a time by calculate_tiles_area
+BURN_BATCH_SIZE = 1000
+
+# Number of bands of tile rows the input is split into per worker, and the
+# number of feature lines buffered before they are written to bands
+SHARD_BANDS = 4
+SHARD_BUFFER_SIZE = 10000
+
+# Number of tile rows of the whole grid approximate_tiles_area samples on
+# average, and the z score of its confidence interval
+APPROXIMATE_ROWS = 1024
+APPROXIMATE_Z = 1.96
+
+
+def _iter_batches(iterable, size):
+    """Yield lists of up to size items from an iterable"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            break
+        yield batch
+
+
+class _TileSet:
+    """Deduplicated set of tiles at one zoom level
+
+    Tiles are stored as disjoint spans of consecutive tiles in a row, three
+    int32 arrays of rows, first and last columns, so a polygon costs 12
+    bytes per row it covers rather than 8 bytes per tile. New spans are
+    kept aside and merged once they outnumber the merged ones, so adding
+    spans in batches costs O(n log n) overall and memory scales with the
+    covered area's outline rather than with the input.
+    """
+
+    def __init__(self, zoom):
+        self.zoom = zoom
+        empty = np.empty(0, dtype=np.int32)
+        self._spans = (empty, empty, empty)
+        self._pending = []
+        self._pending_size = 0
+
+    def add(self, rows, first, last):
+        """Add the spans of tiles from first to last column in rows"""
+        if not len(rows):
+            return
+        self._pending.append(
+            tuple(a.astype(np.int32, copy=False) for a in (rows, first, last))
+        )
+        self._pending_size += len(rows)
+        if self._pending_size > len(self._spans[0]):
+            self._merge()
+
+    def _merge(self):
+        if self._pending:
+            self._spans = tiles.union_spans(
+                *(np.concatenate(parts) for parts in zip(self._spans, *self._pending))
+            )
+            self._pending = []
+            self._pending_size = 0
+
+    def spans(self):
+        """Returns disjoint (rows, first, last) spans sorted by row and column"""
+        self._merge()
+        return self._spans
+
+    def __len__(self):
+        rows, first, last = self.spans()
+        return int(np.sum(last - first + 1, dtype=np.int64))
+
+    def area(self):
+        """Returns the area of the tiles in square kilometers"""
+        rows, first, last = self.spans()
+        return _calculate_rows_area(rows, last - first + 1, self.zoom)
+
+
+def _covered_tiles(features, zoom, batch_size=BURN_BATCH_SIZE, row_range=None):
+    """Returns the _TileSet of the distinct tiles covered by features
+
+    Parameters
+    ----------
+    row_range: tuple
+        inclusive (first, last) range of rows to count tiles in, all rows
+        are counted by default
+    """
+    covered = _TileSet(zoom)
+    for batch in _iter_batches(features, batch_size):
+        with trace.span("rasterize", features=len(batch)):
+            spans = tiles.burn_spans(batch, zoom, row_range)
+        with trace.span("merge tiles"):
+            covered.add(*spans)
+    return covered
+
+
+def _covered_area(features, zoom, batch_size=BURN_BATCH_SIZE):
+    """Returns the area of the distinct tiles covered by features"""
+    covered = _covered_tiles(features, zoom, batch_size)
+    with trace.span("sum area"):
+        return covered.area()
+
+
+def _iter_feature_lines(path):
+    with open(path, encoding="utf-8") as src:
+        for line in src:
+            yield json.loads(line)
+
+
+def _calculate_band_spans(path, zoom, row_range, batch_size):
+    """Returns the spans of tiles covered by the features in a band"""
+    return _covered_tiles(
+        _iter_feature_lines(path), zoom, batch_size, row_range
+    ).spans()
+
+
+def _row_bands(first, last, count):
+    """Split rows into bands that the features reach into about equally
+
+    Parameters
+    ----------
+    first, last: numpy.ndarray
+        first and last row each feature reaches into
+    count: int
+        number of bands
+
+    Returns
+    -------
+    numpy.ndarray
+        first row of every band, in order; a band ends where the next one
+        starts and the last one at the last row of any feature
+    """
+    low = int(first.min())
+    # the number of features reaching into each row stands for its work
+    load = np.zeros(int(last.max()) - low + 2, dtype=np.int64)
+    np.add.at(load, first - low, 1)
+    np.add.at(load, last - low + 1, -1)
+    total = np.cumsum(np.cumsum(load[:-1]))
+    targets = total[-1] * np.arange(1, count) / count
+    starts = np.searchsorted(total, targets, side="right") + low
+    return np.unique(np.concatenate([[low], starts[starts <= last.max()]]))
+
+
+def _calculate_tiles_area_sharded(features, zoom, workers, batch_size):
+    """Calculates the area of tiles in a process pool
+
+    Features are written to a temporary file along with the first and last
+    row of tiles they reach into. The rows are then split into
+    SHARD_BANDS bands per worker that about the same number of features
+    reach into, row by row, and every feature is copied to each band it
+    reaches into. Each band is burned in a separate process that clips the
+    features to the band's rows before rasterizing them, so the work for a
+    large polygon is split between the bands it spans rather than repeated
+    in each. The bands do not overlap, and their tiles are merged into one
+    set.
+    """
+    firsts = array.array("q")
+    lasts = array.array("q")
+    with tempfile.TemporaryDirectory() as tmp:
+        features_path = os.path.join(tmp, "features")
+        with open(features_path, "w", encoding="utf-8") as dst:
+            for feature in trace.iterate("shard features", features):
+                bounds = tiles.feature_bounds(feature)
+                if bounds is None:
+                    continue
+                xmin, ymin, xmax, ymax = tiles.tile_range(bounds, zoom)
+                firsts.append(ymin)
+                lasts.append(ymax)
+                dst.write(json.dumps(feature, separators=(",", ":")) + "\n")
+        if not firsts:
+            return 0.0
+
+        first = np.frombuffer(firsts, dtype=np.int64)
+        last = np.frombuffer(lasts, dtype=np.int64)
+        starts = _row_bands(first, last, workers * SHARD_BANDS)
+        ends = np.append(starts[1:] - 1, last.max())
+        first_band = np.searchsorted(starts, first, side="right") - 1
+        last_band = np.searchsorted(starts, last, side="right") - 1
+
+        paths = [os.path.join(tmp, f"band-{band}") for band in range(len(starts))]
+        pending = {}
+        pending_count = 0
+
+        def flush():
+            for band, lines in pending.items():
+                with open(paths[band], "a", encoding="utf-8") as dst:
+                    dst.writelines(lines)
+            pending.clear()
+
+        with open(features_path, encoding="utf-8") as src:
+            for line, low, high in zip(src, first_band, last_band):
+                for band in range(low, high + 1):
+                    pending.setdefault(band, []).append(line)
+                pending_count += high - low + 1
+                if pending_count >= SHARD_BUFFER_SIZE:
+                    flush()
+                    pending_count = 0
+        flush()
+
+        # the largest bands go first so they do not finish last
+        bands = sorted(
+            (band for band in range(len(paths)) if os.path.exists(paths[band])),
+            key=lambda band: -os.path.getsize(paths[band]),
+        )
+        covered = _TileSet(zoom)
+        with (
+            trace.span("rasterize shards", shards=len(bands)),
+            ProcessPoolExecutor(max_workers=workers) as executor,
+        ):
+            results = executor.map(
+                _calculate_band_spans,
+                [paths[band] for band in bands],
+                itertools.repeat(zoom),
+                [(int(starts[band]), int(ends[band])) for band in bands],
+                itertools.repeat(batch_size),
+            )
+            for spans in results:
+                covered.add(*spans)
+        with trace.span("sum area"):
+            return covered.area()
+
+
+def calculate_tiles_area(features, precision, batch_size=BURN_BATCH_SIZE, workers=1):
+    """Calculates the area of tiles
+
+    Features are consumed incrementally and rasterized batch_size at a
+    time with tiles.burn, so only the distinct covered tiles are held in
+    memory. The area is summed per tile row from a table of row areas.
+
+    Parameters
+    ----------
+    features: iterable
+        features from GeoJSON sources and coordinates
+    precision: string
+        precision level
+    batch_size: int
+        number of features rasterized at a time
+    workers: int
+        number of processes to burn shards of the features in
+
+    Returns
+    -------
+        total area of all tiles in square kilometers
+    """
+    zoom = _convert_precision_to_zoom(precision)
+    if workers > 1:
+        return _calculate_tiles_area_sharded(features, zoom, workers, batch_size)
+    return _covered_area(features, zoom, batch_size)
+
+
+def approximate_tiles_area(
+    features, precision, rows=APPROXIMATE_ROWS, seed=None, batch_size=BURN_BATCH_SIZE
+):
+    """Estimates the area of tiles from a random sample of tile rows
+
+    Every row of the tile grid is sampled at random with a probability of
+    rows / 2**zoom, and the features are burned batch_size at a time in
+    the sampled rows only, like calculate_tiles_area does in all of them.
+    The covered tiles of all features are merged before they are counted,
+    so overlapping features are counted once, and the covered area of
+    every sampled row, divided by the probability, is an unbiased estimate
+    of the covered area of all rows. The confidence interval follows from
+    the variance of that sum. Precisions with no more than rows rows are
+    burned whole, and their estimate is exact.
+
+    The union of the bounding tile ranges of every point, line and polygon
+    gives an upper bound on the covered area. The estimate and interval
+    never exceed it, and the interval never goes below the area found in
+    the sampled rows. The bound keeps a span for every row a bounding range
+    reaches into, so it costs more for features spanning many rows at fine
+    precisions, but much less than burning them.
+
+    Parameters
+    ----------
+    features: iterable
+        features from GeoJSON sources and coordinates
+    precision: string
+        precision level
+    rows: int
+        average number of rows sampled
+    seed: int
+        seed of the random row sampling
+    batch_size: int
+        number of features burned at a time
+
+    Returns
+    -------
+    dict
+        upper_bound, estimate, and low and high ends of the confidence
+        interval of the estimate, in square kilometers
+    """
+    zoom = _convert_precision_to_zoom(precision)
+    rate = min(1.0, rows / 2**zoom)
+    sampled = np.random.default_rng(seed).random(2**zoom) < rate
+    bounds = _TileSet(zoom)
+    covered = _TileSet(zoom)
+    for batch in _iter_batches(features, batch_size):
+        with trace.span("rasterize", features=len(batch)):
+            covered_spans, bound_spans = tiles.sample_spans(batch, zoom, sampled)
+        with trace.span("merge tiles"):
+            covered.add(*covered_spans)
+            bounds.add(*bound_spans)
+
+    with trace.span("sum area"):
+        upper_bound = bounds.area()
+        rows, first, last = covered.spans()
+        row_area = np.bincount(rows, _row_areas(zoom)[rows] * (last - first + 1))
+        found = float(row_area.sum())
+        estimate = min(found / rate, upper_bound)
+        variance = (1 - rate) / rate**2 * float(np.dot(row_area, row_area))
+    margin = APPROXIMATE_Z * variance**0.5
+    return {
+        "upper_bound": upper_bound,
+        "estimate": estimate,
+        "low": max(estimate - margin, found),
+        "high": min(estimate + margin, upper_bound),
+    }
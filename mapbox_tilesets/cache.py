@@ -0,0 +1,171 @@
+"""On-disk cache of API responses revalidated with conditional requests"""
+
+import hashlib
+import json
+import os
+import time
+
+from mapbox_tilesets.utils import _strip_token
+
+# Seconds a cached response is used without asking the API, and the total
+# size in bytes the cached responses are evicted down to
+TTL = 0
+MAX_SIZE = 100 * 1024 * 1024
+
+# Response headers that describe the transfer rather than the resource,
+# and are not stored with the decoded body
+_UNSTORED_HEADERS = {
+    "connection",
+    "content-encoding",
+    "content-length",
+    "keep-alive",
+    "set-cookie",
+    "transfer-encoding",
+}
+
+
+class CachedSession:
+    """A session whose GET requests go through a response cache
+
+    Responses with an ETag or Last-Modified header are stored with their
+    headers, such as the Link header of a paginated listing, in one JSON
+    file each. Files are named by a hash of the URL, and access tokens are
+    removed from stored headers. Bodies are stored as they are, and may
+    hold tokens in URLs such as TileJSON tile URLs, so the directory and
+    files are only readable by their owner. A stored response younger
+    than ttl seconds is used as is. An older one is revalidated with
+    If-None-Match and If-Modified-Since, and used again if the API answers
+    304 Not Modified. After every write the least recently used responses
+    are removed until the cache is no larger than max_size bytes.
+
+    Every other method and attribute is the wrapped session's.
+    """
+
+    def __init__(self, s, path, ttl=TTL, max_size=MAX_SIZE):
+        self.session = s
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+
+    @classmethod
+    def open(cls, s, cache_dir, ttl=TTL, max_size=MAX_SIZE):
+        return cls(s, os.path.join(cache_dir, "responses"), ttl, max_size)
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    def get(self, url, **kwargs):
+        """Send a GET request, answering it from the cache when possible"""
+        if kwargs:
+            return self.session.get(url, **kwargs)
+
+        path = os.path.join(self.path, hashlib.sha256(url.encode()).hexdigest())
+        entry = self._load(path)
+        if entry is not None and time.time() - entry["stored"] < self.ttl:
+            return self._touch(path, entry, url)
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        r = self.session.get(url, headers=headers) if headers else self.session.get(url)
+
+        if r.status_code == 304 and entry is not None:
+            entry["stored"] = time.time()
+            entry["etag"] = r.headers.get("ETag") or entry.get("etag")
+            entry["last_modified"] = r.headers.get("Last-Modified") or entry.get(
+                "last_modified"
+            )
+            for name, key in (("ETag", "etag"), ("Last-Modified", "last_modified")):
+                if entry[key]:
+                    entry["headers"][name] = entry[key]
+            self._save(path, entry)
+            return _response(url, entry)
+
+        if r.status_code == 200 and self._storable(r):
+            self._save(
+                path,
+                {
+                    "stored": time.time(),
+                    "etag": r.headers.get("ETag"),
+                    "last_modified": r.headers.get("Last-Modified"),
+                    "headers": {
+                        name: _strip_token(value)
+                        for name, value in r.headers.items()
+                        if name.lower() not in _UNSTORED_HEADERS
+                    },
+                    "body": r.text,
+                },
+            )
+            self.evict()
+        elif entry is not None and r.status_code in (401, 403, 404, 410):
+            self._remove(path)
+        return r
+
+    def evict(self):
+        """Remove the least recently used responses over max_size bytes"""
+        entries = []
+        for name in os.listdir(self.path):
+            if name.endswith(".tmp"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.path, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        size = sum(entry_size for mtime, entry_size, name in entries)
+        for mtime, entry_size, name in sorted(entries):
+            if size <= self.max_size:
+                break
+            self._remove(os.path.join(self.path, name))
+            size -= entry_size
+
+    def _storable(self, r):
+        cache_control = r.headers.get("Cache-Control", "").lower()
+        if "no-store" in cache_control:
+            return False
+        return bool(r.headers.get("ETag") or r.headers.get("Last-Modified") or self.ttl)
+
+    def _load(self, path):
+        try:
+            with open(path) as src:
+                return json.load(src)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save(self, path, entry):
+        os.makedirs(self.path, mode=0o700, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, "w") as dst:
+            json.dump(entry, dst)
+        os.replace(tmp, path)
+
+    def _touch(self, path, entry, url):
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return _response(url, entry)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _response(url, entry):
+    """Build a requests Response from a cache entry"""
+    from requests import Response
+    from requests.structures import CaseInsensitiveDict
+
+    r = Response()
+    r.url = url
+    r.status_code = 200
+    r.encoding = "utf-8"
+    r._content = entry["body"].encode("utf-8")
+    r.headers = CaseInsensitiveDict(entry["headers"])
+    return r
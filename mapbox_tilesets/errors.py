@@ -33,3 +33,15 @@ class TilesetNameError(TilesetsError):
         return "{tileset_id} -> {message}".format(
             tileset_id=self.tileset_id, message=self.message
         )
+
+
+class JobFailedError(TilesetsError):
+    """A tileset job finished without succeeding"""
+
+    exit_code = 1
+
+
+class JobTimeoutError(TilesetsError):
+    """A tileset job did not finish in the time allowed"""
+
+    exit_code = 3
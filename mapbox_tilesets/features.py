@@ -0,0 +1,273 @@
+"""Incremental GeoJSON feature parsing
+
+cligj's feature reader loads a FeatureCollection into memory in one piece
+before yielding its first feature. The reader in this module decodes the
+input in fixed-size chunks instead, so features in a FeatureCollection's
+"features" array are yielded as soon as they have been read.
+
+Memory use does not grow with the input, but it is not bounded by the
+largest feature alone: a top-level object is first decoded whole, so up
+to MAX_OBJECT_SIZE characters of text and the Python objects decoded from
+them are held at once. A larger object is decoded one feature at a time,
+with the buffer holding up to MAX_OBJECT_SIZE characters plus the largest
+single feature.
+"""
+
+import json
+import os
+
+import click
+
+# cligj is imported where it is used so that commands which do not read
+# features start without loading it.
+
+# Number of characters read from the input at a time
+CHUNK_SIZE = 1024 * 1024
+
+# Top-level objects larger than this are decoded member by member instead
+# of as a whole, so a huge FeatureCollection is never held in memory.
+MAX_OBJECT_SIZE = 16 * 1024 * 1024
+
+_WHITESPACE = " \t\n\r\x1e"
+
+
+def _identity(obj):
+    return obj
+
+
+class _Overflow(Exception):
+    """A value did not fit in the allowed buffer size"""
+
+
+class _StreamDecoder:
+    """Decodes JSON values from a text stream using a bounded buffer"""
+
+    def __init__(self, src, chunk_size=CHUNK_SIZE):
+        self.src = src
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, size=None):
+        """Read more text into the buffer, returns False at end of input"""
+        if self.eof:
+            return False
+        if self.pos:
+            self.buf = self.buf[self.pos :]
+            self.pos = 0
+        text = self.src.read(max(size or 0, self.chunk_size))
+        if not text:
+            self.eof = True
+            return False
+        self.buf += text
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character, or None at end of input"""
+        while True:
+            buf = self.buf
+            pos = self.pos
+            length = len(buf)
+            while pos < length and buf[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < length:
+                return buf[pos]
+            if not self._fill():
+                return None
+
+    def expect(self, chars):
+        """Consume the next non-whitespace character if it is one of chars"""
+        char = self.peek()
+        if char is None or char not in chars:
+            raise json.JSONDecodeError(
+                "Expecting {}".format(" or ".join(repr(c) for c in chars)),
+                self.buf,
+                self.pos,
+            )
+        self.pos += 1
+        return char
+
+    def decode(self, limit=None):
+        """Decode the next complete JSON value from the stream
+
+        Reads more input until the value is complete. If limit is given and
+        the value is still incomplete once the buffer holds that many
+        characters, _Overflow is raised and nothing is consumed.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+                # a number at the very end of the buffer may be truncated
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            pending = len(self.buf) - self.pos
+            if limit is not None and pending >= limit:
+                raise _Overflow()
+            # grow geometrically so a large value is not rescanned per chunk
+            self._fill(pending)
+
+
+def _iter_object(decoder, max_object_size, func):
+    """Yield features from the top-level object at the decoder's position
+
+    Objects that are not FeatureCollections are passed through func and
+    returned so the caller can tell what kind of sequence it is reading.
+    """
+    try:
+        obj = decoder.decode(limit=max_object_size)
+    except _Overflow:
+        obj = yield from _iter_large_object(decoder)
+        if obj is None:
+            return None
+
+    if not isinstance(obj, dict):
+        raise ValueError("Object is not a feature or geometry")
+    if obj.get("type") == "FeatureCollection":
+        yield from obj["features"]
+        return None
+    yield func(obj)
+    return obj
+
+
+def _iter_large_object(decoder):
+    """Decode an object member by member, streaming its "features" array
+
+    Returns the members other than "features" as a dict when the object
+    turns out not to be a FeatureCollection, otherwise returns None.
+    """
+    decoder.expect("{")
+    members = {}
+    streamed = False
+    if decoder.peek() == "}":
+        decoder.pos += 1
+        return members
+
+    while True:
+        key = decoder.decode()
+        if not isinstance(key, str):
+            raise json.JSONDecodeError(
+                "Expecting property name enclosed in double quotes",
+                decoder.buf,
+                decoder.pos,
+            )
+        decoder.expect(":")
+        if key == "features" and decoder.peek() == "[":
+            decoder.pos += 1
+            streamed = True
+            if decoder.peek() == "]":
+                decoder.pos += 1
+            else:
+                while True:
+                    yield decoder.decode()
+                    if decoder.expect(",]") == "]":
+                        break
+        else:
+            members[key] = decoder.decode()
+        if decoder.expect(",}") == "}":
+            break
+
+    if streamed:
+        return None
+    return members
+
+
+def iter_features(src, chunk_size=CHUNK_SIZE, max_object_size=MAX_OBJECT_SIZE):
+    """Extract GeoJSON features from a text file object.
+
+    Accepts the same inputs as cligj's iter_features: a single GeoJSON
+    feature collection, feature or geometry text (compact or
+    pretty-printed), or a sequence of them delimited by newlines or RS
+    (0x1E) characters.
+
+    Parameters
+    ----------
+    src: a file-like object
+        Text stream with a read(size) method
+    chunk_size: int
+        number of characters to read at a time
+    max_object_size: int
+        size above which a top-level object is decoded incrementally
+
+    Yields
+    ------
+    Mapping
+        A GeoJSON Feature represented by a Python mapping
+    """
+    from cligj.features import to_feature
+
+    decoder = _StreamDecoder(src, chunk_size)
+    func = to_feature
+    first = True
+    while decoder.peek() is not None:
+        obj = yield from _iter_object(decoder, max_object_size, func)
+        # Like cligj, a sequence that starts with a feature yields the
+        # following objects verbatim (changesets mix in delete records)
+        # while a sequence of geometries is wrapped in features.
+        if first and obj is not None and obj.get("type") == "Feature":
+            func = _identity
+        first = False
+
+
+class FeatureInputs:
+    """Iterable over the features of a command's feature inputs
+
+    Iterating yields features exactly like cligj's normalize_feature_inputs,
+    while keeping the original input values around so commands can work
+    with local files directly.
+    """
+
+    def __init__(self, values):
+        self.values = tuple(values) or ("-",)
+
+    @property
+    def files(self):
+        """Paths of the inputs if they are all regular files, otherwise None"""
+        if all(os.path.isfile(value) for value in self.values):
+            return list(self.values)
+        return None
+
+    def __iter__(self):
+        for feature_like in self.values:
+            try:
+                with click.open_file(feature_like, encoding="utf-8") as src:
+                    yield from iter_features(src)
+            except IOError:
+                from cligj.features import coords_from_query
+
+                coords = list(coords_from_query(feature_like))
+                yield {
+                    "type": "Feature",
+                    "properties": {},
+                    "geometry": {"type": "Point", "coordinates": coords},
+                }
+
+
+def normalize_feature_inputs(ctx, param, value):
+    """Click callback that normalizes feature input values.
+
+    Drop-in replacement for cligj's normalize_feature_inputs that streams
+    features from files or stdin with iter_features.
+
+    Returns
+    -------
+    FeatureInputs
+        An iterable of GeoJSON Features represented by Python mappings
+    """
+    return FeatureInputs(value)
+
+
+# Features from files, command line args, or stdin.
+features_in_arg = click.argument(
+    "features",
+    nargs=-1,
+    callback=normalize_feature_inputs,
+    metavar="FEATURES...",
+)
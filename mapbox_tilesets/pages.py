@@ -0,0 +1,84 @@
+"""Helpers for walking paginated API listings"""
+
+from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
+
+from mapbox_tilesets import errors
+from mapbox_tilesets.upload import pipelined
+
+# Pages requested ahead of the one being consumed
+PREFETCH = 1
+
+
+def next_url(response, token=None):
+    """Return the rel="next" URL of a response's Link header, or None
+
+    Parameters
+    ----------
+    response: requests.Response
+        a page of a listing
+    token: str
+        access token added to the URL if the API left it out
+
+    Returns
+    -------
+    str or None
+    """
+    from requests.utils import parse_header_links
+
+    link = response.headers.get("Link")
+    if not link:
+        return None
+    for header in parse_header_links(link):
+        if header.get("rel") == "next":
+            url = header["url"]
+            break
+    else:
+        return None
+
+    if token:
+        parts = urlparse(url)
+        query = parse_qs(parts.query)
+        if "access_token" not in query:
+            query["access_token"] = [token]
+            url = urlunparse(parts._replace(query=urlencode(query, doseq=True)))
+    return url
+
+
+def iter_responses(s, url, token=None):
+    """Request a listing and every following page, one at a time
+
+    Raises TilesetsError with the response text if a page fails.
+    """
+    while url:
+        r = s.get(url)
+        if r.status_code != 200:
+            raise errors.TilesetsError(r.text)
+        yield r
+        url = next_url(r, token)
+
+
+def iter_pages(s, url, token=None, prefetch=PREFETCH):
+    """Yield the decoded JSON body of each page of a listing
+
+    Parameters
+    ----------
+    s: requests.Session
+        session used for every page request
+    url: str
+        URL of the first page
+    token: str
+        access token carried over to the following pages
+    prefetch: int
+        number of pages requested ahead of the consumer in a
+        background thread, 0 to request each page only when needed
+
+    Yields
+    ------
+    list
+        one page of results. Only the pages in flight are held in
+        memory, however long the listing is.
+    """
+    pages = (r.json() for r in iter_responses(s, url, token))
+    if prefetch:
+        pages = pipelined(pages, maxsize=prefetch)
+    yield from pages
@@ -2,28 +2,70 @@
 
 import base64
 import builtins
+import contextlib
+import io
 import json
 import re
+import shlex
+import sys
 import tempfile
+import threading
 from urllib.parse import parse_qs, urlencode, urlparse
 
 import click
-import cligj
-from requests_toolbelt import MultipartEncoder, MultipartEncoderMonitor
 
 import mapbox_tilesets
-from mapbox_tilesets import errors, utils
+from mapbox_tilesets import errors, pages, trace, upload, utils
+from mapbox_tilesets.features import features_in_arg
+
+
+cache_option = click.option(
+    "--cache",
+    is_flag=True,
+    default=False,
+    envvar="TILESETS_CACHE",
+    help="Cache responses locally and revalidate them with conditional requests",
+)
 
 
 @click.version_option(version=mapbox_tilesets.__version__, message="%(version)s")
 @click.group()
-def cli():
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    envvar="TILESETS_TRACE",
+    help="Report the time spent in each stage and HTTP request on stderr at exit",
+)
+@click.option(
+    "--trace-file",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    envvar="TILESETS_TRACE_FILE",
+    help="Write the timed stages and HTTP requests to a Chrome trace JSON file",
+)
+@click.pass_context
+def cli(ctx, profile=False, trace_file=None):
     """This is the command line interface for the Mapbox Tilesets API.
     Thanks for joining us.
 
     This CLI requires a Mapbox access token. You can either set it in your environment as
     "MAPBOX_ACCESS_TOKEN" or "MapboxAccessToken" or pass it to each command with the --token flag.
     """
+    if not (profile or trace_file):
+        return
+    tracer = trace.enable()
+    if tracer is None:
+        return
+
+    def report():
+        trace.disable()
+        click.echo("\n" + tracer.summary(), err=True)
+        if trace_file:
+            tracer.write(trace_file)
+
+    ctx.call_on_close(report)
+    ctx.with_resource(trace.span("tilesets " + (ctx.invoked_subcommand or "")))
 
 
 @cli.command("create")
@@ -102,15 +144,47 @@ def create(
     click.echo(json.dumps(r.json(), indent=indent))
 
 
+def _wait_for_job(s, url, timeout, indent):
+    """Wait for a job to finish, print it and fail unless it succeeded
+
+    Stage changes are reported on stderr while waiting.
+    """
+
+    def report(job):
+        click.echo("Job {0} {1}".format(job.get("id"), job.get("stage")), err=True)
+
+    job = utils._wait_for_job(s, url, timeout, on_stage=report)
+    click.echo(json.dumps(job, indent=indent))
+    if job["stage"] != "success":
+        raise errors.JobFailedError(
+            "Job {0} finished with stage {1}".format(job.get("id"), job["stage"])
+        )
+
+
 @cli.command("publish")
 @click.argument("tileset", required=True, type=str)
+@click.option(
+    "--wait",
+    is_flag=True,
+    default=False,
+    help="Poll the job until it succeeds or fails, exiting with 1 if it fails",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(0, None),
+    default=None,
+    help="Seconds to wait with --wait before exiting with 3 (default: no limit)",
+)
 @click.option("--token", "-t", required=False, type=str, help="Mapbox access token")
 @click.option("--indent", type=int, default=None, help="Indent for JSON output")
-def publish(tileset, token=None, indent=None):
+def publish(tileset, wait=False, timeout=None, token=None, indent=None):
     """Publish your tileset.
 
     Only supports tilesets created with the Mapbox Tiling Service.
 
+    With --wait, the publish job is polled in this process until it
+    finishes and is then printed as well.
+
     tilesets publish <tileset_id>
     """
     mapbox_api = utils._get_api()
@@ -135,10 +209,97 @@ def publish(tileset, token=None, indent=None):
             message,
             err=True,  # print to stderr so the JSON output can be parsed separately from the success message
         )
+        if wait:
+            url = "{0}/tilesets/v1/{1}/jobs/{2}?access_token={3}".format(
+                mapbox_api, tileset, job_id, mapbox_token
+            )
+            _wait_for_job(s, url, timeout, indent)
     else:
         raise errors.TilesetsError(r.text)
 
 
+@cli.command("publish-many")
+@click.argument("tilesets", nargs=-1, type=str)
+@click.option(
+    "--file",
+    "-f",
+    type=click.File("r"),
+    default=None,
+    help="Read more tileset ids from a file, one per line, or - for stdin",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(1, None),
+    default=10,
+    help="Number of publish requests in flight at once (default 10)",
+)
+@click.option("--token", "-t", required=False, type=str, help="Mapbox access token")
+@click.option("--indent", type=int, default=None, help="Indent for JSON output")
+def publish_many(tilesets, file=None, concurrency=10, token=None, indent=None):
+    """Publish many tilesets at once.
+
+    Only supports tilesets created with the Mapbox Tiling Service.
+
+    Publish requests are sent concurrently. When the API rate limits a
+    request, all requests pause for the time it asks for before it is
+    retried. Each result is reported on stderr as it arrives, and a
+    summary of the job id of every published tileset and the error of
+    every failed one is printed at the end.
+
+    tilesets publish-many <tileset_id> <tileset_id> ...
+
+    tilesets publish-many --file <path>
+    """
+    if not tilesets and file is None:
+        raise click.UsageError("Provide at least one tileset id or --file")
+
+    mapbox_api = utils._get_api()
+    mapbox_token = utils._get_token(token)
+    s = utils._get_session()
+    throttle = utils._Throttle()
+
+    def send(item):
+        import requests
+
+        index, tileset = item
+        url = "{0}/tilesets/v1/{1}/publish?access_token={2}".format(
+            mapbox_api, tileset, mapbox_token
+        )
+        try:
+            r = utils._request_with_backoff(s, "post", url, throttle)
+        except requests.RequestException as e:
+            return index, tileset, None, utils._strip_token(str(e))
+        if r.status_code != 200:
+            return index, tileset, None, r.text
+        return index, tileset, r.json()["jobId"], None
+
+    ids = enumerate(_iter_tileset_ids(tilesets, file))
+    results = []
+    with utils._pool_size(s, concurrency):
+        for result in utils._iter_concurrent(send, ids, concurrency):
+            index, tileset, job_id, error = result
+            if error is None:
+                click.echo("✔ {0} job {1}".format(tileset, job_id), err=True)
+            else:
+                click.echo("✘ {0} {1}".format(tileset, error), err=True)
+            results.append(result)
+
+    summary = {"published": {}, "failed": {}}
+    for index, tileset, job_id, error in sorted(results):
+        if error is None:
+            summary["published"][tileset] = job_id
+        else:
+            summary["failed"][tileset] = error
+    click.echo(json.dumps(summary, indent=indent))
+
+    if summary["failed"]:
+        raise errors.TilesetsError(
+            "{0} of {1} tilesets failed to publish".format(
+                len(summary["failed"]), len(results)
+            )
+        )
+
+
 @cli.command("update")
 @click.argument("tileset", required=True, type=str)
 @click.option("--token", "-t", required=False, type=str, help="Mapbox access token")
@@ -234,43 +395,114 @@ def delete(tileset, token=None, indent=None, force=None):
         raise errors.TilesetsError(r.text)
 
 
+def _job_status(jobs):
+    """Summarize the latest job of a tileset"""
+    status = {}
+    for job in jobs:
+        status["id"] = job["tilesetId"]
+        status["latest_job"] = job["id"]
+        status["status"] = job["stage"]
+    return status
+
+
+def _iter_tileset_ids(tilesets, file):
+    """Yield tileset ids from arguments and then from a file, one per line"""
+    yield from tilesets
+    if file is not None:
+        for line in file:
+            tileset = line.strip()
+            if tileset:
+                yield tileset
+
+
 @cli.command("status")
-@click.argument("tileset", required=True, type=str)
+@click.argument("tilesets", nargs=-1, type=str)
+@click.option(
+    "--file",
+    "-f",
+    type=click.File("r"),
+    default=None,
+    help="Read more tileset ids from a file, one per line, or - for stdin",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(1, None),
+    default=10,
+    help="Number of status requests in flight at once (default 10)",
+)
 @click.option("--token", "-t", required=False, type=str, help="Mapbox access token")
 @click.option("--indent", type=int, default=None, help="Indent for JSON output")
-def status(tileset, token=None, indent=None):
+def status(tilesets, file=None, concurrency=10, token=None, indent=None):
     """View the current queue/processing/complete status of your tileset.
 
     tilesets status <tileset_id>
+
+    Given several tileset ids, or ids read with --file, the statuses are
+    requested concurrently and written as line-delimited JSON in the
+    order they complete. A tileset whose request fails is written with
+    an "error" instead of a status, and the command exits with an error
+    once all tilesets have been written.
+
+    tilesets status <tileset_id> <tileset_id> ...
+
+    tilesets status --file <path>
     """
+    if not tilesets and file is None:
+        raise click.UsageError("Provide at least one tileset id or --file")
+
     mapbox_api = utils._get_api()
     mapbox_token = utils._get_token(token)
     s = utils._get_session()
-    url = "{0}/tilesets/v1/{1}/jobs?limit=1&access_token={2}".format(
-        mapbox_api, tileset, mapbox_token
-    )
-    r = s.get(url)
 
-    if r.status_code != 200:
-        raise errors.TilesetsError(r.text)
+    def get(tileset):
+        url = "{0}/tilesets/v1/{1}/jobs?limit=1&access_token={2}".format(
+            mapbox_api, tileset, mapbox_token
+        )
+        return s.get(url)
 
-    status = {}
-    for job in r.json():
-        status["id"] = job["tilesetId"]
-        status["latest_job"] = job["id"]
-        status["status"] = job["stage"]
+    def fetch(tileset):
+        import requests
+
+        try:
+            r = get(tileset)
+        except requests.RequestException as e:
+            return {"id": tileset, "error": utils._strip_token(str(e))}
+        if r.status_code != 200:
+            return {"id": tileset, "error": r.text}
+        return {"id": tileset, **_job_status(r.json())}
+
+    if len(tilesets) == 1 and file is None:
+        r = get(tilesets[0])
+        if r.status_code != 200:
+            raise errors.TilesetsError(r.text)
 
-    click.echo(json.dumps(status, indent=indent))
+        click.echo(json.dumps(_job_status(r.json()), indent=indent))
+        return
+
+    ids = _iter_tileset_ids(tilesets, file)
+    failed = total = 0
+    with utils._pool_size(s, concurrency):
+        for result in utils._iter_concurrent(fetch, ids, concurrency):
+            total += 1
+            if "error" in result:
+                failed += 1
+            click.echo(json.dumps(result))
+
+    if failed:
+        raise errors.TilesetsError(
+            "{0} of {1} status requests failed".format(failed, total)
+        )
 
 
 @cli.command("tilejson")
 @click.argument("tileset", required=True, type=str)
+@cache_option
 @click.option("--token", "-t", required=False, type=str, help="Mapbox access token")
 @click.option("--indent", type=int, default=None, help="Indent for JSON output")
 @click.option(
     "--secure", required=False, is_flag=True, help="receive HTTPS resource URLs"
 )
-def tilejson(tileset, token=None, indent=None, secure=False):
+def tilejson(tileset, cache=False, token=None, indent=None, secure=False):
     """View the TileJSON of a particular tileset.
     Can take a comma-separated list of tilesets for a composited TileJSON.
 
@@ -279,6 +511,8 @@ def tilejson(tileset, token=None, indent=None, secure=False):
     mapbox_api = utils._get_api()
     mapbox_token = utils._get_token(token)
     s = utils._get_session()
+    if cache:
+        s = utils._get_cached_session(s)
 
     # validate tilesets by splitting comma-delimted string
     # and rejoining it
@@ -331,13 +565,27 @@ def jobs(tileset, stage=None, limit=None, token=None, indent=None):
 @cli.command("job")
 @click.argument("tileset", required=True, type=str)
 @click.argument("job_id", required=True, type=str)
+@click.option(
+    "--wait",
+    is_flag=True,
+    default=False,
+    help="Poll the job until it succeeds or fails, exiting with 1 if it fails",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(0, None),
+    default=None,
+    help="Seconds to wait with --wait before exiting with 3 (default: no limit)",
+)
 @click.option("--token", "-t", required=False, type=str, help="Mapbox access token")
 @click.option("--indent", type=int, default=None, help="Indent for JSON output")
-def job(tileset, job_id, token=None, indent=None):
+def job(tileset, job_id, wait=False, timeout=None, token=None, indent=None):
     """View a single job for a particular tileset.
 
     Only supports tilesets created with the Mapbox Tiling Service.
 
+    With --wait, the job is polled in this process until it finishes.
+
     tilesets job <tileset_id> <job_id>
     """
     mapbox_api = utils._get_api()
@@ -346,6 +594,10 @@ def job(tileset, job_id, token=None, indent=None):
     url = "{0}/tilesets/v1/{1}/jobs/{2}?access_token={3}".format(
         mapbox_api, tileset, job_id, mapbox_token
     )
+    if wait:
+        _wait_for_job(s, url, timeout, indent)
+        return
+
     r = s.get(url)
 
     click.echo(json.dumps(r.json(), indent=indent))
@@ -385,6 +637,20 @@ def job(tileset, job_id, token=None, indent=None):
     default=100,
     help="The maximum number of results to return, from 1 to 500 (default 100)",
 )
+@click.option(
+    "--all",
+    "all_pages",
+    is_flag=True,
+    default=False,
+    help="Follow pagination links and list every tileset, --limit per request",
+)
+@click.option(
+    "--prefetch",
+    type=click.IntRange(0, None),
+    default=pages.PREFETCH,
+    help="Pages requested ahead of the output with --all, 0 to disable (default 1)",
+)
+@cache_option
 @click.option("--token", "-t", required=False, type=str, help="Mapbox access token")
 @click.option("--indent", type=int, default=None, help="Indent for JSON output")
 def list(
@@ -394,6 +660,9 @@ def list(
     visibility=None,
     sortby=None,
     limit=None,
+    all_pages=False,
+    prefetch=pages.PREFETCH,
+    cache=False,
     token=None,
     indent=None,
 ):
@@ -402,11 +671,16 @@ def list(
     If you would like an array of all tileset's information,
     use the --versbose flag.
 
+    With --all, every page of results is requested in turn and
+    printed as soon as it arrives.
+
     tilesets list <username>
     """
     mapbox_api = utils._get_api()
     mapbox_token = utils._get_token(token)
     s = utils._get_session()
+    if cache:
+        s = utils._get_cached_session(s)
     url = "{0}/tilesets/v1/{1}?access_token={2}".format(
         mapbox_api, username, mapbox_token
     )
@@ -414,16 +688,20 @@ def list(
     url = "{0}&type={1}".format(url, type) if type else url
     url = "{0}&visibility={1}".format(url, visibility) if visibility else url
     url = "{0}&sortby={1}".format(url, sortby) if sortby else url
-    r = s.get(url)
-    if r.status_code == 200:
-        if verbose:
-            for tileset in r.json():
+    if all_pages:
+        results = pages.iter_pages(s, url, mapbox_token, prefetch)
+    else:
+        r = s.get(url)
+        if r.status_code != 200:
+            raise errors.TilesetsError(r.text)
+        results = [r.json()]
+
+    for page in results:
+        for tileset in page:
+            if verbose:
                 click.echo(json.dumps(tileset, indent=indent))
-        else:
-            for tileset in r.json():
+            else:
                 click.echo(tileset["id"])
-    else:
-        raise errors.TilesetsError(r.text)
 
 
 @cli.command("validate-recipe")
@@ -450,9 +728,10 @@ def validate_recipe(recipe, token=None, indent=None):
 
 @cli.command("view-recipe")
 @click.argument("tileset", required=True, type=str)
+@cache_option
 @click.option("--token", "-t", required=False, type=str, help="Mapbox access token")
 @click.option("--indent", type=int, default=None, help="Indent for JSON output")
-def view_recipe(tileset, token=None, indent=None):
+def view_recipe(tileset, cache=False, token=None, indent=None):
     """View a tileset's recipe JSON
 
     tilesets view-recipe <tileset_id>
@@ -460,6 +739,8 @@ def view_recipe(tileset, token=None, indent=None):
     mapbox_api = utils._get_api()
     mapbox_token = utils._get_token(token)
     s = utils._get_session()
+    if cache:
+        s = utils._get_cached_session(s)
     url = "{0}/tilesets/v1/{1}/recipe?access_token={2}".format(
         mapbox_api, tileset, mapbox_token
     )
@@ -499,19 +780,59 @@ def update_recipe(tileset, recipe, token=None, indent=None):
 
 
 @cli.command("validate-source")
-@cligj.features_in_arg
-def validate_source(features):
+@features_in_arg
+@click.option(
+    "--strict-validation",
+    is_flag=True,
+    help="Validate with jsonschema and the geojson library instead of the faster built-in validator",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of processes used to validate local line-delimited GeoJSON files (default 1)",
+)
+def validate_source(features, strict_validation=False, workers=1):
     """Validate your source file.
     $ tilesets validate-source <path/to/your/src/file>
     """
     click.echo("Validating features", err=True)
 
-    for index, feature in enumerate(features):
-        utils.validate_geojson(index, feature)
+    if not _validate_files(features, workers, False, strict_validation):
+        for index, feature in enumerate(features):
+            utils.validate_geojson(index, feature, strict=strict_validation)
 
     click.echo("✔ valid")
 
 
+def _validate_files(features, workers, allow_delete, strict_validation):
+    """Validate local line-delimited inputs in a process pool
+
+    Returns True if the features were validated, False if they still need
+    to be validated one by one.
+    """
+    if workers < 2 or not features.files:
+        return False
+    with trace.span("validate files", workers=workers):
+        validated = utils.validate_geojson_files(
+            features.files, workers, allow_delete, strict_validation
+        )
+    return validated is not None
+
+
+def parse_size(ctx, param, value):
+    """Parse a size such as 512MB or 1GiB into a number of bytes"""
+    if value is None or isinstance(value, int):
+        return value
+    units = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+    match = re.match(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)(?:i?b)?\s*$", value, re.I)
+    if not match or float(match.group(1)) <= 0:
+        raise click.BadParameter(
+            "Size must be a positive number of bytes, optionally followed by KB, MB, GB or TB."
+        )
+    return int(float(match.group(1)) * units[match.group(2).lower()])
+
+
 def validate_source_id(ctx, param, value):
     if re.match("^[a-zA-Z0-9-_]{1,32}$", value):
         return value
@@ -524,8 +845,13 @@ def validate_source_id(ctx, param, value):
 @cli.command("upload-source")
 @click.argument("username", required=True, type=str)
 @click.argument("id", required=True, callback=validate_source_id, type=str)
-@cligj.features_in_arg
+@features_in_arg
 @click.option("--no-validation", is_flag=True, help="Bypass source file validation")
+@click.option(
+    "--strict-validation",
+    is_flag=True,
+    help="Validate with jsonschema and the geojson library instead of the faster built-in validator",
+)
 @click.option("--quiet", is_flag=True, help="Don't show progress bar")
 @click.option(
     "--replace",
@@ -534,9 +860,57 @@ def validate_source_id(ctx, param, value):
 )
 @click.option("--token", "-t", required=False, type=str, help="Mapbox access token")
 @click.option("--indent", type=int, default=None, help="Indent for JSON output")
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of processes used to validate local line-delimited GeoJSON files (default 1)",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="Upload features while they are validated instead of writing them to a temporary file first",
+)
+@click.option(
+    "--compress",
+    type=click.Choice(builtins.list(upload.COMPRESSIONS)),
+    help="Compress the upload with gzip or zstd (zstd requires the zstandard package on Python < 3.14)",
+)
+@click.option(
+    "--parallel-parts",
+    type=click.IntRange(min=1),
+    help="Split the upload into parts and upload this many parts at a time",
+)
+@click.option(
+    "--part-size",
+    default="512MB",
+    callback=parse_size,
+    show_default=True,
+    help="Size of each part when using --parallel-parts",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Resume an interrupted upload of the same local files, skipping parts that were already uploaded",
+)
 @click.pass_context
 def upload_source(
-    ctx, username, id, features, no_validation, quiet, replace, token=None, indent=None
+    ctx,
+    username,
+    id,
+    features,
+    no_validation,
+    quiet,
+    replace,
+    token=None,
+    indent=None,
+    strict_validation=False,
+    workers=1,
+    stream=False,
+    compress=None,
+    parallel_parts=None,
+    part_size=None,
+    resume=False,
 ):
     """Create a new tileset source, or add data to an existing tileset source.
     Optionally, replace an existing tileset source.
@@ -544,7 +918,23 @@ def upload_source(
     tilesets upload-source <username> <source_id> <path/to/source/data>
     """
     return _upload_file(
-        ctx, username, id, features, no_validation, quiet, replace, False, token, indent
+        ctx,
+        username,
+        id,
+        features,
+        no_validation,
+        quiet,
+        replace,
+        False,
+        token,
+        indent,
+        strict_validation=strict_validation,
+        workers=workers,
+        stream=stream,
+        compress=compress,
+        parallel_parts=parallel_parts,
+        part_size=part_size,
+        resume=resume,
     )
 
 
@@ -559,7 +949,27 @@ def _upload_file(
     changeset,
     token=None,
     indent=None,
+    strict_validation=False,
+    workers=1,
+    stream=False,
+    compress=None,
+    parallel_parts=None,
+    part_size=None,
+    resume=False,
 ):
+    if stream and parallel_parts:
+        raise errors.TilesetsError(
+            "The --stream and --parallel-parts flags cannot be used together."
+        )
+
+    if resume and stream:
+        raise errors.TilesetsError(
+            "The --stream and --resume flags cannot be used together."
+        )
+
+    if resume and not features.files:
+        raise errors.TilesetsError("The --resume flag requires local input files.")
+
     api_endpoint = "changesets" if changeset else "sources"
 
     mapbox_api = utils._get_api()
@@ -592,51 +1002,272 @@ def _upload_file(
                 f"Token {mapbox_token} does not contain a username"
             )
 
-    with tempfile.TemporaryFile() as file:
-        for index, feature in enumerate(features):
-            if not no_validation:
-                utils.validate_geojson(index, feature, changeset)
+    validate = not no_validation
+    # files validated in worker processes are known to be line-delimited and
+    # are uploaded from a memory map below, so they are never parsed again
+    validated = validate and _validate_files(
+        features, workers, changeset, strict_validation
+    )
+    if validated:
+        validate = False
+
+    # Local line-delimited files are uploaded as they are from a memory map
+    # instead of being parsed and serialized, when they need no validation
+    # here or are split into parts that are validated one at a time
+    files = features.files
+    mapped = None
+    if validated or (
+        (not validate or parallel_parts or resume)
+        and files
+        and all(utils._is_line_delimited(f) for f in files)
+    ):
+        mapped = upload.MappedLines(files)
+    if mapped and not validate:
+        lines = mapped.iter_blocks()
+    else:
+        lines = upload.iter_lines(features, validate, changeset, strict_validation)
+
+    try:
+        with trace.span("upload"):
+            if parallel_parts or resume:
+                manifest = None
+                if files:
+                    fingerprint = upload.fingerprint(
+                        files, part_size, compress, mapped is not None, validate
+                    )
+                    manifest = upload.UploadManifest.open(
+                        utils._get_state_dir(),
+                        f"{api_endpoint}.{username}.{id}.{fingerprint}",
+                        resume,
+                    )
+                    if mapped:
+                        parts = upload.iter_mapped_parts(
+                            mapped,
+                            manifest,
+                            part_size,
+                            compress,
+                            validate,
+                            changeset,
+                            strict_validation,
+                        )
+                    else:
+                        parts = upload.iter_resumable_parts(
+                            features,
+                            manifest,
+                            part_size,
+                            compress,
+                            validate,
+                            changeset,
+                            strict_validation,
+                        )
+                    if manifest.completed:
+                        click.echo(
+                            f"Resuming upload, {manifest.completed} of {len(manifest.parts)} parts already uploaded",
+                            err=True,
+                        )
+                else:
+                    parts = enumerate(upload.iter_parts(lines, part_size, compress))
+
+                resp = _parallel_upload(
+                    s,
+                    method,
+                    url,
+                    parts,
+                    quiet,
+                    compress,
+                    parallel_parts or 1,
+                    validate,
+                    manifest,
+                )
+                if resp is None:
+                    # every part was acknowledged before, report the current state
+                    resp = s.get(url)
+            elif stream:
+                resp = _stream_upload(s, method, url, lines, quiet, compress)
+            elif mapped and not compress:
+                resp = _upload_body(s, method, url, mapped, quiet)
+            else:
+                resp = _buffered_upload(s, method, url, lines, quiet, compress)
+    finally:
+        if mapped:
+            mapped.close()
+
+    if resp.status_code == 200:
+        click.echo(json.dumps(resp.json(), indent=indent))
+    else:
+        raise errors.TilesetsError(resp.text)
 
-            file.write(
-                (json.dumps(feature, separators=(",", ":")) + "\n").encode("utf-8")
-            )
+
+def _buffered_upload(s, method, url, lines, quiet, compress=None):
+    """Write serialized features to a temporary file, then upload it"""
+    with tempfile.TemporaryFile() as file:
+        if compress:
+            lines = upload.iter_upload_blocks(lines, compress)
+        with trace.span("write temp file"):
+            for line in lines:
+                file.write(line)
 
         file.seek(0)
+        return _upload_body(s, method, url, file, quiet, compress)
+
+
+def _upload_body(s, method, url, file, quiet, compress=None):
+    """Upload a file object of known length as a multipart body"""
+    from requests_toolbelt import MultipartEncoder, MultipartEncoderMonitor
+
+    if compress:
+        content_type, suffix = upload.COMPRESSIONS[compress]
+        m = MultipartEncoder(fields={"file": ("file" + suffix, file, content_type)})
+    else:
         m = MultipartEncoder(fields={"file": ("file", file)})
 
-        if quiet:
+    if quiet:
+        resp = getattr(s, method)(
+            url,
+            data=m,
+            headers={
+                "Content-Disposition": "multipart/form-data",
+                "Content-type": m.content_type,
+            },
+        )
+    else:
+        prog = click.progressbar(
+            length=m.len, fill_char="=", width=0, label="upload progress"
+        )
+        with prog:
+
+            def callback(m):
+                # click only redraws the bar for a positive number of steps
+                prog.update(m.bytes_read - prog.pos)
+
+            monitor = MultipartEncoderMonitor(m, callback)
             resp = getattr(s, method)(
                 url,
-                data=m,
+                data=monitor,
                 headers={
                     "Content-Disposition": "multipart/form-data",
-                    "Content-type": m.content_type,
+                    "Content-type": monitor.content_type,
                 },
             )
+    return resp
+
+
+def _parallel_upload(
+    s, method, url, parts, quiet, compress, parallel_parts, validate, manifest=None
+):
+    """Upload parts of serialized features concurrently
+
+    Parts after the first are appended with POST, so each one can be
+    retried on its own. When features are validated here, every part is
+    written before the first one is sent so that an invalid feature never
+    leaves a partial upload behind. Otherwise parts are sent as soon as
+    they are written. Acknowledged parts are recorded in the manifest,
+    which is removed once the whole upload has succeeded.
+    """
+    filename, content_type = "file", None
+    if compress:
+        content_type, suffix = upload.COMPRESSIONS[compress]
+        filename += suffix
+
+    on_complete = manifest.complete if manifest else None
+    length = None
+    if validate:
+        parts = builtins.list(parts)
+        length = sum(part.seek(0, 2) for index, part in parts)
+
+    with utils._pool_size(s, parallel_parts):
+        if quiet:
+            resp = upload.upload_parts(
+                s,
+                method,
+                url,
+                parts,
+                parallel_parts,
+                filename,
+                content_type,
+                on_complete=on_complete,
+            )
         else:
+            lock = threading.Lock()
             prog = click.progressbar(
-                length=m.len, fill_char="=", width=0, label="upload progress"
+                # a generator has no length, so the bar only counts bytes if the
+                # total is not known yet
+                iterable=None if length else (part for part in ()),
+                length=length,
+                fill_char="=",
+                width=0,
+                show_pos=True,
+                label="upload progress",
             )
             with prog:
 
-                def callback(m):
-                    prog.pos = m.bytes_read
-                    prog.update(0)  # Step is 0 because we set pos above
+                def callback(size):
+                    with lock:
+                        prog.update(size)
 
-                monitor = MultipartEncoderMonitor(m, callback)
-                resp = getattr(s, method)(
+                resp = upload.upload_parts(
+                    s,
+                    method,
                     url,
-                    data=monitor,
-                    headers={
-                        "Content-Disposition": "multipart/form-data",
-                        "Content-type": monitor.content_type,
-                    },
+                    parts,
+                    parallel_parts,
+                    filename,
+                    content_type,
+                    callback,
+                    on_complete,
                 )
 
-    if resp.status_code == 200:
-        click.echo(json.dumps(resp.json(), indent=indent))
-    else:
-        raise errors.TilesetsError(resp.text)
+    if manifest:
+        manifest.remove()
+    return resp
+
+
+def _stream_upload(s, method, url, chunks, quiet, compress=None):
+    """Upload chunks of a file while they are being produced
+
+    Background threads gather (and optionally compress) the chunks into
+    bounded queues that feed a chunked multipart request body, so the
+    transfer starts right away and no temporary file is written. When the
+    chunks are serialized features, an invalid feature aborts the request
+    before the body is complete.
+    """
+    stats = upload.TransferStats()
+    boundary = upload.multipart_boundary()
+    filename, content_type = "file", None
+    if compress:
+        content_type, suffix = upload.COMPRESSIONS[compress]
+        filename += suffix
+    body = upload.multipart_body(
+        upload.iter_upload_blocks(chunks, compress, stats.add_raw),
+        boundary,
+        filename=filename,
+        content_type=content_type,
+    )
+    headers = {
+        "Content-Disposition": "multipart/form-data",
+        "Content-type": upload.multipart_content_type(boundary),
+    }
+
+    if quiet:
+        return getattr(s, method)(url, data=body, headers=headers)
+
+    prog = click.progressbar(
+        body,
+        fill_char="=",
+        width=0,
+        show_pos=True,
+        label="upload progress",
+        item_show_func=stats.describe if compress else None,
+    )
+    with prog:
+
+        def callback(size):
+            stats.add_sent(size)
+            prog.update(size)
+
+        return getattr(s, method)(
+            url, data=upload.with_progress(body, callback), headers=headers
+        )
 
 
 @cli.command("upload-raster-source")
@@ -651,9 +1282,14 @@ def _upload_file(
 )
 @click.option("--token", "-t", required=False, type=str, help="Mapbox access token")
 @click.option("--indent", type=int, default=None, help="Indent for JSON output")
+@click.option(
+    "--compress",
+    type=click.Choice(builtins.list(upload.COMPRESSIONS)),
+    help="Compress the upload with gzip or zstd (zstd requires the zstandard package on Python < 3.14)",
+)
 @click.pass_context
 def upload_raster_source(
-    ctx, username, id, inputs, quiet, replace, token=None, indent=None
+    ctx, username, id, inputs, quiet, replace, token=None, indent=None, compress=None
 ):
     """Create a new raster tileset source, or add data to an existing tileset source.
     Optionally, replace an existing tileset source.
@@ -661,12 +1297,12 @@ def upload_raster_source(
     tilesets upload-source <username> <source_id> <path/to/source/data>
     """
     return _upload_raster_source(
-        ctx, username, id, inputs, quiet, replace, token, indent
+        ctx, username, id, inputs, quiet, replace, token, indent, compress
     )
 
 
 def _upload_raster_source(
-    ctx, username, id, inputs, quiet, replace, token=None, indent=None
+    ctx, username, id, inputs, quiet, replace, token=None, indent=None, compress=None
 ):
     mapbox_api = utils._get_api()
     mapbox_token = utils._get_token(token)
@@ -700,10 +1336,19 @@ def _upload_raster_source(
                 f"Token {mapbox_token} does not contain a username"
             )
 
+    from requests_toolbelt import MultipartEncoder, MultipartEncoderMonitor
+
     if len(inputs) > 10:
         raise errors.TilesetsError("Maximum 10 files can be uploaded at once.")
 
     for item in inputs:
+        if compress:
+            with open(item.name, "rb") as file:
+                resp = _stream_upload(
+                    s, method, url, upload.iter_file(file), quiet, compress
+                )
+            continue
+
         m = MultipartEncoder(
             fields={"file": ("file", open(item.name, "rb"), "multipart/form-data")}
         )
@@ -723,8 +1368,8 @@ def _upload_raster_source(
             with prog:
 
                 def callback(m):
-                    prog.pos = m.bytes_read
-                    prog.update(0)  # Step is 0 because we set pos above
+                    # click only redraws the bar for a positive number of steps
+                    prog.update(m.bytes_read - prog.pos)
 
                 monitor = MultipartEncoderMonitor(m, callback)
                 resp = getattr(s, method)(
@@ -745,30 +1390,54 @@ def _upload_raster_source(
 @cli.command("add-source", hidden=True)
 @click.argument("username", required=True, type=str)
 @click.argument("id", required=True, type=str)
-@cligj.features_in_arg
+@features_in_arg
 @click.option("--no-validation", is_flag=True, help="Bypass source file validation")
+@click.option(
+    "--strict-validation",
+    is_flag=True,
+    help="Validate with jsonschema and the geojson library instead of the faster built-in validator",
+)
 @click.option("--quiet", is_flag=True, help="Don't show progress bar")
 @click.option("--token", "-t", required=False, type=str, help="Mapbox access token")
 @click.option("--indent", type=int, default=None, help="Indent for JSON output")
 @click.pass_context
 def add_source(
-    ctx, username, id, features, no_validation, quiet, token=None, indent=None
+    ctx,
+    username,
+    id,
+    features,
+    no_validation,
+    quiet,
+    token=None,
+    indent=None,
+    strict_validation=False,
 ):
     """[DEPRECATED] Create/add/replace a tileset source. Use upload-source instead.
 
     tilesets add-source <username> <source_id> <path/to/source/data>
     """
     return _upload_file(
-        ctx, username, id, features, no_validation, quiet, False, False, token, indent
+        ctx,
+        username,
+        id,
+        features,
+        no_validation,
+        quiet,
+        False,
+        False,
+        token,
+        indent,
+        strict_validation=strict_validation,
     )
 
 
 @cli.command("view-source")
 @click.argument("username", required=True, type=str)
 @click.argument("id", required=True, type=str)
+@cache_option
 @click.option("--token", "-t", required=False, type=str, help="Mapbox access token")
 @click.option("--indent", type=int, default=None, help="Indent for JSON output")
-def view_source(username, id, token=None, indent=None):
+def view_source(username, id, cache=False, token=None, indent=None):
     """View a Tileset Source's information
 
     tilesets view-source <username> <source_id>
@@ -776,6 +1445,8 @@ def view_source(username, id, token=None, indent=None):
     mapbox_api = utils._get_api()
     mapbox_token = utils._get_token(token)
     s = utils._get_session()
+    if cache:
+        s = utils._get_cached_session(s)
     url = "{0}/tilesets/v1/sources/{1}/{2}?access_token={3}".format(
         mapbox_api, username, id, mapbox_token
     )
@@ -823,8 +1494,9 @@ def delete_source(username, id, force, token=None):
 
 @cli.command("list-sources")
 @click.argument("username", required=True, type=str)
+@cache_option
 @click.option("--token", "-t", required=False, type=str, help="Mapbox access token")
-def list_sources(username, token=None):
+def list_sources(username, cache=False, token=None):
     """List all Tileset Sources for an account. Response is an un-ordered array of sources.
 
     tilesets list-sources <username>
@@ -832,6 +1504,8 @@ def list_sources(username, token=None):
     mapbox_api = utils._get_api()
     mapbox_token = utils._get_token(token)
     s = utils._get_session()
+    if cache:
+        s = utils._get_cached_session(s)
     url = "{0}/tilesets/v1/sources/{1}?access_token={2}".format(
         mapbox_api, username, mapbox_token
     )
@@ -843,14 +1517,19 @@ def list_sources(username, token=None):
         raise errors.TilesetsError(r.text)
 
 
-def validate_stream(features):
-    for index, feature in enumerate(features):
-        utils.validate_geojson(index, feature)
-        yield feature
+def validate_stream(features, strict=False):
+    validating = trace.stage("validate")
+    try:
+        for index, feature in enumerate(features):
+            with validating:
+                utils.validate_geojson(index, feature, strict=strict)
+            yield feature
+    finally:
+        validating.close()
 
 
 @cli.command("estimate-area")
-@cligj.features_in_arg
+@features_in_arg
 @click.option(
     "--precision",
     "-p",
@@ -864,20 +1543,44 @@ def validate_stream(features):
     is_flag=True,
     help="Bypass source file validation",
 )
+@click.option(
+    "--strict-validation",
+    is_flag=True,
+    help="Validate with jsonschema and the geojson library instead of the faster built-in validator",
+)
 @click.option(
     "--force-1cm",
     required=False,
     is_flag=True,
     help="Enables 1cm precision",
 )
-def estimate_area(features, precision, no_validation=False, force_1cm=False):
-    """Estimate area of features with a precision level. Requires extra installation steps: see https://github.com/mapbox/tilesets-cli/blob/master/README.md
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of processes used to validate local line-delimited GeoJSON files and to burn features (default 1)",
+)
+@click.option(
+    "--approximate",
+    is_flag=True,
+    help="Quickly estimate the area from sampled tile rows, with an upper bound and a 95% confidence interval",
+)
+def estimate_area(
+    features,
+    precision,
+    no_validation=False,
+    strict_validation=False,
+    force_1cm=False,
+    workers=1,
+    approximate=False,
+):
+    """Estimate area of features with a precision level.
 
     tilesets estimate-area <features> <precision>
 
     features must be a list of paths to local files containing GeoJSON feature collections or feature sequences from argument or stdin, or a list of string-encoded coordinate pairs of the form "[lng, lat]", or "lng, lat", or "lng lat".
     """
-    filter_features = utils.load_module("supermercado.super_utils").filter_features
+    from mapbox_tilesets.area import approximate_tiles_area, calculate_tiles_area
 
     area = 0
     if precision == "1cm" and not force_1cm:
@@ -891,28 +1594,34 @@ def estimate_area(features, precision, no_validation=False, force_1cm=False):
 
     try:
         # expect users to bypass source validation when users rerun command and their features passed validation previously
-        if not no_validation:
-            features = validate_stream(features)
-        # builtins.list because there is a list command in the cli & will thrown an error
-        # It is a list at all because calculate_tiles_area does not work with a stream
-        features = builtins.list(filter_features(features))
+        validate = not no_validation and not _validate_files(
+            features, workers, False, strict_validation
+        )
+        features = trace.iterate("read features", features)
+        if validate:
+            features = validate_stream(features, strict=strict_validation)
+        # features are read, validated and rasterized as a stream
+        if approximate:
+            estimate = approximate_tiles_area(features, precision)
+            area = estimate["estimate"]
+        else:
+            area = calculate_tiles_area(features, precision, workers=workers)
     except (ValueError, json.decoder.JSONDecodeError):
         raise errors.TilesetsError(
             "Error with feature parsing. Ensure that feature inputs are valid and formatted correctly. Try 'tilesets estimate-area --help' for help."
         )
 
-    area = utils.calculate_tiles_area(features, precision)
-    area = str(int(round(area)))
-
-    click.echo(
-        json.dumps(
-            {
-                "km2": area,
-                "precision": precision,
-                "pricing_docs": "For more information, visit https://www.mapbox.com/pricing/#tilesets",
-            }
-        )
+    result = {"km2": str(int(round(area))), "precision": precision}
+    if approximate:
+        result["km2_upper_bound"] = str(int(round(estimate["upper_bound"])))
+        result["km2_interval"] = [
+            str(int(round(estimate["low"]))),
+            str(int(round(estimate["high"]))),
+        ]
+    result["pricing_docs"] = (
+        "For more information, visit https://www.mapbox.com/pricing/#tilesets"
     )
+    click.echo(json.dumps(result))
 
 
 @cli.command("list-activity")
@@ -944,6 +1653,13 @@ def estimate_area(features, precision, no_validation=False, force_1cm=False):
     type=str,
     help="Pagination key from the `next` value in a response that has more results than the limit.",
 )
+@click.option(
+    "--all",
+    "all_pages",
+    is_flag=True,
+    default=False,
+    help="Follow pagination links and write every record as line-delimited JSON",
+)
 @click.option("--token", "-t", required=False, type=str, help="Mapbox access token")
 @click.option("--indent", type=int, default=None, help="Indent for JSON output")
 def list_activity(
@@ -952,6 +1668,7 @@ def list_activity(
     orderby=None,
     limit=None,
     start=None,
+    all_pages=False,
     token=None,
     indent=None,
 ):
@@ -959,6 +1676,10 @@ def list_activity(
     total requests over the past 30 days. The sorting and ordering can be configured through cli arguments, defaulting to
     descending request counts.
 
+    With --all, every page is requested in turn, with the next page in
+    flight while the current one is written, and each record is written
+    on its own line as soon as it arrives.
+
     tilesets list-activity <username>
     """
     mapbox_api = utils._get_api()
@@ -976,6 +1697,12 @@ def list_activity(
     query_string = urlencode(params)
     url = f"{mapbox_api}/activity/v1/{username}/tilesets?{query_string}"
 
+    if all_pages:
+        for page in pages.iter_pages(s, url, mapbox_token):
+            for record in page:
+                click.echo(json.dumps(record, separators=(",", ":")))
+        return
+
     r = s.get(url)
     if r.status_code == 200:
         if r.headers.get("Link"):
@@ -1080,8 +1807,13 @@ def delete_changeset(username, id, force, token=None):
 @cli.command("upload-changeset")
 @click.argument("username", required=True, type=str)
 @click.argument("id", required=True, callback=validate_source_id, type=str)
-@cligj.features_in_arg
+@features_in_arg
 @click.option("--no-validation", is_flag=True, help="Bypass changeset file validation")
+@click.option(
+    "--strict-validation",
+    is_flag=True,
+    help="Validate with jsonschema and the geojson library instead of the faster built-in validator",
+)
 @click.option("--quiet", is_flag=True, help="Don't show progress bar")
 @click.option(
     "--replace",
@@ -1090,9 +1822,57 @@ def delete_changeset(username, id, force, token=None):
 )
 @click.option("--token", "-t", required=False, type=str, help="Mapbox access token")
 @click.option("--indent", type=int, default=None, help="Indent for JSON output")
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of processes used to validate local line-delimited GeoJSON files (default 1)",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="Upload features while they are validated instead of writing them to a temporary file first",
+)
+@click.option(
+    "--compress",
+    type=click.Choice(builtins.list(upload.COMPRESSIONS)),
+    help="Compress the upload with gzip or zstd (zstd requires the zstandard package on Python < 3.14)",
+)
+@click.option(
+    "--parallel-parts",
+    type=click.IntRange(min=1),
+    help="Split the upload into parts and upload this many parts at a time",
+)
+@click.option(
+    "--part-size",
+    default="512MB",
+    callback=parse_size,
+    show_default=True,
+    help="Size of each part when using --parallel-parts",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Resume an interrupted upload of the same local files, skipping parts that were already uploaded",
+)
 @click.pass_context
 def upload_changeset(
-    ctx, username, id, features, no_validation, quiet, replace, token=None, indent=None
+    ctx,
+    username,
+    id,
+    features,
+    no_validation,
+    quiet,
+    replace,
+    token=None,
+    indent=None,
+    strict_validation=False,
+    workers=1,
+    stream=False,
+    compress=None,
+    parallel_parts=None,
+    part_size=None,
+    resume=False,
 ):
     """Create a new changeset, or add data to an existing changeset.
     Optionally, replace an existing changeset.
@@ -1100,5 +1880,185 @@ def upload_changeset(
     tilesets upload-changeset <username> <source_id> <path/to/changeset/data>
     """
     return _upload_file(
-        ctx, username, id, features, no_validation, quiet, replace, True, token, indent
+        ctx,
+        username,
+        id,
+        features,
+        no_validation,
+        quiet,
+        replace,
+        True,
+        token,
+        indent,
+        strict_validation=strict_validation,
+        workers=workers,
+        stream=stream,
+        compress=compress,
+        parallel_parts=parallel_parts,
+        part_size=part_size,
+        resume=resume,
     )
+
+
+def _parse_batch_op(line):
+    """Parse a batch line into an (id, args) pair
+
+    A line is either a JSON array of arguments, a JSON object with "args"
+    (an array or a command line) and an optional "id", or a command line.
+    Returns None for blank lines and comments.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        op = json.loads(line)
+        args = op.get("args")
+        if isinstance(args, str):
+            args = shlex.split(args)
+        op_id = op.get("id")
+    elif line.startswith("["):
+        args = json.loads(line)
+        op_id = None
+    else:
+        args = shlex.split(line)
+        op_id = None
+    if not isinstance(args, builtins.list) or not all(
+        isinstance(arg, str) for arg in args
+    ):
+        raise ValueError("args must be a list of strings")
+    if args[:1] == ["tilesets"]:
+        args = args[1:]
+    return op_id, args
+
+
+def _run_batch_op(args):
+    """Run one command in this process and capture its result
+
+    Returns
+    -------
+    tuple
+        (exit code, stdout, error message)
+    """
+    if args[:1] == ["batch"]:
+        return 2, "", "batch can not be nested"
+    if "-" in args:
+        return 2, "", "operations can not read from stdin in a batch"
+
+    # progress bars would be written into the captured output, so every
+    # command with a --quiet flag is run with it
+    default_map = {
+        name: {"quiet": True}
+        for name, command in cli.commands.items()
+        if any(param.name == "quiet" for param in command.params)
+    }
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    code, error = 0, None
+    # stdin holds the batch itself, so confirmation prompts abort and
+    # inputs that default to stdin fail instead of reading operations
+    with (
+        contextlib.redirect_stdout(stdout),
+        contextlib.redirect_stderr(stderr),
+        _redirect_stdin(_BatchStdin()),
+    ):
+        try:
+            code = (
+                cli.main(
+                    args,
+                    prog_name="tilesets",
+                    standalone_mode=False,
+                    default_map=default_map,
+                )
+                or 0
+            )
+        except click.ClickException as e:
+            code, error = e.exit_code, e.format_message()
+        except click.exceptions.Abort:
+            code, error = 1, "Aborted!"
+        except click.exceptions.Exit as e:
+            code = e.exit_code
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            code, error = 1, str(e) or type(e).__name__
+    if error is None and code:
+        error = stderr.getvalue().strip() or None
+    return code, stdout.getvalue(), error
+
+
+class _BatchStdin(io.TextIOBase):
+    """Stands in for stdin while a batch operation runs
+
+    Reading input fails with an error, and prompts, which read a line,
+    abort as they do at the end of input.
+    """
+
+    def read(self, size=-1):
+        raise click.UsageError("operations can not read from stdin in a batch")
+
+    def readline(self, size=-1):
+        raise EOFError()
+
+
+@contextlib.contextmanager
+def _redirect_stdin(stream):
+    stdin = sys.stdin
+    sys.stdin = stream
+    try:
+        yield
+    finally:
+        sys.stdin = stdin
+
+
+@cli.command("batch")
+@click.argument("ops", type=click.File("r"), default="-")
+@click.option(
+    "--fail-fast",
+    is_flag=True,
+    default=False,
+    help="Stop at the first operation that fails",
+)
+def batch(ops, fail_fast=False):
+    """Run many commands in one process.
+
+    Reads one operation per line from a file or stdin, runs it with the
+    same commands and options as the command line, and writes one line of
+    JSON per operation with its exit code and output. All operations
+    share one pooled HTTP session. An operation is a command line, a JSON
+    array of arguments, or a JSON object with "args" and an optional "id"
+    that is copied to its result. Operations can not read from stdin and
+    run without progress bars. The command exits with an error if any
+    operation failed.
+
+    tilesets batch <path/to/ops>
+
+    tilesets batch < ops.txt
+    """
+    failed = 0
+    for index, line in enumerate(ops):
+        try:
+            op = _parse_batch_op(line)
+        except ValueError as e:
+            op_id, args = None, None
+            code, output, error = 2, "", "Invalid operation: {0}".format(e)
+        else:
+            if op is None:
+                continue
+            op_id, args = op
+            code, output, error = _run_batch_op(args)
+
+        result = {"line": index + 1}
+        if op_id is not None:
+            result["id"] = op_id
+        result.update({"args": args, "exit_code": code, "output": output})
+        if error:
+            result["error"] = error
+        click.echo(json.dumps(result))
+
+        if code:
+            failed += 1
+            if fail_fast:
+                break
+
+    if failed:
+        raise errors.TilesetsError("{0} operations failed".format(failed))
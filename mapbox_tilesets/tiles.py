@@ -0,0 +1,388 @@
+"""Tile coverage of GeoJSON geometries
+
+A NumPy replacement for supermercado's burn. Geometries are projected to
+fractional tile coordinates at the target zoom and their coverage is found
+one tile row at a time: tiles crossed by a line or polygon ring are found by
+clipping every segment to the rows it spans, and tiles inside a polygon by
+an even-odd scanline through the middle of every row. As with the
+all_touched rasterization supermercado uses, a tile is covered when a
+geometry reaches into it.
+
+Coverage is returned as spans, (row, first column, last column) triples,
+which are much smaller than the tiles they stand for.
+"""
+
+import numpy as np
+
+# Latitudes are clipped to this just short of the poles before projecting,
+# rows outside the tile grid are dropped afterwards
+_MAX_LATITUDE = 89.9999
+
+
+def _points(coordinates):
+    """Returns the x, y columns of a sequence of GeoJSON positions"""
+    try:
+        points = np.asarray(coordinates, dtype=np.float64)
+    except ValueError:
+        # positions with and without altitude mixed
+        points = np.asarray([c[:2] for c in coordinates], dtype=np.float64)
+    return points.reshape(-1, points.shape[-1] if points.size else 2)[:, :2]
+
+
+def _collect(features):
+    """Sort the parts of features' geometries into points and paths
+
+    Returns
+    -------
+    tuple
+        (points, paths, polygon ids), where a polygon id is -1 for a line
+        and the same for all rings of one polygon
+    """
+    points = []
+    paths = []
+    polygon_ids = []
+    polygon = 0
+    for feature in features:
+        geometry = feature.get("geometry") or {}
+        kind = geometry.get("type")
+        coordinates = geometry.get("coordinates")
+        if not coordinates:
+            continue
+        if kind == "Point":
+            points.append(coordinates)
+        elif kind == "MultiPoint":
+            points.extend(coordinates)
+        elif kind in ("LineString", "MultiLineString"):
+            lines = [coordinates] if kind == "LineString" else coordinates
+            for line in lines:
+                paths.append(_points(line))
+                polygon_ids.append(-1)
+        elif kind in ("Polygon", "MultiPolygon"):
+            polygons = [coordinates] if kind == "Polygon" else coordinates
+            for rings in polygons:
+                for ring in rings:
+                    ring = _points(ring)
+                    if len(ring) and not np.array_equal(ring[0], ring[-1]):
+                        ring = np.vstack([ring, ring[:1]])
+                    paths.append(ring)
+                    polygon_ids.append(polygon)
+                polygon += 1
+    return points, paths, polygon_ids
+
+
+def feature_bounds(feature):
+    """Returns the (west, south, east, north) bounds of a feature
+
+    Only the geometries burn covers are considered. Returns None for a
+    feature without one.
+    """
+    points, paths, polygon_ids = _collect([feature])
+    parts = paths + ([_points(points)] if points else [])
+    parts = [part for part in parts if len(part)]
+    if not parts:
+        return None
+    coordinates = np.concatenate(parts)
+    west, south = coordinates.min(axis=0)
+    east, north = coordinates.max(axis=0)
+    return west, south, east, north
+
+
+def tile_range(bounds, zoom):
+    """Returns the (xmin, ymin, xmax, ymax) tiles that bounds reach into
+
+    The range is inclusive and limited to the tile grid.
+    """
+    west, south, east, north = bounds
+    x, y = _project(np.array([[west, north], [east, south]]), zoom)
+    last = 2**zoom - 1
+    xmin, ymin = np.clip(np.floor([x[0], y[0]]), 0, last).astype(int)
+    xmax, ymax = np.clip(np.floor([x[1], y[1]]), 0, last).astype(int)
+    return int(xmin), int(ymin), int(xmax), int(ymax)
+
+
+def _project(points, zoom):
+    """Project longitude, latitude columns to fractional tile coordinates"""
+    n = 2.0**zoom
+    x = (points[:, 0] + 180.0) / 360.0 * n
+    lat = np.deg2rad(np.clip(points[:, 1], -_MAX_LATITUDE, _MAX_LATITUDE))
+    y = (0.5 - np.log(np.tan(np.pi / 4 + lat / 2)) / (2 * np.pi)) * n
+    return x, y
+
+
+def _expand(first, last):
+    """Repeat the index of each range once per value in it
+
+    Returns
+    -------
+    tuple
+        (index of the range, value) arrays for every value in every range
+    """
+    counts = np.maximum(last - first + 1, 0)
+    index = np.repeat(np.arange(len(first)), counts)
+    offsets = np.cumsum(counts) - counts
+    return index, first[index] + np.arange(counts.sum()) - offsets[index]
+
+
+def _sample_rows(index, rows, sampled):
+    """Keep the (index, row) pairs in rows where the sampled mask is set"""
+    if sampled is None:
+        return index, rows
+    keep = sampled[rows]
+    return index[keep], rows[keep]
+
+
+def _column_spans(rows, xa, xb, size):
+    """Columns of tiles whose interior an x interval in a row reaches into"""
+    degenerate = xa == xb
+    first = np.floor(xa)
+    last = np.where(degenerate, first, np.ceil(xb) - 1)
+    # an interval of no width on a column edge reaches into no tile
+    keep = ~(degenerate & (first == xa)) & (last >= 0) & (first < size)
+    first = np.clip(first, 0, size - 1)
+    last = np.clip(last, 0, size - 1)
+    return rows[keep], first[keep].astype(np.int64), last[keep].astype(np.int64)
+
+
+def _segment_spans(x0, y0, x1, y1, size, sampled=None, row_range=None):
+    """Tiles crossed by segments, as spans"""
+    low, high = row_range or (0, size - 1)
+    ylo = np.minimum(y0, y1)
+    yhi = np.maximum(y0, y1)
+    horizontal = ylo == yhi
+    first = np.floor(ylo)
+    last = np.where(horizontal, first, np.ceil(yhi) - 1)
+    # a horizontal segment on a row edge reaches into no tile
+    last[horizontal & (first == ylo)] = -1
+    first = np.maximum(first, low).astype(np.int64)
+    last = np.minimum(last, high).astype(np.int64)
+
+    segment, rows = _sample_rows(*_expand(first, last), sampled)
+    x0, y0, x1, y1 = x0[segment], y0[segment], x1[segment], y1[segment]
+    ya = np.maximum(rows, ylo[segment])
+    yb = np.minimum(rows + 1, yhi[segment])
+    flat = horizontal[segment]
+    # the slope of a horizontal segment is not used
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (x1 - x0) / (y1 - y0)
+        xa = np.where(flat, x0, x0 + (ya - y0) * slope)
+        xb = np.where(flat, x1, x0 + (yb - y0) * slope)
+    return _column_spans(rows, np.minimum(xa, xb), np.maximum(xa, xb), size)
+
+
+def _fill_spans(x0, y0, x1, y1, polygon, size, sampled=None, row_range=None):
+    """Tiles whose centers are inside polygons, as spans
+
+    Uses the even-odd rule, so holes are left out.
+    """
+    ylo = np.minimum(y0, y1)
+    yhi = np.maximum(y0, y1)
+    # the scanline of row j is y = j + 0.5, a segment crosses it when
+    # ylo <= j + 0.5 < yhi so a vertex on the line is counted once
+    low, high = row_range or (0, size - 1)
+    first = np.maximum(np.ceil(ylo - 0.5), low).astype(np.int64)
+    last = np.minimum(np.ceil(yhi - 0.5) - 1, high).astype(np.int64)
+
+    segment, rows = _sample_rows(*_expand(first, last), sampled)
+    x0, y0, x1, y1 = x0[segment], y0[segment], x1[segment], y1[segment]
+    x = x0 + (rows + 0.5 - y0) * (x1 - x0) / (y1 - y0)
+    order = np.lexsort((x, rows, polygon[segment]))
+    # crossings of a closed ring come in pairs in every row
+    x = x[order].reshape(-1, 2)
+    rows = rows[order][::2]
+    first = np.clip(np.ceil(x[:, 0] - 0.5), 0, size)
+    last = np.clip(np.ceil(x[:, 1] - 0.5) - 1, -1, size - 1)
+    keep = first <= last
+    return rows[keep], first[keep].astype(np.int64), last[keep].astype(np.int64)
+
+
+def union_spans(rows, first, last):
+    """Merge overlapping and adjacent spans
+
+    Returns
+    -------
+    tuple
+        (rows, first, last) arrays of disjoint spans sorted by row and
+        column
+    """
+    if not len(rows):
+        return rows, first, last
+    order = np.lexsort((first, rows))
+    rows, first, last = rows[order], first[order], last[order]
+    # rows are sorted, so a running maximum of this key is the running
+    # maximum of last within each row
+    width = int(last.max()) + 2
+    key = rows.astype(np.int64) * width
+    reach = (np.maximum.accumulate(key + last) - key).astype(last.dtype)
+    starts = np.ones(len(rows), dtype=bool)
+    starts[1:] = (rows[1:] != rows[:-1]) | (first[1:] > reach[:-1] + 1)
+    start = np.flatnonzero(starts)
+    end = np.append(start[1:], len(rows)) - 1
+    return rows[start], first[start], reach[end]
+
+
+def _segments(features, zoom):
+    """Project the points and path segments of features to tile coordinates
+
+    Returns
+    -------
+    tuple
+        (x, y) of the points, and (x0, y0, x1, y1, polygon, part) of the
+        segments, where polygon is the polygon id of a ring's segments or
+        -1 and part numbers every line and polygon
+    """
+    points, paths, polygon_ids = _collect(features)
+    empty = np.empty(0)
+    x, y = _project(_points(points), zoom) if points else (empty, empty)
+    if not paths:
+        empty_ids = np.empty(0, dtype=np.int64)
+        return (x, y), (empty, empty, empty, empty, empty_ids, empty_ids)
+
+    lengths = np.array([len(path) for path in paths])
+    path_x, path_y = _project(np.concatenate(paths), zoom)
+    # every vertex but the last of its path starts a segment
+    ends = np.cumsum(lengths) - 1
+    starts = np.ones(len(path_x), dtype=bool)
+    starts[ends[lengths > 0]] = False
+    segment = np.flatnonzero(starts)
+    polygon_ids = np.array(polygon_ids)
+    # lines are numbered after the polygons
+    parts = polygon_ids.copy()
+    line = polygon_ids < 0
+    parts[line] = polygon_ids.max() + 1 + np.arange(line.sum())
+    polygon = np.repeat(polygon_ids, lengths)[segment]
+    part = np.repeat(parts, lengths)[segment]
+    return (x, y), (
+        path_x[segment],
+        path_y[segment],
+        path_x[segment + 1],
+        path_y[segment + 1],
+        polygon,
+        part,
+    )
+
+
+def _burn_segments(points, segments, size, sampled=None, row_range=None):
+    """Tiles covered by projected points and segments, as spans"""
+    x, y = points
+    x0, y0, x1, y1, polygon, part = segments
+    spans = []
+
+    low, high = row_range or (0, size - 1)
+    keep = (x >= 0) & (x < size) & (y >= low) & (y < high + 1)
+    rows = np.floor(y[keep]).astype(np.int64)
+    columns = np.floor(x[keep]).astype(np.int64)
+    if sampled is not None:
+        hit = sampled[rows]
+        rows, columns = rows[hit], columns[hit]
+    spans.append((rows, columns, columns))
+
+    spans.append(_segment_spans(x0, y0, x1, y1, size, sampled, row_range))
+    ring = (polygon >= 0) & (y0 != y1)
+    spans.append(
+        _fill_spans(
+            x0[ring],
+            y0[ring],
+            x1[ring],
+            y1[ring],
+            polygon[ring],
+            size,
+            sampled,
+            row_range,
+        )
+    )
+    return union_spans(*(np.concatenate(parts) for parts in zip(*spans)))
+
+
+def _bounding_spans(points, segments, size):
+    """Tiles in the bounding range of every point, line and polygon, as spans"""
+    x, y = points
+    x0, y0, x1, y1, polygon, part = segments
+    count = int(part.max()) + 1 if len(part) else 0
+    west = np.full(count, np.inf)
+    north = np.full(count, np.inf)
+    east = np.full(count, -np.inf)
+    south = np.full(count, -np.inf)
+    np.minimum.at(west, part, np.minimum(x0, x1))
+    np.minimum.at(north, part, np.minimum(y0, y1))
+    np.maximum.at(east, part, np.maximum(x0, x1))
+    np.maximum.at(south, part, np.maximum(y0, y1))
+    # a line of a single position has no segments
+    found = np.isfinite(west)
+    west = np.concatenate([x, west[found]])
+    north = np.concatenate([y, north[found]])
+    east = np.concatenate([x, east[found]])
+    south = np.concatenate([y, south[found]])
+
+    xmin, ymin, xmax, ymax = (
+        np.clip(np.floor(a), 0, size - 1).astype(np.int64)
+        for a in (west, north, east, south)
+    )
+    part, rows = _expand(ymin, ymax)
+    return union_spans(rows, xmin[part], xmax[part])
+
+
+def burn_spans(features, zoom, row_range=None):
+    """Find the tiles covered by features at a zoom level
+
+    Parameters
+    ----------
+    features: iterable
+        GeoJSON features with Point, LineString or Polygon geometries, or
+        their Multi variants; other geometries are ignored
+    zoom: int
+        zoom level
+    row_range: tuple
+        inclusive (first, last) range of rows to find covered tiles in,
+        all rows by default. Segments are clipped to it before they are
+        rasterized, so burning a range costs about as much as the tiles
+        in it.
+
+    Returns
+    -------
+    tuple
+        (rows, first, last) arrays of disjoint spans of covered tiles
+    """
+    return _burn_segments(*_segments(features, zoom), 2**zoom, row_range=row_range)
+
+
+def sample_spans(features, zoom, sampled):
+    """Find the tiles covered by features in sampled rows
+
+    Parameters
+    ----------
+    features: iterable
+        GeoJSON features, as for burn_spans
+    zoom: int
+        zoom level
+    sampled: numpy.ndarray
+        boolean mask of the 2**zoom rows to find covered tiles in
+
+    Returns
+    -------
+    tuple
+        (covered, bounds): disjoint spans of the covered tiles in sampled
+        rows, and of the tiles in every row that the bounding range of a
+        point, line or polygon reaches into
+    """
+    points, segments = _segments(features, zoom)
+    size = 2**zoom
+    return (
+        _burn_segments(points, segments, size, sampled),
+        _bounding_spans(points, segments, size),
+    )
+
+
+def burn(features, zoom):
+    """Find the tiles covered by features at a zoom level
+
+    Returns
+    -------
+    numpy.ndarray
+        (N, 3) array of the x, y, z of every covered tile, as returned by
+        supermercado's burn
+    """
+    rows, first, last = burn_spans(features, zoom)
+    span, columns = _expand(first, last)
+    return np.stack(
+        [columns, rows[span], np.full(len(span), zoom, dtype=np.int64)], axis=1
+    )
@@ -0,0 +1,234 @@
+"""Timing of pipeline stages and HTTP requests
+
+Tracing is off unless enabled with enable(), and the helpers here then
+cost next to nothing. Once enabled, span() records one timed event per
+call and stage() adds up the time of many short calls, such as the
+validation of each feature, into a single event. Time spent in a nested
+span or stage is subtracted from the self time of the one around it, so
+the self times of a streaming pipeline show where its time went.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+_tracer = None
+
+
+class _Stat:
+    """Aggregated timings of one span or stage name"""
+
+    __slots__ = ("count", "total", "self", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.self = 0.0
+        self.max = 0.0
+
+    def add(self, count, total, self_time, longest):
+        self.count += count
+        self.total += total
+        self.self += self_time
+        self.max = max(self.max, longest)
+
+
+class Tracer:
+    """Records spans and stages and reports them"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.events = []
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _enter(self):
+        stack = self._stack()
+        stack.append(0.0)
+        return time.perf_counter()
+
+    def _exit(self, start):
+        """Close the innermost frame and return its total and self time"""
+        duration = time.perf_counter() - start
+        stack = self._stack()
+        children = stack.pop()
+        if stack:
+            stack[-1] += duration
+        return duration, duration - children
+
+    def _record(self, name, start, duration, count, total, self_time, longest, args):
+        with self._lock:
+            self.stats.setdefault(name, _Stat()).add(count, total, self_time, longest)
+            self.events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - self.start) * 1e6,
+                    "dur": duration * 1e6,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": args,
+                }
+            )
+
+    @contextlib.contextmanager
+    def span(self, name, **args):
+        start = self._enter()
+        try:
+            yield
+        finally:
+            duration, self_time = self._exit(start)
+            self._record(name, start, duration, 1, duration, self_time, duration, args)
+
+    def summary(self):
+        """Returns a table of the recorded names, longest self time first"""
+        rows = [("stage", "count", "total s", "self s", "max ms")]
+        for name, stat in sorted(self.stats.items(), key=lambda item: -item[1].self):
+            rows.append(
+                (
+                    name,
+                    str(stat.count),
+                    f"{stat.total:.3f}",
+                    f"{stat.self:.3f}",
+                    f"{stat.max * 1000:.1f}",
+                )
+            )
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        return "\n".join(
+            "  ".join(
+                cell.ljust(width) if i == 0 else cell.rjust(width)
+                for i, (cell, width) in enumerate(zip(row, widths))
+            )
+            for row in rows
+        )
+
+    def write(self, path):
+        """Write the recorded events as a Chrome trace JSON file
+
+        The file can be opened in chrome://tracing or https://ui.perfetto.dev
+        """
+        with self._lock:
+            events = sorted(self.events, key=lambda event: event["ts"])
+        with open(path, "w") as dst:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, dst)
+
+
+class _Stage:
+    """Adds up the time of many calls into one event"""
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+        self.first = None
+        self.last = None
+        self.count = 0
+        self.total = 0.0
+        self.self = 0.0
+        self.max = 0.0
+        self._start = None
+
+    def __enter__(self):
+        self._start = self.tracer._enter()
+        if self.first is None:
+            self.first = self._start
+        return self
+
+    def __exit__(self, *exc):
+        duration, self_time = self.tracer._exit(self._start)
+        self.last = self._start + duration
+        self.count += 1
+        self.total += duration
+        self.self += self_time
+        self.max = max(self.max, duration)
+
+    def close(self):
+        """Record the stage, once all of its calls have been made"""
+        if not self.count:
+            return
+        self.tracer._record(
+            self.name,
+            self.first,
+            self.last - self.first,
+            self.count,
+            self.total,
+            self.self,
+            self.max,
+            {"count": self.count, "busy_ms": self.total * 1000},
+        )
+        self.count = 0
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def close(self):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+_END = object()
+
+
+def enable():
+    """Start tracing, returning the tracer or None if it was already on"""
+    global _tracer
+    if _tracer is not None:
+        return None
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable():
+    global _tracer
+    _tracer = None
+
+
+def span(name, **args):
+    """Time a block as one event, e.g. with span("upload"): ..."""
+    if _tracer is None:
+        return contextlib.nullcontext()
+    return _tracer.span(name, **args)
+
+
+def stage(name):
+    """Returns a context manager that adds up the time of every block it
+    wraps into one event, recorded when its close() is called"""
+    if _tracer is None:
+        return _NULL_STAGE
+    return _Stage(_tracer, name)
+
+
+def iterate(name, iterable):
+    """Time every item taken from an iterable as one stage"""
+    if _tracer is None:
+        return iterable
+    return _iterate(_tracer, name, iterable)
+
+
+def _iterate(tracer, name, iterable):
+    timer = _Stage(tracer, name)
+    iterator = iter(iterable)
+    try:
+        while True:
+            with timer:
+                item = next(iterator, _END)
+            if item is _END:
+                # the call that found the end is timed but is not an item
+                timer.count -= 1
+                return
+            yield item
+    finally:
+        timer.close()
@@ -0,0 +1,820 @@
+"""Streaming upload helpers for line-delimited GeoJSON sources"""
+
+import bisect
+import copy
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import queue
+import random
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from mapbox_tilesets import errors, trace, utils
+
+# Serialized features are sent to the upload in blocks of about this size
+BLOCK_SIZE = 1024 * 1024
+
+# Number of blocks the producer may run ahead of the upload
+QUEUE_SIZE = 16
+
+_DONE = object()
+
+# Times a failed part upload is retried, and the statuses worth retrying.
+# A replaced part can be sent again after any of these, but an appended
+# part only after a 429, or a 503 with Retry-After: a 500 or 502 may come
+# after the part was already appended.
+PART_RETRIES = 3
+RETRY_STATUS = utils.RETRY_STATUS
+APPEND_RETRY_STATUS = (429, 503)
+
+# Content types and file name suffixes of the supported compressions
+COMPRESSIONS = {
+    "gzip": ("application/gzip", ".gz"),
+    "zstd": ("application/zstd", ".zst"),
+}
+
+
+def iter_lines(features, validate=True, allow_delete=False, strict=False):
+    """Validate features and serialize them as line-delimited GeoJSON
+
+    Parameters
+    ----------
+    features: iterable
+        GeoJSON features
+    validate: bool
+        validate each feature before serializing it
+    allow_delete: bool
+        also accept changeset delete records
+    strict: bool
+        use the strict jsonschema and geojson validation
+
+    Yields
+    ------
+    bytes
+        one compact JSON feature followed by a newline
+    """
+    validating = trace.stage("validate")
+    serializing = trace.stage("serialize")
+    try:
+        for index, feature in enumerate(trace.iterate("read features", features)):
+            if validate:
+                with validating:
+                    utils.validate_geojson(index, feature, allow_delete, strict=strict)
+            with serializing:
+                line = (json.dumps(feature, separators=(",", ":")) + "\n").encode()
+            yield line
+    finally:
+        validating.close()
+        serializing.close()
+
+
+def iter_blocks(chunks, block_size=BLOCK_SIZE):
+    """Join small byte strings into blocks of at least block_size bytes"""
+    block = []
+    size = 0
+    for chunk in chunks:
+        block.append(chunk)
+        size += len(chunk)
+        if size >= block_size:
+            yield b"".join(block)
+            block = []
+            size = 0
+    if block:
+        yield b"".join(block)
+
+
+def pipelined(iterable, maxsize=QUEUE_SIZE):
+    """Iterate over iterable while it is consumed in a background thread
+
+    The producer thread runs at most maxsize items ahead of the consumer.
+    Exceptions raised by the producer are re-raised to the consumer, and
+    the producer stops when the consumer closes the generator.
+    """
+    items = queue.Queue(maxsize)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(e)
+        else:
+            put(_DONE)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+def iter_file(file, block_size=BLOCK_SIZE):
+    """Read a binary file in blocks"""
+    while True:
+        block = file.read(block_size)
+        if not block:
+            break
+        yield block
+
+
+class MappedLines:
+    """Read-only file object over local line-delimited files
+
+    The files are memory-mapped and read back to back without being parsed,
+    so pre-validated line-delimited GeoJSON can be uploaded as-is. A newline
+    is added after a file that does not end with one to keep the
+    concatenation line-delimited. len() is the number of bytes left to read,
+    which lets MultipartEncoder compute the request body length up front.
+    """
+
+    def __init__(self, paths):
+        self._maps = []
+        segments = []
+        for path in paths:
+            with open(path, "rb") as src:
+                if not os.fstat(src.fileno()).st_size:
+                    continue
+                data = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                data.madvise(mmap.MADV_SEQUENTIAL)
+            self._maps.append(data)
+            segments.append(data)
+            if data[-1:] != b"\n":
+                segments.append(b"\n")
+        self._segments = segments
+        self._offsets = list(
+            itertools.accumulate((len(segment) for segment in segments), initial=0)
+        )
+        self.start = 0
+        self.end = self._offsets[-1]
+        self.pos = 0
+
+    def __len__(self):
+        return self.end - self.pos
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def window(self, start, end):
+        """A file object over the byte range [start, end) of the data"""
+        view = copy.copy(self)
+        view.start = view.pos = start
+        view.end = end
+        view._maps = []
+        return view
+
+    def line_end(self, offset):
+        """Position just after the first newline at or after offset"""
+        if offset >= self.end:
+            return self.end
+        i = bisect.bisect_right(self._offsets, offset) - 1
+        found = self._segments[i].find(b"\n", offset - self._offsets[i])
+        if found < 0:
+            # a file without a final newline is followed by one
+            i += 1
+            found = 0
+        return min(self._offsets[i] + found + 1, self.end)
+
+    def _slices(self, start, end):
+        i = bisect.bisect_right(self._offsets, start) - 1
+        while start < end and i < len(self._segments):
+            base = self._offsets[i]
+            stop = min(end, self._offsets[i + 1])
+            yield memoryview(self._segments[i])[start - base : stop - base]
+            start = stop
+            i += 1
+
+    def iter_blocks(self, block_size=BLOCK_SIZE):
+        """Yield the data from the current position as memoryviews"""
+        while self.pos < self.end:
+            stop = min(self.pos + block_size, self.end)
+            yield from self._slices(self.pos, stop)
+            self.pos = stop
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.end - self.pos
+        stop = min(self.pos + size, self.end)
+        data = b"".join(self._slices(self.pos, stop))
+        self.pos = stop
+        return data
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self.pos - self.start
+        elif whence == os.SEEK_END:
+            offset += self.end - self.start
+        self.pos = min(max(self.start + offset, self.start), self.end)
+        return self.pos - self.start
+
+    def tell(self):
+        return self.pos - self.start
+
+    def iter_lines(self):
+        """Yield the lines from the current position, without newlines"""
+        rest = b""
+        for block in self.iter_blocks():
+            lines = (rest + block).split(b"\n")
+            rest = lines.pop()
+            yield from lines
+        if rest:
+            yield rest
+
+    def close(self):
+        for data in self._maps:
+            try:
+                data.close()
+            except BufferError:
+                # a memoryview of the map is still alive, the map is
+                # closed when it is garbage collected instead
+                pass
+        self._maps = []
+
+
+def iter_mapped_parts(
+    mapped,
+    manifest,
+    part_size,
+    compression=None,
+    validate=False,
+    allow_delete=False,
+    strict=False,
+):
+    """Split memory-mapped line-delimited data into parts at line boundaries
+
+    Like iter_resumable_parts, but parts are byte ranges of the mapped data
+    recorded by offset and size in the manifest. Acknowledged parts are
+    skipped without being read, so a resumed upload starts reading where
+    its unfinished parts begin. Uncompressed parts are windows onto the
+    mapped data rather than temporary files.
+
+    If validate is set, the features of each part are validated before it
+    is yielded, and the manifest also records the range of feature indices
+    of every part so that errors report a feature's index in the input.
+
+    Yields
+    ------
+    tuple
+        (part index, file object) for every part still to be uploaded
+    """
+    validating = trace.stage("validate")
+
+    def check(offset, size, start):
+        """Validate the features of a byte range, returns the index after
+        its last feature"""
+        index = start
+        for line in mapped.window(offset, offset + size).iter_lines():
+            if line.strip():
+                with validating:
+                    utils.validate_geojson(
+                        index, json.loads(line), allow_delete, strict=strict
+                    )
+                index += 1
+        return index
+
+    def make_part(offset, size):
+        window = mapped.window(offset, offset + size)
+        if not compression:
+            return window
+        part = tempfile.TemporaryFile()
+        for block in iter_compressed(window.iter_blocks(), compression):
+            part.write(block)
+        part.seek(0)
+        return part
+
+    try:
+        offset = 0
+        start = 0 if validate else None
+        for index, known in enumerate(manifest.parts[:]):
+            if not known["done"]:
+                if validate:
+                    check(known["offset"], known["size"], known["start"])
+                yield index, make_part(known["offset"], known["size"])
+            offset = known["offset"] + known["size"]
+            start = known["end"]
+
+        while offset < mapped.end:
+            end = mapped.line_end(offset + part_size - 1)
+            size = end - offset
+            stop = check(offset, size, start) if validate else None
+            yield manifest.add_part(start, stop, offset, size), make_part(offset, size)
+            offset = end
+            start = stop
+        if not manifest.parts:
+            yield manifest.add_part(start, start, 0, 0), make_part(0, 0)
+    finally:
+        validating.close()
+
+
+def _compressor(compression):
+    """Returns an object with compress(data) and flush() methods"""
+    if compression == "gzip":
+        return zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    try:
+        from compression import zstd
+
+        return zstd.ZstdCompressor()
+    except ImportError:
+        return utils.load_module("zstandard").ZstdCompressor().compressobj()
+
+
+def iter_compressed(chunks, compression, on_raw=None):
+    """Compress a stream of byte strings with gzip or zstd
+
+    Parameters
+    ----------
+    chunks: iterable
+        byte strings to compress
+    compression: str
+        "gzip" or "zstd"
+    on_raw: callable
+        called with the size of each chunk before it is compressed
+    """
+    compressor = _compressor(compression)
+    for chunk in chunks:
+        if on_raw:
+            on_raw(len(chunk))
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    data = compressor.flush()
+    if data:
+        yield data
+
+
+def iter_upload_blocks(chunks, compression=None, on_raw=None):
+    """Run serialization and compression in their own threads
+
+    Serialized chunks are joined into blocks in one background thread and,
+    if compression is set, compressed in a second one so that compression
+    does not throttle serialization.
+    """
+    blocks = pipelined(iter_blocks(chunks))
+    if compression:
+        blocks = pipelined(iter_compressed(blocks, compression, on_raw))
+    return blocks
+
+
+class TransferStats:
+    """Counts raw and sent bytes to report transfer rates"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.raw = 0
+        self.sent = 0
+
+    def add_raw(self, size):
+        self.raw += size
+
+    def add_sent(self, size):
+        self.sent += size
+
+    def describe(self, item=None):
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        return "raw {:.1f} MB/s, compressed {:.1f} MB/s".format(
+            self.raw / elapsed / 1e6, self.sent / elapsed / 1e6
+        )
+
+
+def multipart_boundary():
+    return uuid.uuid4().hex
+
+
+def multipart_content_type(boundary):
+    return f"multipart/form-data; boundary={boundary}"
+
+
+def multipart_body(chunks, boundary, name="file", filename="file", content_type=None):
+    """Stream a single-file multipart/form-data body
+
+    Produces the same body as requests_toolbelt's MultipartEncoder with
+    fields={name: (filename, file, content_type)}, without knowing the
+    length up front.
+    """
+    headers = (
+        f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+    )
+    if content_type:
+        headers += f"Content-Type: {content_type}\r\n"
+    yield f"--{boundary}\r\n{headers}\r\n".encode("utf-8")
+    yield from chunks
+    yield f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+
+def with_progress(chunks, callback):
+    """Call callback with the size of each chunk once it has been consumed"""
+    for chunk in chunks:
+        yield chunk
+        callback(len(chunk))
+
+
+def iter_parts(chunks, part_size, compression=None):
+    """Split serialized features into temporary part files
+
+    Chunks are never split, so parts end on feature boundaries. Each part
+    holds at least part_size bytes of uncompressed data, except the last.
+    Empty input yields a single empty part.
+
+    Yields
+    ------
+    file
+        temporary file positioned at its start; the caller closes it
+    """
+    part = None
+    compressor = None
+    size = 0
+    count = 0
+    writing = trace.stage("write temp file")
+    try:
+        for chunk in chunks:
+            with writing:
+                if part is None:
+                    part = tempfile.TemporaryFile()
+                    compressor = _compressor(compression) if compression else None
+                    size = 0
+                part.write(compressor.compress(chunk) if compressor else chunk)
+                size += len(chunk)
+                if size >= part_size:
+                    if compressor:
+                        part.write(compressor.flush())
+                    part.seek(0)
+            if size >= part_size:
+                count += 1
+                yield part
+                part = None
+    finally:
+        writing.close()
+    if part is None and not count:
+        part = tempfile.TemporaryFile()
+        compressor = _compressor(compression) if compression else None
+    if part is not None:
+        if compressor:
+            part.write(compressor.flush())
+        part.seek(0)
+        yield part
+
+
+def send_part(
+    s,
+    method,
+    url,
+    file,
+    filename="file",
+    content_type=None,
+    retries=PART_RETRIES,
+    on_progress=None,
+):
+    """Upload one part file, retrying error responses and connections
+    that could not be made
+
+    A part replaced with PUT is sent again after any status in
+    RETRY_STATUS. A part appended with POST is only sent again when the
+    API rejected it without appending it, with a 429 or a 503 with a
+    Retry-After header, or when the connection failed before any of the
+    request was sent. Any other error, a lost connection or a read timeout
+    leaves it unknown whether the part was appended, and is returned or
+    raised rather than risking a duplicate part.
+
+    Parameters
+    ----------
+    on_progress: callable
+        called with the number of newly sent bytes of the part file, and
+        with the negated number of bytes sent by an attempt that is
+        retried
+
+    Returns
+    -------
+        the final response
+    """
+    from requests_toolbelt import MultipartEncoder, MultipartEncoderMonitor
+
+    field = (filename, file, content_type) if content_type else (filename, file)
+    size = file.seek(0, 2)
+    sent = [0]
+    for attempt in range(retries + 1):
+        if sent[0]:
+            on_progress(-sent[0])
+            sent[0] = 0
+        file.seek(0)
+        data = MultipartEncoder(fields={"file": field})
+        if on_progress:
+
+            def callback(monitor):
+                # count the bytes of the part, not of the multipart body
+                read = min(monitor.bytes_read, size)
+                on_progress(read - sent[0])
+                sent[0] = read
+
+            data = MultipartEncoderMonitor(data, callback)
+        try:
+            resp = getattr(s, method)(
+                url,
+                data=data,
+                headers={
+                    "Content-Disposition": "multipart/form-data",
+                    "Content-type": data.content_type,
+                },
+            )
+            if attempt == retries or not _retry_status(method, resp):
+                return resp
+            time.sleep(utils._retry_after(resp, attempt, 1))
+        except Exception as e:
+            if attempt == retries or not _not_sent(e):
+                raise
+            time.sleep(random.uniform(0, 2**attempt))
+
+
+def _retry_status(method, response):
+    """Whether a part can be sent again after an error response"""
+    if method == "put":
+        return response.status_code in RETRY_STATUS
+    if response.status_code == 503:
+        return "Retry-After" in response.headers
+    return response.status_code in APPEND_RETRY_STATUS
+
+
+def _not_sent(error):
+    """Whether a request failed before it could reach the server"""
+    import requests
+    from urllib3.exceptions import ConnectTimeoutError
+
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.ConnectionError):
+        # NewConnectionError and NameResolutionError derive from
+        # ConnectTimeoutError, raised while connecting
+        reason = getattr(error.args[0] if error.args else None, "reason", None)
+        return isinstance(reason, ConnectTimeoutError)
+    return False
+
+
+def upload_parts(
+    s,
+    method,
+    url,
+    parts,
+    workers,
+    filename="file",
+    content_type=None,
+    on_progress=None,
+    on_complete=None,
+):
+    """Upload part files concurrently over a shared session
+
+    Every part but the first is appended with POST. When method is "put"
+    part 0 replaces the existing data and is uploaded before any other part
+    is sent. At most 2 * workers parts are kept on disk at once.
+
+    Parameters
+    ----------
+    parts: iterable
+        (index, file) pairs
+    on_complete: callable
+        called with the index of each part the API has acknowledged
+
+    Returns
+    -------
+        the response of the last part to finish, or None if there were no
+        parts to upload
+    """
+
+    def send(index, part, part_method):
+        try:
+            resp = send_part(
+                s,
+                part_method,
+                url,
+                part,
+                filename,
+                content_type,
+                on_progress=on_progress,
+            )
+        finally:
+            part.close()
+        if resp.status_code != 200:
+            raise errors.TilesetsError(f"Part {index} failed: {resp.text}")
+        if on_complete:
+            on_complete(index)
+        return resp
+
+    resp = None
+    pending = set()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for index, part in parts:
+                if index == 0 and method == "put":
+                    resp = send(index, part, "put")
+                    continue
+                while len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        resp = future.result()
+                pending.add(executor.submit(send, index, part, "post"))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    resp = future.result()
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+    return resp
+
+
+class UploadManifest:
+    """Local checkpoint of the parts of an upload
+
+    Records the feature or input byte range of every part that has been
+    written and whether the API has acknowledged it, so an interrupted upload can
+    be resumed. The manifest is a JSON file that is rewritten atomically
+    after every change.
+    """
+
+    def __init__(self, path, parts=None):
+        self.path = path
+        self.parts = parts or []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, state_dir, key, resume=False):
+        """Open the manifest for key, starting over unless resume is set"""
+        path = os.path.join(state_dir, "uploads", f"{key}.json")
+        parts = None
+        if resume and os.path.exists(path):
+            with open(path) as src:
+                parts = json.load(src)["parts"]
+        return cls(path, parts)
+
+    @property
+    def completed(self):
+        return sum(1 for part in self.parts if part["done"])
+
+    def add_part(self, start, end, offset=None, size=None):
+        """Record a written part
+
+        Parameters
+        ----------
+        start, end: int
+            indices of the first feature in the part and after the last one,
+            None for unvalidated parts of memory-mapped files
+        offset, size: int
+            byte range of the part in memory-mapped input, None for parts
+            of parsed features
+        """
+        with self._lock:
+            self.parts.append(
+                {
+                    "start": start,
+                    "end": end,
+                    "offset": offset,
+                    "size": size,
+                    "done": False,
+                }
+            )
+            self._save()
+            return len(self.parts) - 1
+
+    def complete(self, index):
+        """Record that the API acknowledged a part"""
+        with self._lock:
+            self.parts[index]["done"] = True
+            self._save()
+
+    def remove(self):
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as dst:
+            json.dump({"parts": self.parts}, dst)
+        os.replace(tmp, self.path)
+
+
+def fingerprint(paths, *options):
+    """Fingerprint local input files by path, size and modification time"""
+    digest = hashlib.sha256()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(
+            json.dumps([os.path.abspath(path), stat.st_size, stat.st_mtime_ns]).encode()
+        )
+    digest.update(json.dumps(options).encode())
+    return digest.hexdigest()[:32]
+
+
+def iter_resumable_parts(
+    features,
+    manifest,
+    part_size,
+    compression=None,
+    validate=True,
+    allow_delete=False,
+    strict=False,
+):
+    """Split features into parts, skipping parts the manifest marks done
+
+    Parts already recorded in the manifest are rebuilt from their recorded
+    feature ranges. Features in acknowledged parts are neither validated
+    nor serialized, but they are still read, since inputs such as
+    FeatureCollections can not be read from the middle. Line-delimited
+    files are split with iter_mapped_parts instead, which skips them.
+    Features after the last recorded part are split by size as in
+    iter_parts and recorded as new parts.
+
+    Yields
+    ------
+    tuple
+        (part index, temporary file) for every part still to be uploaded
+    """
+    known = manifest.parts[:]
+    index = 0
+    part = None
+    compressor = None
+    start = 0
+    size = 0
+
+    def finish():
+        if compressor:
+            part.write(compressor.flush())
+        part.seek(0)
+
+    validating = trace.stage("validate")
+    serializing = trace.stage("serialize")
+    writing = trace.stage("write temp file")
+    try:
+        features = trace.iterate("read features", features)
+        for feature_index, feature in enumerate(features):
+            while index < len(known) and feature_index >= known[index]["end"]:
+                index += 1
+            if index < len(known) and known[index]["done"]:
+                continue
+            if part is None:
+                part = tempfile.TemporaryFile()
+                compressor = _compressor(compression) if compression else None
+                start = feature_index
+                size = 0
+            if validate:
+                with validating:
+                    utils.validate_geojson(
+                        feature_index, feature, allow_delete, strict=strict
+                    )
+            with serializing:
+                line = (json.dumps(feature, separators=(",", ":")) + "\n").encode()
+            with writing:
+                part.write(compressor.compress(line) if compressor else line)
+            size += len(line)
+
+            if index < len(known):
+                if feature_index + 1 == known[index]["end"]:
+                    finish()
+                    yield index, part
+                    part = None
+            elif size >= part_size:
+                finish()
+                yield manifest.add_part(start, feature_index + 1), part
+                part = None
+
+        if part is not None:
+            finish()
+            if index < len(known):
+                yield index, part
+            else:
+                yield manifest.add_part(start, feature_index + 1), part
+        elif not manifest.parts:
+            part = tempfile.TemporaryFile()
+            yield manifest.add_part(0, 0), part
+    finally:
+        validating.close()
+        serializing.close()
+        writing.close()
@@ -1,17 +1,25 @@
+import contextlib
+import functools
 import importlib
+import itertools
+import math
 import os
+import random
 import re
-
-import numpy as np
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from click import ClickException
-from jsonschema import validate, ValidationError
-from requests import Session
 
 import mapbox_tilesets
-import geojson
+from mapbox_tilesets import errors, trace
 import json
 
+# jsonschema, geojson, requests, NumPy and multiprocessing are imported
+# where they are used so that commands which do not need them start
+# without loading them.
+
 
 def load_module(modulename):
     """Dynamically imports a module and throws a readable exception if not found"""
@@ -41,20 +49,387 @@ def _get_token(token=None):
     )
 
 
+_TOKEN_PARAM = re.compile(r"([?&])access_token=[^&>\s]*(&?)")
+
+
+def _strip_token(value):
+    """Remove access_token parameters from the URLs in a string"""
+    return _TOKEN_PARAM.sub(
+        lambda match: match.group(1) if match.group(2) else "", value
+    )
+
+
 def _get_api():
     """Get Mapbox tileset API base URL from environment"""
     return os.environ.get("MAPBOX_API", "https://api.mapbox.com")
 
 
+def _get_state_dir():
+    """Get the directory for local upload state from environment"""
+    state_home = os.environ.get("XDG_STATE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".local", "state"
+    )
+    return os.environ.get(
+        "TILESETS_STATE_DIR", os.path.join(state_home, "mapbox-tilesets")
+    )
+
+
+def _get_cache_dir():
+    """Get the directory for cached API responses from environment"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.environ.get(
+        "TILESETS_CACHE_DIR", os.path.join(cache_home, "mapbox-tilesets")
+    )
+
+
+def _get_cached_session(s):
+    """Wrap a session in the response cache configured by environment
+
+    TILESETS_CACHE_TTL is the number of seconds a cached response is used
+    without revalidating it, and TILESETS_CACHE_MAX_SIZE the number of
+    bytes the cache is evicted down to.
+    """
+    from mapbox_tilesets import cache
+
+    return cache.CachedSession.open(
+        s,
+        _get_cache_dir(),
+        ttl=_get_env_number("TILESETS_CACHE_TTL", cache.TTL, float),
+        max_size=_get_env_number("TILESETS_CACHE_MAX_SIZE", cache.MAX_SIZE),
+    )
+
+
+# Statuses retried by the session, and the methods that are safe to retry.
+# Uploads are POST or PUT with streamed bodies and retry parts themselves.
+RETRY_STATUS = (429, 500, 502, 503, 504)
+RETRY_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "DELETE"])
+
+_sessions = {}
+
+
+@functools.cache
+def _get_retry_class():
+    """Returns a urllib3 Retry with full jitter on the exponential backoff
+
+    Retries wait a random time between 0 and the exponential backoff,
+    unless the response has a Retry-After header, which urllib3 respects
+    as is.
+    """
+    from urllib3.util.retry import Retry
+
+    class _JitteredRetry(Retry):
+        def get_backoff_time(self):
+            return random.uniform(0, super().get_backoff_time())
+
+    return _JitteredRetry
+
+
+@functools.cache
+def _get_adapter_class():
+    """Returns an HTTPAdapter that times every request it sends
+
+    Each request, including its retries, is recorded as an "http <METHOD>"
+    span with the path of its URL, never the query and its access token.
+    """
+    from urllib.parse import urlsplit
+
+    from requests.adapters import HTTPAdapter
+
+    class _TracedAdapter(HTTPAdapter):
+        def send(self, request, **kwargs):
+            path = urlsplit(request.url).path
+            with trace.span("http " + request.method, path=path):
+                return super().send(request, **kwargs)
+
+    return _TracedAdapter
+
+
+def _get_env_number(name, default, convert=int):
+    """Get a non-negative number from environment"""
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        number = convert(value)
+    except ValueError:
+        number = -1
+    if number < 0:
+        raise mapbox_tilesets.errors.TilesetsError(
+            f"{name} must be a non-negative number, got {value!r}"
+        )
+    return number
+
+
+def _get_http_config():
+    """Get connection pool size, retries and backoff factor from environment"""
+    return (
+        max(1, _get_env_number("TILESETS_POOL_SIZE", 10)),
+        _get_env_number("TILESETS_MAX_RETRIES", 3),
+        _get_env_number("TILESETS_BACKOFF_FACTOR", 0.5, float),
+    )
+
+
+def _get_adapter(pool_size=None):
+    """Get an HTTP adapter with the configured pool size and retry policy
+
+    Parameters
+    ----------
+    pool_size: int
+        minimum number of connections kept alive per host
+
+    Returns
+    -------
+    HTTPAdapter
+    """
+    configured_size, retries, backoff_factor = _get_http_config()
+    retry = _get_retry_class()(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=RETRY_METHODS,
+        raise_on_status=False,
+    )
+    return _get_adapter_class()(
+        pool_connections=1,
+        pool_maxsize=max(configured_size, pool_size or 0),
+        max_retries=retry,
+    )
+
+
+def _mount_adapter(s, adapter):
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+
+
+@contextlib.contextmanager
+def _pool_size(s, size):
+    """Keep up to size connections per host alive on a session in a block
+
+    The session's adapters are restored afterwards, so later requests on
+    the shared session, such as other operations of a batch, keep the
+    configured pool size.
+    """
+    adapters = {prefix: s.get_adapter(prefix) for prefix in ("https://", "http://")}
+    adapter = _get_adapter(size)
+    _mount_adapter(s, adapter)
+    try:
+        yield s
+    finally:
+        for prefix, original in adapters.items():
+            s.mount(prefix, original)
+        adapter.close()
+
+
 def _get_session(
     application=mapbox_tilesets.__name__, version=mapbox_tilesets.__version__
 ):
-    """Get a configured session"""
-    s = Session()
-    s.headers.update({"user-agent": "{}/{}".format(application, version)})
+    """Get the configured session shared by all requests in this process
+
+    Connections are kept alive in a pool sized by TILESETS_POOL_SIZE.
+    Connection errors and 429/5xx responses to idempotent requests are
+    retried up to TILESETS_MAX_RETRIES times with jittered exponential
+    backoff scaled by TILESETS_BACKOFF_FACTOR, or after the delay a
+    Retry-After header asks for.
+    """
+    from requests import Session
+
+    key = (application, version) + _get_http_config()
+    s = _sessions.get(key)
+    if s is None:
+        s = Session()
+        s.headers.update({"user-agent": "{}/{}".format(application, version)})
+        _mount_adapter(s, _get_adapter())
+        s = _sessions.setdefault(key, s)
     return s
 
 
+def _iter_concurrent(func, items, workers):
+    """Call func on every item in a thread pool and yield results as they complete
+
+    Items are read lazily and at most 2 * workers calls are pending at
+    once, so a long input is never held in memory.
+
+    Parameters
+    ----------
+    func: callable
+        called with one item at a time
+    items: iterable
+    workers: int
+        number of concurrent calls
+
+    Yields
+    ------
+        the return value of each call, in the order the calls complete
+    """
+    pending = set()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for item in items:
+                while len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                pending.add(executor.submit(func, item))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+# Times a rate limited request is retried by _request_with_backoff
+RATE_LIMIT_RETRIES = 5
+
+
+class _Throttle:
+    """A pause shared by concurrent requests
+
+    When one request is rate limited, every request waiting on the
+    throttle holds off until the pause has passed instead of adding to
+    the load that caused it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._until = 0.0
+
+    def wait(self):
+        with self._lock:
+            delay = self._until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        with self._lock:
+            self._until = max(self._until, time.monotonic() + seconds)
+
+
+def _retry_after(response, attempt, backoff_factor):
+    """Seconds to wait before retrying a rate limited request
+
+    Uses the Retry-After header when it holds a number of seconds,
+    otherwise a jittered exponential backoff.
+    """
+    value = response.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return random.uniform(0, backoff_factor * 2**attempt)
+
+
+def _request_with_backoff(
+    s, method, url, throttle=None, retries=RATE_LIMIT_RETRIES, **kwargs
+):
+    """Send a request, retrying it while the API responds with 429
+
+    Non-idempotent requests are not retried by the session, but a 429
+    response means the request was not processed, so it is safe to send
+    again.
+
+    Parameters
+    ----------
+    s: requests.Session
+    method: str
+        name of the session method, e.g. "post"
+    throttle: _Throttle
+        pause shared with other concurrent requests
+    retries: int
+        times a rate limited request is retried
+
+    Returns
+    -------
+        the first response that was not rate limited, or the last one
+    """
+    backoff_factor = _get_http_config()[2]
+    throttle = throttle or _Throttle()
+    for attempt in range(retries + 1):
+        throttle.wait()
+        r = getattr(s, method)(url, **kwargs)
+        if r.status_code != 429 or attempt == retries:
+            return r
+        throttle.pause(_retry_after(r, attempt, backoff_factor))
+
+
+# Seconds between job polls, growing while the job stage stays the same
+JOB_POLL_INTERVAL = 1.0
+JOB_POLL_MAX_INTERVAL = 30.0
+JOB_FINAL_STAGES = ("success", "failed")
+
+
+def _wait_for_job(
+    s,
+    url,
+    timeout=None,
+    interval=JOB_POLL_INTERVAL,
+    max_interval=JOB_POLL_MAX_INTERVAL,
+    on_stage=None,
+):
+    """Poll a job until it reaches a final stage
+
+    The delay between polls starts at interval, doubles after every poll
+    that finds the job in the same stage up to max_interval, and is reset
+    when the stage changes. Each delay is jittered so that many waiting
+    processes do not poll in lockstep.
+
+    Parameters
+    ----------
+    s: requests.Session
+        session reused for every poll
+    url: str
+        URL of the job
+    timeout: float
+        seconds to wait before giving up, or None to wait indefinitely
+    on_stage: callable
+        called with the job every time its stage changes
+
+    Returns
+    -------
+    dict
+        the job in its final stage
+
+    Raises
+    ------
+    TilesetsError
+        if a poll fails
+    JobTimeoutError
+        if the job has not finished within timeout seconds
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    stage = None
+    delay = interval
+    while True:
+        r = s.get(url)
+        if r.status_code != 200:
+            raise errors.TilesetsError(r.text)
+
+        job = r.json()
+        if job.get("stage") != stage:
+            stage = job.get("stage")
+            delay = interval
+            if on_stage:
+                on_stage(job)
+        else:
+            delay = min(delay * 2, max_interval)
+        if stage in JOB_FINAL_STAGES:
+            return job
+
+        pause = delay * random.uniform(0.5, 1)
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise errors.JobTimeoutError(
+                    "Job {0} is still {1} after {2} seconds".format(
+                        job.get("id"), stage, timeout
+                    )
+                )
+            pause = min(pause, remaining)
+        time.sleep(pause)
+
+
 def validate_tileset_id(tileset_id):
     """Assess if a Mapbox tileset_id is valid
 
@@ -75,6 +450,8 @@ def validate_tileset_id(tileset_id):
 
 
 def geojson_validate(index, feature):
+    import geojson
+
     geojsonFeature = geojson.loads(json.dumps(feature))
     if not geojsonFeature.is_valid:
         raise mapbox_tilesets.errors.TilesetsError(
@@ -82,173 +459,417 @@ def geojson_validate(index, feature):
         )
 
 
-def validate_geojson(index, feature, allow_delete=False):
-    if allow_delete:
-        delete_schema = {
-            "definitions": {},
-            "$schema": "http://json-schema.org/draft-07/schema#",
-            "$id": "http://example.com/root.json",
+GEOJSON_DELETE_SCHEMA = {
+    "definitions": {},
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "$id": "http://example.com/root.json",
+    "type": "object",
+    "title": "GeoJSON Delete Schema",
+    "required": ["delete"],
+    "properties": {
+        "delete": {
+            "$id": "#/properties/delete",
+            "const": True,
+            "title": "The Delete Schema",
+            "examples": [True],
+        },
+    },
+}
+
+GEOJSON_SCHEMA = {
+    "definitions": {},
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "$id": "http://example.com/root.json",
+    "type": "object",
+    "title": "GeoJSON Schema",
+    "required": ["type", "geometry", "properties"],
+    "properties": {
+        "type": {
+            "$id": "#/properties/type",
+            "type": "string",
+            "title": "The Type Schema",
+            "default": "",
+            "examples": ["Feature"],
+            "pattern": "^(.*)$",
+        },
+        "geometry": {
+            "$id": "#/properties/geometry",
             "type": "object",
-            "title": "GeoJSON Delete Schema",
-            "required": ["delete"],
+            "title": "The Geometry Schema",
+            "required": ["type", "coordinates"],
             "properties": {
-                "delete": {
-                    "$id": "#/properties/delete",
-                    "const": True,
-                    "title": "The Delete Schema",
-                    "examples": [True],
+                "type": {
+                    "$id": "#/properties/geometry/properties/type",
+                    "type": "string",
+                    "title": "The Type Schema",
+                    "default": "",
+                    "examples": ["Point"],
+                    "pattern": "^(.*)$",
                 },
-            },
-        }
-
-        try:
-            validate(instance=feature, schema=delete_schema)
-            return
-        except:
-            pass
-
-    schema = {
-        "definitions": {},
-        "$schema": "http://json-schema.org/draft-07/schema#",
-        "$id": "http://example.com/root.json",
-        "type": "object",
-        "title": "GeoJSON Schema",
-        "required": ["type", "geometry", "properties"],
-        "properties": {
-            "type": {
-                "$id": "#/properties/type",
-                "type": "string",
-                "title": "The Type Schema",
-                "default": "",
-                "examples": ["Feature"],
-                "pattern": "^(.*)$",
-            },
-            "geometry": {
-                "$id": "#/properties/geometry",
-                "type": "object",
-                "title": "The Geometry Schema",
-                "required": ["type", "coordinates"],
-                "properties": {
-                    "type": {
-                        "$id": "#/properties/geometry/properties/type",
-                        "type": "string",
-                        "title": "The Type Schema",
-                        "default": "",
-                        "examples": ["Point"],
-                        "pattern": "^(.*)$",
-                    },
-                    "coordinates": {
-                        "$id": "#/properties/geometry/properties/coordinates",
-                        "type": "array",
-                        "title": "The Coordinates Schema",
-                    },
+                "coordinates": {
+                    "$id": "#/properties/geometry/properties/coordinates",
+                    "type": "array",
+                    "title": "The Coordinates Schema",
                 },
             },
-            "properties": {
-                "$id": "#/properties/properties",
-                "type": "object",
-                "title": "The Properties Schema",
-            },
         },
-    }
+        "properties": {
+            "$id": "#/properties/properties",
+            "type": "object",
+            "title": "The Properties Schema",
+        },
+    },
+}
 
-    try:
-        validate(instance=feature, schema=schema)
-    except ValidationError as e:
-        raise ClickException(e)
-    geojson_validate(index, feature)
 
+@functools.cache
+def _get_validator(name):
+    """Returns a compiled Draft 7 validator for a GeoJSON schema
 
-def _convert_precision_to_zoom(precision):
-    """Converts precision to zoom level based on the minimum zoom
+    Schemas are checked and compiled once per process instead of once per
+    feature.
 
     Parameters
     ----------
-    precision: string
-        precision level
+    name: str
+        "feature" or "delete"
 
     Returns
     -------
-        zoom level
+        jsonschema.Draft7Validator
+    """
+    from jsonschema import Draft7Validator
+
+    schema = GEOJSON_DELETE_SCHEMA if name == "delete" else GEOJSON_SCHEMA
+    Draft7Validator.check_schema(schema)
+    return Draft7Validator(schema)
+
+
+# geojson rounds coordinates to this many places before comparing ring ends
+_COORDINATE_PRECISION = 6
+
+_NUMBER = (int, float)
+
+_PATTERN = re.compile("^(.*)$")
+
+
+def _matches_feature_schema(feature):
+    """Fast equivalent of validating feature against GEOJSON_SCHEMA"""
+    if not isinstance(feature, dict):
+        return False
+    geometry = feature.get("geometry")
+    properties = feature.get("properties")
+    feature_type = feature.get("type")
+    if not isinstance(geometry, dict) or not isinstance(properties, dict):
+        return False
+    geometry_type = geometry.get("type")
+    return (
+        isinstance(feature_type, str)
+        and isinstance(geometry_type, str)
+        and isinstance(geometry.get("coordinates"), list)
+        and _PATTERN.search(feature_type) is not None
+        and _PATTERN.search(geometry_type) is not None
+    )
+
+
+def _check_position(coord):
+    if not isinstance(coord, list):
+        return "each position must be a list"
+    if len(coord) not in (2, 3):
+        return "a position must have exactly 2 or 3 values"
+    for number in coord:
+        if not isinstance(number, _NUMBER):
+            if isinstance(number, list):
+                return "a position cannot have inner positions"
+            return f"{number!r} is not a JSON compliant number"
+        if not math.isfinite(number):
+            # the message the geojson library raises in strict validation
+            return f"Number '{json.dumps(number)}' is not JSON compliant"
+
+
+def _check_positions(coords):
+    for coord in coords:
+        error = _check_position(coord)
+        if error:
+            return error
+
+
+def _check_line_string(coord):
+    if not isinstance(coord, list):
+        return "each line must be a list of positions"
+    if len(coord) < 2:
+        return 'the "coordinates" member must be an array of two or more positions'
+    return _check_positions(coord)
+
+
+def _same_position(a, b):
+    if a == b:
+        return True
+    return [round(v, _COORDINATE_PRECISION) for v in a] == [
+        round(v, _COORDINATE_PRECISION) for v in b
+    ]
+
+
+def _check_polygon(coord):
+    if not isinstance(coord, list):
+        return "Each polygon must be a list of linear rings"
+    if not all(isinstance(ring, list) for ring in coord):
+        return "Each element of a polygon's coordinates must be a list"
+    if not all(len(ring) >= 4 for ring in coord):
+        return "Each linear ring must contain at least 4 positions"
+    for ring in coord:
+        error = _check_positions(ring)
+        if error == "each position must be a list":
+            return "Each linear ring must be a list of positions"
+        if error:
+            return error
+    if not all(_same_position(ring[0], ring[-1]) for ring in coord):
+        return "Each linear ring must end where it started"
+
+
+def _check_each(check):
+    """Checks every member of a multi-geometry, reporting all errors"""
+
+    def check_list(coords):
+        if not isinstance(coords, list):
+            return "each position must be a list"
+        errors = [check(coord) for coord in coords]
+        return "".join(error for error in errors if error)
+
+    return check_list
+
+
+_GEOMETRY_CHECKS = {
+    "Point": _check_position,
+    "MultiPoint": _check_each(_check_position),
+    "LineString": _check_line_string,
+    "MultiLineString": _check_each(_check_line_string),
+    "Polygon": _check_polygon,
+    "MultiPolygon": _check_each(_check_polygon),
+}
+
+
+def _geometry_errors(geometry):
+    """Returns the validation error message for a geometry, if any"""
+    if not isinstance(geometry, dict):
+        return "a geometry must be an object"
+    geometry_type = geometry.get("type")
+    if geometry_type == "GeometryCollection":
+        errors = [_geometry_errors(g) for g in geometry.get("geometries") or []]
+        return "".join(error for error in errors if error)
+    check = _GEOMETRY_CHECKS.get(geometry_type)
+    if check is None:
+        return f"{geometry_type!r} is not a valid geometry type"
+    return check(geometry.get("coordinates"))
+
+
+def fast_geojson_validate(index, feature):
+    """Validates the geometry of a feature without leaving Python dicts
+
+    Applies the same checks as geojson_validate (geometry type, coordinate
+    nesting, minimum position counts, position arity and ring closure) and
+    raises the same errors, but walks the parsed feature directly instead
+    of round-tripping it through json.dumps and geojson.loads. Unlike
+    geojson, position arity is checked for polygons too.
 
+    Parameters
+    ----------
+    index: int
+        feature number used in error messages
+    feature: dict
+        GeoJSON Feature or bare geometry
     """
-    if precision == "10m":
-        return 6
-    elif precision == "1m":
-        return 11
-    elif precision == "30cm":
-        return 14
-    else:
-        return 17
+    geometry = feature["geometry"] if "geometry" in feature else feature
+    if not geometry:
+        return
+    error = _geometry_errors(geometry)
+    if error:
+        raise mapbox_tilesets.errors.TilesetsError(
+            f"Error in feature number {index}: " + error
+        )
+
+
+def _schema_error(validator, feature):
+    """Returns the error jsonschema.validate would raise for a feature"""
+    from jsonschema.exceptions import best_match
 
+    return ClickException(str(best_match(validator.iter_errors(feature))))
 
-def _tile2lng(tile_x, zoom):
-    """Returns tile longitude
+
+def validate_geojson(index, feature, allow_delete=False, strict=False):
+    """Validates a GeoJSON feature, raising an error if it is invalid
 
     Parameters
     ----------
-    tile_x: int
-        x coordinate
-    zoom: int
-        zoom level
+    index: int
+        feature number used in error messages
+    feature: dict
+        GeoJSON Feature
+    allow_delete: bool
+        also accept changeset delete records
+    strict: bool
+        validate with jsonschema and the geojson library instead of the
+        native fast path
+    """
+    if strict:
+        if allow_delete and _get_validator("delete").is_valid(feature):
+            return
+
+        validator = _get_validator("feature")
+        if not validator.is_valid(feature):
+            raise _schema_error(validator, feature)
+        geojson_validate(index, feature)
+        return
+
+    if allow_delete and isinstance(feature, dict) and feature.get("delete") is True:
+        return
+    if not _matches_feature_schema(feature):
+        # report schema errors exactly as the strict path does
+        raise _schema_error(_get_validator("feature"), feature)
+    fast_geojson_validate(index, feature)
+
+
+def _is_line_delimited(path):
+    """Returns True if a file holds one GeoJSON Feature per line"""
+    with open(path, "rb") as src:
+        for line in src:
+            if line.strip():
+                try:
+                    obj = json.loads(line)
+                except ValueError:
+                    return False
+                return isinstance(obj, dict) and obj.get("type") == "Feature"
+    return False
+
+
+def _validate_geojson_range(path, start, end, allow_delete, strict):
+    """Validates the lines of a file that start within a byte range
 
     Returns
     -------
-        longitude
+    tuple
+        (number of features before the first invalid one, the invalid line
+        or None)
     """
-    return ((tile_x / 2**zoom) * 360.0) - 180.0
-
+    count = 0
+    with open(path, "rb") as src:
+        if start:
+            # the line that straddles start belongs to the previous range
+            src.seek(start - 1)
+            src.readline()
+        position = src.tell()
+        while position < end:
+            line = src.readline()
+            if not line:
+                break
+            position += len(line)
+            if not line.strip():
+                continue
+            try:
+                validate_geojson(count, json.loads(line), allow_delete, strict)
+            except Exception:
+                return count, line
+            count += 1
+    return count, None
+
+
+def validate_geojson_files(
+    paths, workers, allow_delete=False, strict=False, chunk_size=None
+):
+    """Validates line-delimited GeoJSON files in a process pool
 
-def _tile2lat(tile_y, zoom):
-    """Returns tile latitude
+    The files are split into byte ranges on line boundaries and each range
+    is validated in a separate process. The first invalid feature is then
+    validated again in this process with its index in the whole input, so
+    the error raised is the same one a serial pass would raise.
 
     Parameters
     ----------
-    tile_y: int
-        y coordinate
-    zoom: int
-        zoom level
+    paths: list
+        paths to local files
+    workers: int
+        number of worker processes
+    allow_delete: bool
+        also accept changeset delete records
+    strict: bool
+        use the strict jsonschema and geojson validation
+    chunk_size: int
+        size of the byte ranges, chosen from the input size by default
 
     Returns
     -------
-        latitude
+        number of features validated, or None if the files are not
+        line-delimited GeoJSON features and must be validated serially
     """
-    n = np.pi - 2 * np.pi * tile_y / 2**zoom
-    return (180.0 / np.pi) * np.arctan(0.5 * (np.exp(n) - np.exp(-n)))
+    if not all(_is_line_delimited(path) for path in paths):
+        return None
+
+    sizes = [os.path.getsize(path) for path in paths]
+    if chunk_size is None:
+        chunk_size = min(64 << 20, max(1 << 20, sum(sizes) // (workers * 4) + 1))
+    ranges = [
+        (path, start, min(start + chunk_size, size))
+        for path, size in zip(paths, sizes)
+        for start in range(0, size, chunk_size)
+    ]
+    if not ranges:
+        return 0
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    total = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            _validate_geojson_range,
+            *zip(*ranges),
+            itertools.repeat(allow_delete),
+            itertools.repeat(strict),
+        )
+        for count, line in results:
+            total += count
+            if line is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+                validate_geojson(total, json.loads(line), allow_delete, strict)
+                # validation is deterministic, this is only reached if the
+                # feature passed validation in this process
+                raise mapbox_tilesets.errors.TilesetsError(
+                    f"Error in feature number {total}"
+                )
+    return total
 
 
-def _calculate_tile_area(tile):
-    """Returns tile area in square kilometers
+def _convert_precision_to_zoom(precision):
+    """Converts precision to zoom level based on the minimum zoom
 
     Parameters
     ----------
-    tile: list
-        tile in format [x,y,z]
+    precision: string
+        precision level
 
     Returns
     -------
-        area of tile
+        zoom level
 
     """
-    EARTH_RADIUS = 6371.0088
-    left = np.deg2rad(_tile2lng(tile[:, 0], tile[:, 2]))
-    top = np.deg2rad(_tile2lat(tile[:, 1], tile[:, 2]))
-    right = np.deg2rad(_tile2lng(tile[:, 0] + 1, tile[:, 2]))
-    bottom = np.deg2rad(_tile2lat(tile[:, 1] + 1, tile[:, 2]))
-    return (
-        (np.pi / np.deg2rad(180))
-        * EARTH_RADIUS**2
-        * np.abs(np.sin(top) - np.sin(bottom))
-        * np.abs(left - right)
-    )
+    if precision == "10m":
+        return 6
+    elif precision == "1m":
+        return 11
+    elif precision == "30cm":
+        return 14
+    else:
+        return 17
 
 
 def calculate_tiles_area(features, precision):
     """Calculates the area of tiles
 
+    See mapbox_tilesets.area.calculate_tiles_area, which also takes a
+    batch size and a number of worker processes.
+
     Parameters
     ----------
-    features: list
+    features: iterable
         features from GeoJSON sources and coordinates
     precision: string
         precision level
@@ -257,8 +878,6 @@ def calculate_tiles_area(features, precision):
     -------
         total area of all tiles in square kilometers
     """
-    burn = load_module("supermercado.burntiles").burn
+    from mapbox_tilesets import area
 
-    zoom = _convert_precision_to_zoom(precision)
-    tiles = burn(features, zoom)
-    return np.sum(_calculate_tile_area(tiles))
+    return area.calculate_tiles_area(features, precision)
@@ -0,0 +1,165 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from mapbox_tilesets import area
+from mapbox_tilesets.area import (
+    _TileSet,
+    _calculate_tile_area,
+    _row_areas,
+    _row_bands,
+    approximate_tiles_area,
+    calculate_tiles_area,
+)
+
+
+def test_calculate_tiles_area_in_batches():
+    filename = "tests/fixtures/precision-testing.ldgeojson"
+    with open(filename) as f:
+        features = json.load(f)
+    area = round(calculate_tiles_area(iter(features), "1m", batch_size=2))
+    assert area == 2562
+
+
+def test_calculate_tiles_area_no_features():
+    assert calculate_tiles_area(iter([]), "10m") == 0
+
+
+def test_tile_set_deduplicates():
+    tiles = _TileSet(4)
+    tiles.add(np.array([2, 2]), np.array([1, 3]), np.array([1, 6]))
+    tiles.add(np.array([2, 15]), np.array([0, 0]), np.array([4, 0]))
+    assert len(tiles) == 8
+    assert [a.tolist() for a in tiles.spans()] == [[2, 15], [0, 0], [6, 0]]
+
+
+def test_row_areas():
+    tiles = np.array([[0, 3, 4], [7, 3, 4], [5, 9, 4]])
+    assert np.allclose(_row_areas(4)[[3, 3, 9]], _calculate_tile_area(tiles))
+    assert _row_areas(4) is _row_areas(4)
+    # the rows of the grid add up to the area of the Web Mercator square
+    assert round(_row_areas(4).sum() * 2**4) == round(
+        _calculate_tile_area(np.array([[0, 0, 0]]))[0]
+    )
+
+
+def test_calculate_tiles_area_workers():
+    filename = "tests/fixtures/precision-testing.ldgeojson"
+    with open(filename) as f:
+        features = json.load(f)
+    area = round(calculate_tiles_area(iter(features), "1m", workers=2))
+    assert area == 2562
+
+
+def test_calculate_tiles_area_workers_large_feature():
+    ring = [[-60, 50], [60, 50], [60, -50], [-60, -50], [-60, 50]]
+    features = [
+        {
+            "type": "Feature",
+            "properties": {},
+            "geometry": {"type": "Polygon", "coordinates": [ring]},
+        },
+        {
+            "type": "Feature",
+            "properties": {},
+            "geometry": {"type": "Point", "coordinates": [0, 0]},
+        },
+        {
+            "type": "Feature",
+            "properties": {},
+            "geometry": {"type": "Point", "coordinates": [100, 0]},
+        },
+    ]
+    serial = calculate_tiles_area(features, "1m")
+    assert calculate_tiles_area(features, "1m", workers=2) == serial
+
+
+def test_calculate_tiles_area_workers_split_large_feature(monkeypatch):
+    ring = [[-60, 50], [60, 50], [60, -50], [-60, -50], [-60, 50]]
+    features = [
+        {
+            "type": "Feature",
+            "properties": {},
+            "geometry": {"type": "Polygon", "coordinates": [ring]},
+        }
+    ]
+    burned = []
+    calculate_band_spans = area._calculate_band_spans
+
+    def record(path, zoom, row_range, batch_size):
+        spans = calculate_band_spans(path, zoom, row_range, batch_size)
+        burned.append((row_range, len(spans[0])))
+        return spans
+
+    monkeypatch.setattr(area, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(area, "_calculate_band_spans", record)
+    serial = calculate_tiles_area(features, "1m")
+    assert calculate_tiles_area(features, "1m", workers=2) == serial
+
+    # the polygon is burned in 8 bands, each one only in its own rows
+    assert len(burned) == 2 * area.SHARD_BANDS
+    rows = sum(count for row_range, count in burned)
+    assert rows == len(area._covered_tiles(features, 11).spans()[0])
+    assert max(count for row_range, count in burned) < rows / 4
+
+
+def test_row_bands():
+    assert _row_bands(np.array([100]), np.array([1099]), 4).tolist() == [
+        100,
+        350,
+        600,
+        850,
+    ]
+    # rows that many features reach into get narrower bands
+    starts = _row_bands(np.array([0, 0, 0, 500]), np.array([0, 0, 0, 999]), 4)
+    assert starts[0] == 0 and starts[1] > 500
+    assert _row_bands(np.array([5]), np.array([5]), 4).tolist() == [5]
+
+
+def test_calculate_tiles_area_global_extent():
+    ring = [[-179, 84], [179, 84], [179, -84], [-179, -84], [-179, 84]]
+    features = [
+        {
+            "type": "Feature",
+            "properties": {},
+            "geometry": {"type": "Polygon", "coordinates": [ring]},
+        }
+    ]
+    # billions of tiles at zoom 17, counted from one span per row
+    fine = calculate_tiles_area(features, "1cm")
+    coarse = calculate_tiles_area(features, "10m")
+    assert 0.99 < fine / coarse <= 1
+
+
+def test_approximate_tiles_area():
+    with open("tests/fixtures/twostates.ldgeojson") as src:
+        features = [json.loads(line) for line in src]
+    exact = calculate_tiles_area(features, "1m")
+    approximate = approximate_tiles_area(iter(features), "1m", seed=0)
+    assert approximate["low"] <= exact <= approximate["high"]
+    assert approximate["high"] <= approximate["upper_bound"]
+
+    # every row is burned when the grid has no more rows than are sampled
+    approximate = approximate_tiles_area(features, "10m")
+    assert approximate["estimate"] == calculate_tiles_area(features, "10m")
+    assert approximate["low"] == approximate["high"] == approximate["estimate"]
+
+
+def test_approximate_tiles_area_overlapping():
+    ring = [[0, 40], [10, 40], [10, 50], [0, 50], [0, 40]]
+    features = [
+        {
+            "type": "Feature",
+            "properties": {},
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [[[x + i * 0.5, y] for x, y in ring]],
+            },
+        }
+        for i in range(10)
+    ]
+    exact = calculate_tiles_area(features, "1cm")
+    for seed in range(5):
+        approximate = approximate_tiles_area(features, "1cm", seed=seed)
+        assert approximate["low"] <= exact <= approximate["high"]
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+
+from mapbox_tilesets.cache import CachedSession
+
+
+class _Response:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.text = json.dumps(body) if body is not None else ""
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class _Session:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, headers=None):
+        self.calls.append((url, headers))
+        return self.responses.pop(0)
+
+
+URL = "https://api.mapbox.com/v4/test.id.json?access_token=secret"
+
+
+def test_cached_session_revalidates(tmp_path):
+    s = _Session(
+        [
+            _Response(200, {"version": 1}, {"ETag": '"v1"'}),
+            _Response(304, headers={"ETag": '"v1"'}),
+            _Response(200, {"version": 2}, {"ETag": '"v2"'}),
+        ]
+    )
+    cached = CachedSession.open(s, str(tmp_path))
+
+    assert cached.get(URL).json() == {"version": 1}
+    r = cached.get(URL)
+    assert r.status_code == 200
+    assert r.json() == {"version": 1}
+    assert cached.get(URL).json() == {"version": 2}
+    assert s.calls == [
+        (URL, None),
+        (URL, {"If-None-Match": '"v1"'}),
+        (URL, {"If-None-Match": '"v1"'}),
+    ]
+    files = os.listdir(tmp_path / "responses")
+    assert len(files) == 1
+    assert "secret" not in (tmp_path / "responses" / files[0]).read_text()
+    assert os.stat(tmp_path / "responses").st_mode & 0o777 == 0o700
+    assert os.stat(tmp_path / "responses" / files[0]).st_mode & 0o777 == 0o600
+
+
+def test_cached_session_keeps_headers(tmp_path):
+    link = '<https://api.mapbox.com/tilesets/v1/test?access_token=secret&start=a>; rel="next"'
+    s = _Session(
+        [
+            _Response(
+                200,
+                [{"id": "test.a"}],
+                {"ETag": '"v1"', "Link": link, "Content-Length": "15"},
+            ),
+            _Response(304, headers={"ETag": '"v2"'}),
+        ]
+    )
+    cached = CachedSession.open(s, str(tmp_path))
+    cached.get(URL)
+
+    r = cached.get(URL)
+    assert r.headers["link"] == (
+        '<https://api.mapbox.com/tilesets/v1/test?start=a>; rel="next"'
+    )
+    assert r.headers["ETag"] == '"v2"'
+    assert "Content-Length" not in r.headers
+    files = os.listdir(tmp_path / "responses")
+    assert "secret" not in (tmp_path / "responses" / files[0]).read_text()
+
+
+def test_cached_session_ttl(tmp_path):
+    s = _Session([_Response(200, {"version": 1}, {"Last-Modified": "yesterday"})])
+    cached = CachedSession.open(s, str(tmp_path), ttl=60)
+    assert cached.get(URL).json() == {"version": 1}
+    assert cached.get(URL).json() == {"version": 1}
+    assert len(s.calls) == 1
+
+
+def test_cached_session_skips_uncacheable(tmp_path):
+    s = _Session(
+        [
+            _Response(200, {"version": 1}),
+            _Response(
+                200, {"version": 1}, {"ETag": '"v1"', "Cache-Control": "no-store"}
+            ),
+            _Response(404, {"message": "Not Found"}),
+        ]
+    )
+    cached = CachedSession.open(s, str(tmp_path))
+    for _ in range(3):
+        cached.get(URL)
+    assert [headers for url, headers in s.calls] == [None, None, None]
+    assert not (tmp_path / "responses").exists()
+
+
+def test_cached_session_evicts_least_recently_used(tmp_path):
+    body = {"data": "x" * 1000}
+    s = _Session([_Response(200, body, {"ETag": '"v"'}) for _ in range(3)])
+    cached = CachedSession.open(s, str(tmp_path), max_size=2500)
+    path = tmp_path / "responses"
+    for i in range(3):
+        cached.get(URL + str(i))
+        # age each response so the first one is the least recently used
+        os.utime(path / _key(URL + str(i)), (i, i))
+    assert sorted(os.listdir(path)) == sorted([_key(URL + "1"), _key(URL + "2")])
+
+
+def _key(url):
+    return hashlib.sha256(url.encode()).hexdigest()
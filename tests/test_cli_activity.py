@@ -98,3 +98,27 @@ def test_cli_list_activity_arguments_invalid(
     # Invalid argument values should error
     mock_request_get.assert_not_called()
     assert result.exit_code == 2
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests.Session.get")
+def test_cli_list_activity_all(mock_request_get, MockResponse):
+    runner = CliRunner()
+
+    first = MockResponse([{"id": "penny.map-one"}, {"id": "penny.map-two"}])
+    first.headers = {
+        "Link": '<https://api.mapbox.com/activity/v1/test/tilesets?start=foo>; rel="next"'
+    }
+    last = MockResponse([{"id": "penny.map-three"}])
+    last.headers = {}
+    mock_request_get.side_effect = [first, last]
+
+    result = runner.invoke(list_activity, ["test", "--all"])
+    assert result.exit_code == 0
+    assert result.output == (
+        '{"id":"penny.map-one"}\n{"id":"penny.map-two"}\n{"id":"penny.map-three"}\n'
+    )
+    assert [call.args[0] for call in mock_request_get.call_args_list] == [
+        DEFAULT_ENDPOINT,
+        "https://api.mapbox.com/activity/v1/test/tilesets?start=foo&access_token=pk.eyJ1IjoidGVzdC11c2VyIn0K",
+    ]
@@ -0,0 +1,112 @@
+import json
+import pytest
+
+from click.testing import CliRunner
+from unittest import mock
+
+from mapbox_tilesets.scripts.cli import batch
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests.Session.get")
+def test_cli_batch(mock_request_get, MockResponse):
+    runner = CliRunner()
+
+    def get(url):
+        if "/missing/" in url:
+            return MockResponse({"message": "Not Found"}, 404)
+        return MockResponse(
+            [{"id": "a123", "stage": "success", "tilesetId": "test.id"}]
+        )
+
+    mock_request_get.side_effect = get
+    ops = "\n".join(
+        [
+            "status test.id",
+            "# a comment",
+            "",
+            '["tilesets", "status", "test.id", "--indent", "2"]',
+            '{"id": "second", "args": ["status", "missing/x"]}',
+            "{not json",
+            "batch",
+        ]
+    )
+    result = runner.invoke(batch, input=ops)
+    assert result.exit_code == 1
+    lines = result.stdout.splitlines()
+    results = [json.loads(line) for line in lines]
+    assert [r["line"] for r in results] == [1, 4, 5, 6, 7]
+    assert [r["exit_code"] for r in results] == [0, 0, 1, 2, 2]
+
+    status = {"id": "test.id", "latest_job": "a123", "status": "success"}
+    assert json.loads(results[0]["output"]) == status
+    assert results[1]["args"] == ["status", "test.id", "--indent", "2"]
+    assert json.loads(results[1]["output"]) == status
+    assert results[2]["id"] == "second"
+    assert json.loads(results[2]["error"]) == {"message": "Not Found"}
+    assert results[3]["error"].startswith("Invalid operation")
+    assert results[4]["error"] == "batch can not be nested"
+    assert "3 operations failed" in result.stderr
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests.Session.get")
+def test_cli_batch_fail_fast(mock_request_get, MockResponse, tmp_path):
+    runner = CliRunner()
+    mock_request_get.return_value = MockResponse({"message": "Not Found"}, 404)
+    ops = tmp_path / "ops.txt"
+    ops.write_text("status test.a\nstatus test.b\n")
+    result = runner.invoke(batch, [str(ops), "--fail-fast"])
+    assert result.exit_code == 1
+    assert len(result.stdout.splitlines()) == 1
+    assert mock_request_get.call_count == 1
+
+
+def test_cli_batch_prompt_aborts():
+    runner = CliRunner()
+    result = runner.invoke(batch, input="delete-source test source\n")
+    assert result.exit_code == 1
+    assert json.loads(result.stdout)["error"] == "Aborted!"
+
+
+@pytest.mark.usefixtures("token_environ")
+def test_cli_batch_rejects_stdin():
+    runner = CliRunner()
+    ops = "\n".join(
+        [
+            "upload-source test-user source -",
+            "upload-source test-user source",
+            "status --file -",
+        ]
+    )
+    result = runner.invoke(batch, input=ops)
+    assert result.exit_code == 1
+    results = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [r["exit_code"] for r in results] == [2, 2, 2]
+    assert {r["error"] for r in results} == {
+        "operations can not read from stdin in a batch"
+    }
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests_toolbelt.MultipartEncoder")
+@mock.patch("requests_toolbelt.MultipartEncoderMonitor")
+@mock.patch("requests.Session.post")
+def test_cli_batch_quiet(
+    mock_request_post,
+    mock_multipart_encoder_monitor,
+    mock_multipart_encoder,
+    MockResponse,
+    MockMultipartEncoding,
+):
+    message = {"id": "mapbox://tileset-source/test-user/source"}
+    mock_request_post.return_value = MockResponse(message)
+    mock_multipart_encoder.return_value = MockMultipartEncoding()
+
+    runner = CliRunner()
+    result = runner.invoke(
+        batch, input="upload-source test-user source tests/fixtures/valid.ldgeojson"
+    )
+    assert result.exit_code == 0
+    assert json.loads(json.loads(result.stdout)["output"]) == message
+    mock_multipart_encoder_monitor.assert_not_called()
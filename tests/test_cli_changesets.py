@@ -136,8 +136,8 @@ def test_cli_delete_changeset_aborted(mock_request_delete, MockResponse):
 
 
 @pytest.mark.usefixtures("token_environ")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoder")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoderMonitor")
+@mock.patch("requests_toolbelt.MultipartEncoder")
+@mock.patch("requests_toolbelt.MultipartEncoderMonitor")
 @mock.patch("requests.Session.post")
 def test_cli_upload_changeset(
     mock_request_post,
@@ -176,8 +176,8 @@ def test_cli_upload_changeset(
 
 
 @pytest.mark.usefixtures("token_environ")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoder")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoderMonitor")
+@mock.patch("requests_toolbelt.MultipartEncoder")
+@mock.patch("requests_toolbelt.MultipartEncoderMonitor")
 @mock.patch("requests.Session.put")
 def test_cli_upload_changeset_replace(
     mock_request_post,
@@ -216,8 +216,8 @@ def test_cli_upload_changeset_replace(
 
 
 @pytest.mark.usefixtures("token_environ")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoder")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoderMonitor")
+@mock.patch("requests_toolbelt.MultipartEncoder")
+@mock.patch("requests_toolbelt.MultipartEncoderMonitor")
 @mock.patch("requests.Session.post")
 def test_cli_upload_source_invalid_changeset(
     mock_request_post,
@@ -247,8 +247,8 @@ def test_cli_upload_source_invalid_changeset(
 
 
 @pytest.mark.usefixtures("token_environ")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoder")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoderMonitor")
+@mock.patch("requests_toolbelt.MultipartEncoder")
+@mock.patch("requests_toolbelt.MultipartEncoderMonitor")
 @mock.patch("requests.Session.post")
 def test_cli_upload_changeset_no_validation(
     mock_request_post,
@@ -260,7 +260,8 @@ def test_cli_upload_changeset_no_validation(
     okay_response = {"id": "mapbox://tileset-changeset/test-user/hello-world"}
     mock_request_post.return_value = MockResponse(okay_response, status_code=200)
 
-    expected_json = b'{"id":1,"delete":true,"type":"Feature","geometry":{"type":"Point","coordinates":[125.6,10.1]},"properties":{"name":"Dinagat Islands"}}\n{"id":2,"delete":false}\n'
+    with open("tests/fixtures/invalid-changeset-geojson.ldgeojson", "rb") as src:
+        expected_json = src.read() + b"\n"
 
     def side_effect(fields):
         assert fields["file"][1].read() == expected_json
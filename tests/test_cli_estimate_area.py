@@ -147,3 +147,25 @@ def test_cli_estimate_area_with_no_validation_flag_and_invalid_schema():
     )
     assert validated_result.exit_code == 0
     assert validated_result.output == output
+
+
+def test_cli_estimate_area_workers():
+    output = '{"km2": "280305", "precision": "1m", "pricing_docs": "For more information, visit https://www.mapbox.com/pricing/#tilesets"}\n'
+    runner = CliRunner()
+    validated_result = runner.invoke(
+        estimate_area,
+        ["tests/fixtures/twostates.ldgeojson", "-p", "1m", "--workers", "2"],
+    )
+    assert validated_result.exit_code == 0
+    assert validated_result.output == output
+
+
+def test_cli_estimate_area_approximate():
+    output = '{"km2": "382565", "precision": "10m", "km2_upper_bound": "382565", "km2_interval": ["382565", "382565"], "pricing_docs": "For more information, visit https://www.mapbox.com/pricing/#tilesets"}\n'
+    runner = CliRunner()
+    validated_result = runner.invoke(
+        estimate_area,
+        ["tests/fixtures/valid.ldgeojson", "-p", "10m", "--approximate"],
+    )
+    assert validated_result.exit_code == 0
+    assert validated_result.output == output
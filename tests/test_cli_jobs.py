@@ -114,3 +114,53 @@ def test_cli_single_job(mock_request_get, MockResponse):
     )
     assert result.exit_code == 0
     assert json.loads(result.output) == message
+
+
+JOB_ENDPOINT = "https://api.mapbox.com/tilesets/v1/test.id/jobs/a123?access_token=pk.eyJ1IjoidGVzdC11c2VyIn0K"
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("mapbox_tilesets.utils.time.sleep")
+@mock.patch("requests.Session.get")
+@pytest.mark.parametrize("stage,exit_code", [("success", 0), ("failed", 1)])
+def test_cli_job_wait(mock_request_get, mock_sleep, MockResponse, stage, exit_code):
+    runner = CliRunner()
+
+    stages = ["queued", "queued", "queued", "processing", stage]
+    mock_request_get.side_effect = [
+        MockResponse({"id": "a123", "stage": s}) for s in stages
+    ]
+    result = runner.invoke(job, ["test.id", "a123", "--wait"])
+    mock_request_get.assert_called_with(JOB_ENDPOINT)
+    assert result.exit_code == exit_code
+    assert json.loads(result.stdout) == {"id": "a123", "stage": stage}
+    assert "Job a123 processing" in result.stderr
+
+    delays = [call.args[0] for call in mock_sleep.call_args_list]
+    assert len(delays) == 4
+    assert 0.5 <= delays[0] <= 1
+    assert 1 <= delays[1] <= 2
+    assert 2 <= delays[2] <= 4
+    assert 0.5 <= delays[3] <= 1
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests.Session.get")
+def test_cli_job_wait_timeout(mock_request_get, MockResponse):
+    runner = CliRunner()
+
+    mock_request_get.return_value = MockResponse({"id": "a123", "stage": "queued"})
+    result = runner.invoke(job, ["test.id", "a123", "--wait", "--timeout", "0"])
+    assert result.exit_code == 3
+    assert "Job a123 is still queued after 0.0 seconds" in result.output
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests.Session.get")
+def test_cli_job_wait_error(mock_request_get, MockResponse):
+    runner = CliRunner()
+
+    mock_request_get.return_value = MockResponse({"message": "Not Found"}, 404)
+    result = runner.invoke(job, ["test.id", "a123", "--wait"])
+    assert result.exit_code == 1
+    assert "Not Found" in result.output
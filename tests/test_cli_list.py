@@ -219,3 +219,92 @@ def test_cli_list_options(mock_request_get, MockResponse):
     )
     assert result.exit_code == 0
     assert result.output == """test.tileset-1\ntest.tileset-2\n"""
+
+
+def _page(MockResponse, message, link=None):
+    response = MockResponse(message)
+    response.headers = {"Link": '<{}>; rel="next"'.format(link)} if link else {}
+    return response
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests.Session.get")
+@pytest.mark.parametrize("prefetch", ["0", "2"])
+def test_cli_list_all(mock_request_get, MockResponse, prefetch):
+    runner = CliRunner()
+
+    mock_request_get.side_effect = [
+        _page(
+            MockResponse,
+            [{"id": "test.tileset-1"}, {"id": "test.tileset-2"}],
+            "https://api.mapbox.com/tilesets/v1/test?limit=2&start=abc",
+        ),
+        _page(
+            MockResponse,
+            [{"id": "test.tileset-3"}],
+            "https://api.mapbox.com/tilesets/v1/test?limit=2&start=def&access_token=other",
+        ),
+        _page(MockResponse, []),
+    ]
+    result = runner.invoke(
+        list, ["test", "--all", "--limit", "2", "--prefetch", prefetch]
+    )
+    assert result.exit_code == 0
+    assert result.output == "test.tileset-1\ntest.tileset-2\ntest.tileset-3\n"
+    assert [call.args[0] for call in mock_request_get.call_args_list] == [
+        "https://api.mapbox.com/tilesets/v1/test?access_token=pk.eyJ1IjoidGVzdC11c2VyIn0K&limit=2",
+        "https://api.mapbox.com/tilesets/v1/test?limit=2&start=abc&access_token=pk.eyJ1IjoidGVzdC11c2VyIn0K",
+        "https://api.mapbox.com/tilesets/v1/test?limit=2&start=def&access_token=other",
+    ]
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests.Session.get")
+def test_cli_list_all_cache(mock_request_get, MockResponse, monkeypatch, tmp_path):
+    monkeypatch.setenv("TILESETS_CACHE_DIR", str(tmp_path))
+    runner = CliRunner()
+
+    def page(message, etag, link=None):
+        response = _page(MockResponse, message, link)
+        response.headers["ETag"] = etag
+        return response
+
+    def not_modified():
+        response = MockResponse({}, status_code=304)
+        response.headers = {}
+        return response
+
+    mock_request_get.side_effect = [
+        page(
+            [{"id": "test.tileset-1"}],
+            '"a"',
+            "https://api.mapbox.com/tilesets/v1/test?start=abc",
+        ),
+        page([{"id": "test.tileset-2"}], '"b"'),
+        not_modified(),
+        not_modified(),
+    ]
+    for _ in range(2):
+        result = runner.invoke(list, ["test", "--all", "--cache"])
+        assert result.exit_code == 0
+        assert result.output == "test.tileset-1\ntest.tileset-2\n"
+    assert mock_request_get.call_count == 4
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests.Session.get")
+def test_cli_list_all_page_error(mock_request_get, MockResponse):
+    runner = CliRunner()
+
+    mock_request_get.side_effect = [
+        _page(
+            MockResponse,
+            [{"id": "test.tileset-1"}],
+            "https://api.mapbox.com/tilesets/v1/test?start=abc",
+        ),
+        MockResponse({"message": "Server Error"}, status_code=500),
+    ]
+    result = runner.invoke(list, ["test", "--all"])
+    assert result.exit_code == 1
+    assert result.output.startswith("test.tileset-1\n")
+    assert "Server Error" in result.output
@@ -1,10 +1,11 @@
 import json
 import pytest
+import requests
 
 from click.testing import CliRunner
 from unittest import mock
 
-from mapbox_tilesets.scripts.cli import publish
+from mapbox_tilesets.scripts.cli import publish, publish_many
 
 
 class MockResponse:
@@ -58,3 +59,96 @@ def test_cli_publish_use_token_flag(mock_request_post):
         '{"message": "mock message", "jobId": "1234fakejob"}\n\n✔ Tileset job received. Visit https://studio.mapbox.com/tilesets/test.id or run tilesets job test.id 1234fakejob to view the status of your tileset.\n'
         in result.output
     )
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("mapbox_tilesets.utils.time.sleep")
+@mock.patch("requests.Session.get")
+@mock.patch("requests.Session.post")
+def test_cli_publish_wait(mock_request_post, mock_request_get, mock_sleep):
+    runner = CliRunner()
+    mock_request_post.return_value = MockResponse(
+        {"message": "mock message", "jobId": "1234fakejob"}, 200
+    )
+    mock_request_get.side_effect = [
+        MockResponse({"id": "1234fakejob", "stage": "processing"}, 200),
+        MockResponse({"id": "1234fakejob", "stage": "success"}, 200),
+    ]
+    result = runner.invoke(publish, ["test.id", "--wait"])
+    mock_request_get.assert_called_with(
+        "https://api.mapbox.com/tilesets/v1/test.id/jobs/1234fakejob?access_token=pk.eyJ1IjoidGVzdC11c2VyIn0K"
+    )
+    assert result.exit_code == 0
+    assert result.stdout.splitlines() == [
+        '{"message": "mock message", "jobId": "1234fakejob"}',
+        '{"id": "1234fakejob", "stage": "success"}',
+    ]
+    assert mock_sleep.call_count == 1
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("mapbox_tilesets.utils.time.sleep")
+@mock.patch("requests.Session.post")
+def test_cli_publish_many(mock_request_post, mock_sleep, tmp_path):
+    runner = CliRunner()
+    rate_limited = MockResponse({"message": "Too Many Requests"}, 429)
+    rate_limited.headers = {"Retry-After": "2"}
+    responses = {"test.b": [rate_limited]}
+
+    def post(url):
+        tileset = url.split("/")[5]
+        if responses.get(tileset):
+            return responses[tileset].pop(0)
+        if tileset == "test.missing":
+            return MockResponse({"message": "Not Found"}, 404)
+        return MockResponse({"message": "ok", "jobId": "job-" + tileset}, 200)
+
+    mock_request_post.side_effect = post
+    ids = tmp_path / "ids.txt"
+    ids.write_text("test.c\ntest.missing\n")
+    result = runner.invoke(
+        publish_many, ["test.a", "test.b", "--file", str(ids), "--concurrency", "2"]
+    )
+    assert result.exit_code == 1
+    assert json.loads(result.stdout) == {
+        "published": {
+            "test.a": "job-test.a",
+            "test.b": "job-test.b",
+            "test.c": "job-test.c",
+        },
+        "failed": {"test.missing": json.dumps({"message": "Not Found"})},
+    }
+    assert "✔ test.b job job-test.b" in result.stderr
+    assert "1 of 4 tilesets failed to publish" in result.stderr
+    assert mock_request_post.call_count == 5
+    assert any(1 < call.args[0] <= 2 for call in mock_sleep.call_args_list)
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests.Session.post")
+def test_cli_publish_many_connection_error(mock_request_post):
+    runner = CliRunner()
+
+    def post(url):
+        tileset = url.split("/")[5]
+        if tileset == "test.down":
+            raise requests.ConnectionError(f"Max retries exceeded with url: {url}")
+        return MockResponse({"message": "ok", "jobId": "job-" + tileset}, 200)
+
+    mock_request_post.side_effect = post
+    result = runner.invoke(publish_many, ["test.a", "test.down", "test.c"])
+    assert result.exit_code == 1
+    summary = json.loads(result.stdout)
+    assert summary["published"] == {"test.a": "job-test.a", "test.c": "job-test.c"}
+    assert summary["failed"] == {
+        "test.down": "Max retries exceeded with url: "
+        "https://api.mapbox.com/tilesets/v1/test.down/publish"
+    }
+    assert "pk.eyJ1IjoidGVzdC11c2VyIn0K" not in result.output
+    assert "1 of 3 tilesets failed to publish" in result.stderr
+
+
+def test_cli_publish_many_no_tilesets():
+    runner = CliRunner()
+    result = runner.invoke(publish_many, [])
+    assert result.exit_code == 2
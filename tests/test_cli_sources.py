@@ -18,8 +18,8 @@ from utils import clean_runner_output
 
 
 @pytest.mark.usefixtures("token_environ")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoder")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoderMonitor")
+@mock.patch("requests_toolbelt.MultipartEncoder")
+@mock.patch("requests_toolbelt.MultipartEncoderMonitor")
 @mock.patch("requests.Session.post")
 def test_cli_add_source(
     mock_request_post,
@@ -51,8 +51,8 @@ def test_cli_add_source(
 
 
 @pytest.mark.usefixtures("token_environ")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoder")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoderMonitor")
+@mock.patch("requests_toolbelt.MultipartEncoder")
+@mock.patch("requests_toolbelt.MultipartEncoderMonitor")
 @mock.patch("requests.Session.post")
 def test_cli_add_source_wrong_username(
     mock_request_post,
@@ -123,8 +123,8 @@ def test_cli_add_source_no_validation(mock_request_post, MockResponse):
 
 
 @pytest.mark.usefixtures("token_environ")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoder")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoderMonitor")
+@mock.patch("requests_toolbelt.MultipartEncoder")
+@mock.patch("requests_toolbelt.MultipartEncoderMonitor")
 @mock.patch("requests.Session.put")
 def test_cli_upload_source_replace(
     mock_request_put,
@@ -157,8 +157,8 @@ def test_cli_upload_source_replace(
 
 
 @pytest.mark.usefixtures("token_environ")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoder")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoderMonitor")
+@mock.patch("requests_toolbelt.MultipartEncoder")
+@mock.patch("requests_toolbelt.MultipartEncoderMonitor")
 @mock.patch("requests.Session.put")
 def test_cli_upload_source_no_replace(
     mock_request_post,
@@ -192,8 +192,8 @@ def test_cli_upload_source_no_replace(
 
 
 @pytest.mark.usefixtures("token_environ")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoder")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoderMonitor")
+@mock.patch("requests_toolbelt.MultipartEncoder")
+@mock.patch("requests_toolbelt.MultipartEncoderMonitor")
 @mock.patch("requests.Session.post")
 def test_cli_upload_source(
     mock_request_post,
@@ -226,8 +226,89 @@ def test_cli_upload_source(
 
 
 @pytest.mark.usefixtures("token_environ")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoder")
-@mock.patch("mapbox_tilesets.scripts.cli.MultipartEncoderMonitor")
+@mock.patch("requests_toolbelt.MultipartEncoder")
+@mock.patch("requests_toolbelt.MultipartEncoderMonitor")
+@mock.patch("requests.Session.post")
+def test_cli_upload_source_workers(
+    mock_request_post,
+    mock_multipart_encoder_monitor,
+    mock_multipart_encoder,
+    MockResponse,
+    MockMultipartEncoding,
+):
+    okay_response = {"id": "mapbox://tileset-source/test-user/populated-places-source"}
+    mock_request_post.return_value = MockResponse(okay_response, status_code=200)
+
+    # the validated file is uploaded as it is, with a newline added at the end
+    with open("tests/fixtures/valid.ldgeojson", "rb") as src:
+        expected_json = src.read() + b"\n"
+
+    def side_effect(fields):
+        assert fields["file"][1].read() == expected_json
+        return MockMultipartEncoding()
+
+    mock_multipart_encoder.side_effect = side_effect
+
+    runner = CliRunner()
+    validated_result = runner.invoke(
+        upload_source,
+        [
+            "test-user",
+            "populated-places-source",
+            "tests/fixtures/valid.ldgeojson",
+            "--workers",
+            "2",
+        ],
+    )
+    assert validated_result.exit_code == 0
+
+
+@pytest.mark.usefixtures("token_environ")
+@pytest.mark.parametrize(
+    "options",
+    [[], ["--stream"], ["--compress", "gzip"], ["--parallel-parts", "2"]],
+)
+@mock.patch("requests.Session.post")
+def test_cli_upload_source_workers_parse_once(
+    mock_request_post, MockResponse, monkeypatch, tmp_path, options
+):
+    monkeypatch.setenv("TILESETS_STATE_DIR", str(tmp_path))
+    okay_response = {"id": "mapbox://tileset-source/test-user/populated-places-source"}
+
+    def side_effect(url, data, headers):
+        for _ in data if not hasattr(data, "read") else iter(data.read, b""):
+            pass
+        return MockResponse(okay_response, status_code=200)
+
+    mock_request_post.side_effect = side_effect
+
+    # files validated by the workers are uploaded without being parsed again
+    def parse(*args, **kwargs):
+        raise AssertionError("features were parsed again")
+
+    monkeypatch.setattr("mapbox_tilesets.upload.iter_lines", parse)
+    monkeypatch.setattr("mapbox_tilesets.upload.iter_resumable_parts", parse)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        upload_source,
+        [
+            "test-user",
+            "populated-places-source",
+            "tests/fixtures/twostates.ldgeojson",
+            "--workers",
+            "2",
+            "--quiet",
+        ]
+        + options,
+    )
+    assert result.exit_code == 0, result.output
+    assert mock_request_post.called
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests_toolbelt.MultipartEncoder")
+@mock.patch("requests_toolbelt.MultipartEncoderMonitor")
 @mock.patch("requests.Session.post")
 def test_cli_upload_source_invalid_polygon(
     mock_request_post,
@@ -340,3 +421,364 @@ def test_cli_validate_source():
     result = runner.invoke(validate_source, ["tests/fixtures/valid.ldgeojson"])
     assert result.exit_code == 0
     assert result.output == "Validating features\n✔ valid\n"
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests.Session.post")
+def test_cli_upload_source_stream(mock_request_post, MockResponse):
+    okay_response = {"id": "mapbox://tileset-source/test-user/hello-world"}
+    sent = {}
+
+    def side_effect(url, data, headers):
+        sent["body"] = b"".join(data)
+        sent["content_type"] = headers["Content-type"]
+        return MockResponse(okay_response, status_code=200)
+
+    mock_request_post.side_effect = side_effect
+
+    runner = CliRunner()
+    result = runner.invoke(
+        upload_source,
+        ["test-user", "hello-world", "tests/fixtures/valid.ldgeojson", "--stream"],
+    )
+    assert result.exit_code == 0
+    assert result.output.endswith(
+        '{"id": "mapbox://tileset-source/test-user/hello-world"}\n'
+    )
+
+    boundary = sent["content_type"].split("boundary=")[1]
+    assert sent["body"] == (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="file"\r\n\r\n'
+        '{"type":"Feature","geometry":{"type":"Point","coordinates":[125.6,10.1]},"properties":{"name":"Dinagat Islands"}}\n'
+        f"\r\n--{boundary}--\r\n"
+    ).encode("utf-8")
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests.Session.post")
+def test_cli_upload_source_stream_invalid(mock_request_post, MockResponse):
+    def side_effect(url, data, headers):
+        b"".join(data)
+        return MockResponse({}, status_code=200)
+
+    mock_request_post.side_effect = side_effect
+
+    runner = CliRunner()
+    result = runner.invoke(
+        upload_source,
+        [
+            "test-user",
+            "hello-world",
+            "tests/fixtures/invalid-polygon.ldgeojson",
+            "--stream",
+            "--quiet",
+        ],
+    )
+    assert result.exit_code == 1
+    assert (
+        clean_runner_output(result.output)
+        == "Error in feature number 0: Each linear ring must end where it started"
+    )
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests.Session.post")
+def test_cli_upload_source_stream_compress(mock_request_post, MockResponse):
+    import gzip
+
+    sent = {}
+
+    def side_effect(url, data, headers):
+        sent["body"] = b"".join(data)
+        return MockResponse({"id": "test"}, status_code=200)
+
+    mock_request_post.side_effect = side_effect
+
+    runner = CliRunner()
+    result = runner.invoke(
+        upload_source,
+        [
+            "test-user",
+            "hello-world",
+            "tests/fixtures/valid.ldgeojson",
+            "--stream",
+            "--compress",
+            "gzip",
+        ],
+    )
+    assert result.exit_code == 0
+
+    head, rest = sent["body"].split(b"\r\n\r\n", 1)
+    assert b'filename="file.gz"' in head
+    assert b"Content-Type: application/gzip" in head
+    payload = rest.rsplit(b"\r\n--", 1)[0]
+    assert (
+        gzip.decompress(payload)
+        == b'{"type":"Feature","geometry":{"type":"Point","coordinates":[125.6,10.1]},"properties":{"name":"Dinagat Islands"}}\n'
+    )
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests_toolbelt.MultipartEncoder")
+@mock.patch("requests_toolbelt.MultipartEncoderMonitor")
+@mock.patch("requests.Session.post")
+def test_cli_upload_source_compress(
+    mock_request_post,
+    mock_multipart_encoder_monitor,
+    mock_multipart_encoder,
+    MockResponse,
+    MockMultipartEncoding,
+):
+    import gzip
+
+    mock_request_post.return_value = MockResponse({"id": "test"}, status_code=200)
+
+    def side_effect(fields):
+        filename, file, content_type = fields["file"]
+        assert filename == "file.gz"
+        assert content_type == "application/gzip"
+        assert (
+            gzip.decompress(file.read())
+            == b'{"type":"Feature","geometry":{"type":"Point","coordinates":[125.6,10.1]},"properties":{"name":"Dinagat Islands"}}\n'
+        )
+        return MockMultipartEncoding()
+
+    mock_multipart_encoder.side_effect = side_effect
+
+    runner = CliRunner()
+    result = runner.invoke(
+        upload_source,
+        [
+            "test-user",
+            "hello-world",
+            "tests/fixtures/valid.ldgeojson",
+            "--compress",
+            "gzip",
+        ],
+    )
+    assert result.exit_code == 0
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests.Session.put")
+@mock.patch("requests.Session.post")
+def test_cli_upload_source_parallel_parts(
+    mock_request_post, mock_request_put, MockResponse, monkeypatch, tmp_path
+):
+    monkeypatch.setenv("TILESETS_STATE_DIR", str(tmp_path))
+    bodies = []
+
+    def side_effect(url, data, headers):
+        bodies.append(data.to_string())
+        return MockResponse({"id": "test", "files": len(bodies)}, status_code=200)
+
+    mock_request_post.side_effect = side_effect
+    mock_request_put.side_effect = side_effect
+
+    runner = CliRunner()
+    result = runner.invoke(
+        upload_source,
+        [
+            "test-user",
+            "hello-world",
+            "tests/fixtures/twostates.ldgeojson",
+            "--replace",
+            "--parallel-parts",
+            "2",
+            "--part-size",
+            "1KB",
+        ],
+    )
+    assert result.exit_code == 0
+    assert mock_request_put.call_count == 1
+    assert mock_request_post.call_count == len(bodies) - 1
+
+    with open("tests/fixtures/twostates.ldgeojson") as src:
+        expected = sorted(
+            json.dumps(json.loads(line), separators=(",", ":")) for line in src
+        )
+    uploaded = sorted(
+        line.decode("utf-8")
+        for body in bodies
+        for line in body.split(b"\r\n\r\n", 1)[1].rsplit(b"\r\n--", 1)[0].splitlines()
+    )
+    assert uploaded == expected
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests.Session.post")
+def test_cli_upload_source_parallel_parts_no_validation(
+    mock_request_post, MockResponse, monkeypatch, tmp_path
+):
+    monkeypatch.setenv("TILESETS_STATE_DIR", str(tmp_path))
+    bodies = []
+
+    def side_effect(url, data, headers):
+        bodies.append(data.to_string())
+        return MockResponse({"id": "test", "files": len(bodies)}, status_code=200)
+
+    mock_request_post.side_effect = side_effect
+
+    runner = CliRunner()
+    result = runner.invoke(
+        upload_source,
+        [
+            "test-user",
+            "hello-world",
+            "tests/fixtures/twostates.ldgeojson",
+            "--no-validation",
+            "--parallel-parts",
+            "2",
+            "--part-size",
+            "1KB",
+        ],
+    )
+    assert result.exit_code == 0
+    assert len(bodies) > 1
+
+    # the file is split on line boundaries and uploaded as it is
+    with open("tests/fixtures/twostates.ldgeojson", "rb") as src:
+        expected = sorted(src.read().splitlines())
+    uploaded = sorted(
+        line
+        for body in bodies
+        for line in body.split(b"\r\n\r\n", 1)[1].rsplit(b"\r\n--", 1)[0].splitlines()
+    )
+    assert uploaded == expected
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests.Session.post")
+def test_cli_upload_source_resume(
+    mock_request_post, MockResponse, monkeypatch, tmp_path
+):
+    monkeypatch.setenv("TILESETS_STATE_DIR", str(tmp_path))
+    monkeypatch.setattr("mapbox_tilesets.upload.time.sleep", lambda seconds: None)
+    bodies = []
+
+    def side_effect(url, data, headers):
+        body = data.to_string()
+        if len(bodies) == 1 and not resumed:
+            return MockResponse({"message": "Bad part"}, status_code=400)
+        bodies.append(body)
+        return MockResponse({"id": "test", "files": len(bodies)}, status_code=200)
+
+    mock_request_post.side_effect = side_effect
+    args = [
+        "test-user",
+        "hello-world",
+        "tests/fixtures/twostates.ldgeojson",
+        "--part-size",
+        "1KB",
+        "--resume",
+    ]
+
+    resumed = False
+    runner = CliRunner()
+    result = runner.invoke(upload_source, args)
+    assert result.exit_code == 1
+    assert "Part 1 failed" in result.output
+    assert len(bodies) == 1
+    assert os.listdir(tmp_path / "uploads")
+
+    resumed = True
+    result = runner.invoke(upload_source, args)
+    assert result.exit_code == 0
+    assert "Resuming upload, 1 of" in result.output
+    assert not os.listdir(tmp_path / "uploads")
+
+    with open("tests/fixtures/twostates.ldgeojson") as src:
+        expected = sorted(
+            json.dumps(json.loads(line), separators=(",", ":")) for line in src
+        )
+    uploaded = sorted(
+        line.decode("utf-8")
+        for body in bodies
+        for line in body.split(b"\r\n\r\n", 1)[1].rsplit(b"\r\n--", 1)[0].splitlines()
+    )
+    assert uploaded == expected
+
+
+def test_cli_upload_source_resume_stdin():
+    runner = CliRunner()
+    result = runner.invoke(
+        upload_source,
+        [
+            "test-user",
+            "hello-world",
+            "--token",
+            "pk.eyJ1IjoidGVzdC11c2VyIn0K",
+            "--resume",
+        ],
+        input="{}",
+    )
+    assert result.exit_code == 1
+    assert (
+        clean_runner_output(result.output)
+        == "The --resume flag requires local input files."
+    )
+
+
+@mock.patch("mapbox_tilesets.scripts.cli._validate_files")
+def test_cli_upload_source_resume_and_stream(mock_validate_files):
+    runner = CliRunner()
+    result = runner.invoke(
+        upload_source,
+        [
+            "test-user",
+            "hello-world",
+            "tests/fixtures/valid.ldgeojson",
+            "--token",
+            "pk.eyJ1IjoidGVzdC11c2VyIn0K",
+            "--stream",
+            "--resume",
+        ],
+    )
+    assert result.exit_code == 1
+    assert (
+        clean_runner_output(result.output)
+        == "The --stream and --resume flags cannot be used together."
+    )
+    mock_validate_files.assert_not_called()
+
+
+@mock.patch("mapbox_tilesets.scripts.cli._validate_files")
+def test_cli_upload_source_parallel_parts_and_stream(mock_validate_files):
+    runner = CliRunner()
+    result = runner.invoke(
+        upload_source,
+        [
+            "test-user",
+            "hello-world",
+            "tests/fixtures/valid.ldgeojson",
+            "--token",
+            "pk.eyJ1IjoidGVzdC11c2VyIn0K",
+            "--stream",
+            "--parallel-parts",
+            "2",
+        ],
+    )
+    assert result.exit_code == 1
+    assert (
+        clean_runner_output(result.output)
+        == "The --stream and --parallel-parts flags cannot be used together."
+    )
+    mock_validate_files.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [("512MB", 512 * 1024**2), ("1GiB", 1024**3), ("100", 100), ("1.5k", 1536)],
+)
+def test_parse_size(value, expected):
+    from mapbox_tilesets.scripts.cli import parse_size
+
+    assert parse_size(None, None, value) == expected
+
+
+def test_parse_size_invalid():
+    from mapbox_tilesets.scripts.cli import parse_size
+
+    with pytest.raises(click.BadParameter):
+        parse_size(None, None, "lots")
@@ -1,5 +1,6 @@
 import json
 import pytest
+import requests
 
 from click.testing import CliRunner
 from unittest import mock
@@ -65,3 +66,90 @@ def test_cli_status_error(mock_request_get, MockResponse):
     assert result.exit_code == 1
     assert isinstance(result.exception, SystemExit)
     assert clean_runner_output(result.output) == '{"message": "test.id has no jobs."}'
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests.Session.get")
+def test_cli_status_many(mock_request_get, MockResponse, tmp_path):
+    def get(url):
+        tileset = url.split("/")[5]
+        if tileset == "test.missing":
+            return MockResponse({"message": "Not Found"}, 404)
+        return MockResponse(
+            [{"id": "job-" + tileset, "stage": "success", "tilesetId": tileset}]
+        )
+
+    mock_request_get.side_effect = get
+    ids = tmp_path / "ids.txt"
+    ids.write_text("test.c\n\ntest.missing\n")
+    runner = CliRunner()
+    result = runner.invoke(
+        status,
+        ["test.a", "test.b", "--file", str(ids), "--concurrency", "2"],
+    )
+    assert result.exit_code == 1
+    assert "1 of 4 status requests failed" in result.output
+    records = {
+        record["id"]: record
+        for record in (
+            json.loads(line) for line in result.output.splitlines() if line[:1] == "{"
+        )
+    }
+    assert records["test.a"] == {
+        "id": "test.a",
+        "latest_job": "job-test.a",
+        "status": "success",
+    }
+    assert set(records) == {"test.a", "test.b", "test.c", "test.missing"}
+    assert json.loads(records["test.missing"]["error"]) == {"message": "Not Found"}
+    assert mock_request_get.call_count == 4
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests.Session.get")
+def test_cli_status_many_connection_error(mock_request_get, MockResponse):
+    def get(url):
+        tileset = url.split("/")[5]
+        if tileset == "test.down":
+            raise requests.ConnectionError(f"Max retries exceeded with url: {url}")
+        return MockResponse(
+            [{"id": "job-" + tileset, "stage": "success", "tilesetId": tileset}]
+        )
+
+    mock_request_get.side_effect = get
+    runner = CliRunner()
+    result = runner.invoke(status, ["test.a", "test.down", "test.c"])
+    assert result.exit_code == 1
+    assert "1 of 3 status requests failed" in result.output
+    records = {
+        record["id"]: record
+        for record in (
+            json.loads(line) for line in result.output.splitlines() if line[:1] == "{"
+        )
+    }
+    assert set(records) == {"test.a", "test.down", "test.c"}
+    assert records["test.c"]["status"] == "success"
+    assert records["test.down"] == {
+        "id": "test.down",
+        "error": "Max retries exceeded with url: "
+        "https://api.mapbox.com/tilesets/v1/test.down/jobs?limit=1",
+    }
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests.Session.get")
+def test_cli_status_stdin(mock_request_get, MockResponse):
+    mock_request_get.return_value = MockResponse([])
+    runner = CliRunner()
+    result = runner.invoke(status, ["--file", "-"], input="test.a\n")
+    mock_request_get.assert_called_with(
+        "https://api.mapbox.com/tilesets/v1/test.a/jobs?limit=1&access_token=pk.eyJ1IjoidGVzdC11c2VyIn0K"
+    )
+    assert result.exit_code == 0
+    assert json.loads(result.output) == {"id": "test.a"}
+
+
+def test_cli_status_no_tilesets():
+    runner = CliRunner()
+    result = runner.invoke(status, [])
+    assert result.exit_code == 2
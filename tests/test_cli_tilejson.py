@@ -106,3 +106,26 @@ def test_cli_tilejson_invalid_tileset_id():
     assert result.exit_code == 1
     assert isinstance(result.exception, SystemExit)
     assert clean_runner_output(result.output) == "Invalid Tileset ID"
+
+
+@pytest.mark.usefixtures("token_environ")
+@mock.patch("requests.Session.get")
+def test_cli_tilejson_cache(mock_request_get, MockResponse, monkeypatch, tmp_path):
+    monkeypatch.setenv("TILESETS_CACHE_DIR", str(tmp_path))
+    runner = CliRunner()
+    url = "https://api.mapbox.com/v4/test.id.json?access_token=pk.eyJ1IjoidGVzdC11c2VyIn0K"
+
+    response = MockResponse({"id": "test.id"})
+    response.headers = {"ETag": '"abc"'}
+    not_modified = MockResponse({}, status_code=304)
+    not_modified.headers = {}
+    mock_request_get.side_effect = [response, not_modified]
+
+    result = runner.invoke(tilejson, ["test.id", "--cache"])
+    assert result.exit_code == 0
+    mock_request_get.assert_called_with(url)
+
+    result = runner.invoke(tilejson, ["test.id"], env={"TILESETS_CACHE": "1"})
+    assert result.exit_code == 0
+    assert json.loads(result.output) == {"id": "test.id"}
+    mock_request_get.assert_called_with(url, headers={"If-None-Match": '"abc"'})
@@ -0,0 +1,89 @@
+import io
+import json
+
+import pytest
+
+from mapbox_tilesets.features import iter_features
+
+
+def make_feature(i):
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [i, i + 0.5]},
+        "properties": {"name": f"feature {i}"},
+    }
+
+
+FEATURES = [make_feature(i) for i in range(20)]
+
+
+def test_iter_features_line_delimited():
+    text = "\n".join(json.dumps(f) for f in FEATURES) + "\n"
+    assert list(iter_features(io.StringIO(text), chunk_size=16)) == FEATURES
+
+
+def test_iter_features_rs_delimited():
+    text = "".join("\x1e" + json.dumps(f, indent=2) + "\n" for f in FEATURES)
+    assert list(iter_features(io.StringIO(text), chunk_size=16)) == FEATURES
+
+
+def test_iter_features_feature_collection_pretty():
+    collection = {"type": "FeatureCollection", "features": FEATURES}
+    text = json.dumps(collection, indent=2)
+    assert list(iter_features(io.StringIO(text))) == FEATURES
+
+
+@pytest.mark.parametrize("indent", [None, 4])
+def test_iter_features_feature_collection_streamed(indent):
+    collection = {
+        "bbox": [0, 0.5, 19, 19.5],
+        "features": FEATURES,
+        "type": "FeatureCollection",
+    }
+    text = json.dumps(collection, indent=indent)
+    features = iter_features(io.StringIO(text), chunk_size=8, max_object_size=64)
+    assert list(features) == FEATURES
+
+
+def test_iter_features_feature_collection_streamed_is_lazy():
+    class Source(io.StringIO):
+        reads = 0
+
+        def read(self, size=-1):
+            self.reads += 1
+            return super().read(size)
+
+    collection = {"type": "FeatureCollection", "features": FEATURES}
+    src = Source(json.dumps(collection))
+    features = iter_features(src, chunk_size=32, max_object_size=64)
+    assert next(features) == FEATURES[0]
+    assert src.tell() < len(src.getvalue())
+
+
+def test_iter_features_empty_feature_collection_streamed():
+    text = '{"type": "FeatureCollection", "features": []}'
+    features = iter_features(io.StringIO(text), chunk_size=4, max_object_size=8)
+    assert list(features) == []
+
+
+def test_iter_features_geometries():
+    geometries = [f["geometry"] for f in FEATURES[:3]]
+    text = "\n".join(json.dumps(g) for g in geometries)
+    assert list(iter_features(io.StringIO(text))) == [
+        {"type": "Feature", "properties": {}, "geometry": g} for g in geometries
+    ]
+
+
+def test_iter_features_sequence_passes_through_records():
+    records = [FEATURES[0], {"id": 3, "delete": True}]
+    text = "\n".join(json.dumps(r) for r in records)
+    assert list(iter_features(io.StringIO(text), chunk_size=8)) == records
+
+
+def test_iter_features_invalid_json():
+    text = '{"type": "FeatureCollection", "features": [{"type": "Feature"} {}]}'
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_features(io.StringIO(text), chunk_size=4, max_object_size=8))
+
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_features(io.StringIO("invalidGeoJson input")))
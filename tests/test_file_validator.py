@@ -31,3 +31,33 @@ def test_validate_invalid_geojson():
         cli, ["validate-source", filepath + "/fixtures/invalid-geojson.ldgeojson"]
     )
     assert result.exit_code == 1
+
+
+def test_validate_ldgeojson_workers():
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        [
+            "validate-source",
+            filepath + "/fixtures/twostates.ldgeojson",
+            "--workers",
+            "2",
+        ],
+    )
+    assert result.exit_code == 0
+    assert "✔ valid" in result.output
+
+
+def test_validate_invalid_polygon_strict_validation():
+    runner = CliRunner()
+    for args in [[], ["--strict-validation"]]:
+        result = runner.invoke(
+            cli,
+            ["validate-source", filepath + "/fixtures/invalid-polygon.ldgeojson"]
+            + args,
+        )
+        assert result.exit_code == 1
+        assert (
+            "Error in feature number 0: Each linear ring must end where it started"
+            in result.output
+        )
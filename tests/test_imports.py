@@ -0,0 +1,31 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = [
+    "numpy",
+    "jsonschema",
+    "geojson",
+    "requests",
+    "requests_toolbelt",
+    "multiprocessing",
+    "mapbox_tilesets.area",
+    "cligj",
+]
+
+
+@pytest.mark.parametrize(
+    "args", [["--help"], ["status", "--help"], ["estimate-area", "--help"]]
+)
+def test_cli_import_is_lazy(args):
+    script = (
+        "import sys\n"
+        "from mapbox_tilesets.scripts.cli import cli\n"
+        "cli.main({!r}, standalone_mode=False)\n"
+        "print([name for name in {!r} if name in sys.modules])\n"
+    ).format(args, HEAVY_MODULES)
+    proc = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    assert proc.stdout.splitlines()[-1] == "[]"
@@ -0,0 +1,87 @@
+import json
+
+import numpy as np
+import pytest
+
+from mapbox_tilesets import tiles
+
+
+def _feature(geometry):
+    return {"type": "Feature", "properties": {}, "geometry": geometry}
+
+
+def _tiles(features, zoom):
+    return sorted(map(tuple, tiles.burn(features, zoom)[:, :2].tolist()))
+
+
+def test_burn_point():
+    assert tiles.burn(
+        [_feature({"type": "Point", "coordinates": [0.1, 0.1]})], 1
+    ).tolist() == [[1, 0, 1]]
+
+
+def test_burn_polygon_with_hole():
+    outer = [[-179, 84], [179, 84], [179, -84], [-179, -84], [-179, 84]]
+    assert len(_tiles([_feature({"type": "Polygon", "coordinates": [outer]})], 3)) == 64
+
+    # the hole is only wide enough to leave out tile (2, 3)
+    hole = [[-95, 45], [-40, 45], [-40, -2], [-95, -2], [-95, 45]]
+    covered = _tiles([_feature({"type": "Polygon", "coordinates": [outer, hole]})], 3)
+    assert (2, 3) not in covered
+    assert len(covered) == 63
+
+
+def test_burn_line():
+    line = {"type": "LineString", "coordinates": [[-170, 0.1], [170, 0.1]]}
+    assert _tiles([_feature(line)], 2) == [(0, 1), (1, 1), (2, 1), (3, 1)]
+
+
+def test_burn_ignores_other_geometries():
+    assert len(tiles.burn([_feature(None), {"type": "Feature"}], 4)) == 0
+
+
+def test_union_spans():
+    rows = np.array([1, 0, 1, 1, 0])
+    first = np.array([5, 0, 1, 3, 4])
+    last = np.array([6, 2, 2, 3, 4])
+    merged = tiles.union_spans(rows, first, last)
+    assert [a.tolist() for a in merged] == [[0, 0, 1, 1], [0, 4, 1, 5], [2, 4, 3, 6]]
+
+
+def test_sample_spans():
+    with open("tests/fixtures/precision-testing.ldgeojson") as src:
+        features = json.load(src)
+    sampled = np.zeros(2**11, dtype=bool)
+    sampled[::3] = True
+    covered, bounds = tiles.sample_spans(features, 11, sampled)
+    rows, first, last = tiles.burn_spans(features, 11)
+    keep = sampled[rows]
+    assert [a.tolist() for a in covered] == [
+        rows[keep].tolist(),
+        first[keep].tolist(),
+        last[keep].tolist(),
+    ]
+    # the bounding ranges contain every covered tile
+    span, columns = tiles._expand(first, last)
+    for row, column in zip(rows[span], columns):
+        inside = (bounds[0] == row) & (bounds[1] <= column) & (bounds[2] >= column)
+        assert inside.any()
+
+
+def test_sample_spans_point_bounds():
+    point = _feature({"type": "MultiPoint", "coordinates": [[0.1, 0.1], [-90, 0.1]]})
+    sampled = np.zeros(4, dtype=bool)
+    covered, bounds = tiles.sample_spans([point], 2, sampled)
+    assert len(covered[0]) == 0
+    assert [a.tolist() for a in bounds] == [[1], [1], [2]]
+
+
+@pytest.mark.parametrize("zoom", [6, 11, 14])
+def test_burn_matches_supermercado(zoom):
+    burntiles = pytest.importorskip("supermercado.burntiles")
+    super_utils = pytest.importorskip("supermercado.super_utils")
+
+    with open("tests/fixtures/precision-testing.ldgeojson") as src:
+        features = list(super_utils.filter_features(json.load(src)))
+    expected = sorted(map(tuple, burntiles.burn(features, zoom)[:, :2].tolist()))
+    assert _tiles(features, zoom) == expected
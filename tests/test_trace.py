@@ -0,0 +1,135 @@
+import json
+import time
+
+import pytest
+from click.testing import CliRunner
+from unittest import mock
+
+from mapbox_tilesets import trace, utils
+from mapbox_tilesets.scripts.cli import cli
+
+
+@pytest.fixture
+def tracer():
+    tracer = trace.enable()
+    yield tracer
+    trace.disable()
+
+
+def test_disabled_helpers_do_nothing():
+    assert trace.enable() is not None
+    trace.disable()
+    items = [1, 2]
+    assert trace.iterate("read", items) is items
+    with trace.span("outer"), trace.stage("inner"):
+        pass
+
+
+def test_enable_twice(tracer):
+    assert trace.enable() is None
+
+
+def test_span_self_time(tracer):
+    with trace.span("outer"):
+        with trace.span("inner"):
+            time.sleep(0.02)
+
+    outer = tracer.stats["outer"]
+    inner = tracer.stats["inner"]
+    assert outer.count == inner.count == 1
+    assert outer.total >= inner.total >= 0.02
+    assert outer.self < inner.total
+
+
+def test_stage_adds_up_calls(tracer):
+    validating = trace.stage("validate")
+    for _ in range(3):
+        with validating:
+            pass
+    assert "validate" not in tracer.stats
+    validating.close()
+    validating.close()
+
+    assert tracer.stats["validate"].count == 3
+    assert len(tracer.events) == 1
+    assert tracer.events[0]["args"]["count"] == 3
+
+
+def test_iterate(tracer):
+    assert list(trace.iterate("read", range(4))) == [0, 1, 2, 3]
+    assert tracer.stats["read"].count == 4
+
+
+def test_summary_and_write(tracer, tmp_path):
+    with trace.span("upload", path="/uploads/v1"):
+        pass
+
+    lines = tracer.summary().splitlines()
+    assert lines[0].split() == [
+        "stage",
+        "count",
+        "total",
+        "s",
+        "self",
+        "s",
+        "max",
+        "ms",
+    ]
+    assert lines[1].split()[:2] == ["upload", "1"]
+
+    path = tmp_path / "trace.json"
+    tracer.write(path)
+    data = json.loads(path.read_text())
+    assert data["displayTimeUnit"] == "ms"
+    (event,) = data["traceEvents"]
+    assert event["name"] == "upload"
+    assert event["ph"] == "X"
+    assert event["args"] == {"path": "/uploads/v1"}
+
+
+@mock.patch("requests.adapters.HTTPAdapter.send")
+def test_traced_adapter(mock_send, tracer):
+    import requests
+
+    request = requests.Request(
+        "GET", "https://api.mapbox.com/tilesets/v1/test.id?access_token=secret"
+    ).prepare()
+    utils._get_adapter().send(request)
+
+    mock_send.assert_called_once()
+    (event,) = tracer.events
+    assert event["name"] == "http GET"
+    assert event["args"] == {"path": "/tilesets/v1/test.id"}
+
+
+def test_cli_profile(tmp_path):
+    path = tmp_path / "trace.json"
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        [
+            "--trace-file",
+            str(path),
+            "estimate-area",
+            "tests/fixtures/valid.ldgeojson",
+            "--precision",
+            "10m",
+        ],
+    )
+    assert result.exit_code == 0
+    assert "self s" in result.output
+    assert trace._tracer is None
+
+    names = {event["name"] for event in json.loads(path.read_text())["traceEvents"]}
+    assert {"tilesets estimate-area", "read features", "rasterize"} <= names
+
+
+def test_cli_profile_envvar():
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        ["estimate-area", "tests/fixtures/valid.ldgeojson", "--precision", "10m"],
+        env={"TILESETS_TRACE": "1"},
+    )
+    assert result.exit_code == 0
+    assert "tilesets estimate-area" in result.output
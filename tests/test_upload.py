@@ -0,0 +1,368 @@
+import json
+import threading
+
+import pytest
+from click import ClickException
+
+from mapbox_tilesets import upload
+from mapbox_tilesets.errors import TilesetsError
+
+
+def test_iter_blocks():
+    chunks = [b"ab", b"cd", b"e", b"fgh", b"i"]
+    assert list(upload.iter_blocks(chunks, block_size=3)) == [b"abcd", b"efgh", b"i"]
+
+
+def test_pipelined():
+    assert list(upload.pipelined(iter(range(100)), maxsize=2)) == list(range(100))
+
+
+def test_pipelined_backpressure():
+    produced = []
+    release = threading.Event()
+
+    def items():
+        for i in range(10):
+            produced.append(i)
+            yield i
+
+    pipe = upload.pipelined(items(), maxsize=2)
+    assert next(pipe) == 0
+    release.wait(0.3)
+    # one item handed over, two queued and one waiting to be queued
+    assert len(produced) <= 4
+    pipe.close()
+
+
+def test_pipelined_reraises():
+    def items():
+        yield 1
+        raise ValueError("boom")
+
+    pipe = upload.pipelined(items())
+    assert next(pipe) == 1
+    with pytest.raises(ValueError, match="boom"):
+        next(pipe)
+
+
+def test_multipart_body():
+    body = b"".join(upload.multipart_body([b"a", b"b"], "xyz"))
+    assert body == (
+        b"--xyz\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="file"\r\n\r\n'
+        b"ab\r\n--xyz--\r\n"
+    )
+
+
+def test_iter_compressed_gzip():
+    import gzip
+
+    chunks = [b"abc" * 1000, b"def" * 1000]
+    raw = []
+    compressed = b"".join(upload.iter_compressed(chunks, "gzip", raw.append))
+    assert gzip.decompress(compressed) == b"".join(chunks)
+    assert raw == [3000, 3000]
+
+
+def test_iter_compressed_zstd():
+    zstandard = pytest.importorskip("zstandard")
+
+    chunks = [b"abc" * 1000, b"def" * 1000]
+    compressed = b"".join(upload.iter_compressed(chunks, "zstd"))
+    decompressed = zstandard.ZstdDecompressor().decompressobj().decompress(compressed)
+    assert decompressed == b"".join(chunks)
+
+
+def test_iter_upload_blocks_compressed():
+    import gzip
+
+    lines = [b"%d\n" % i for i in range(1000)]
+    blocks = upload.iter_upload_blocks(iter(lines), "gzip")
+    assert gzip.decompress(b"".join(blocks)) == b"".join(lines)
+
+
+class _Response:
+    def __init__(self, status_code, text="", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+
+class _Session:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _send(self, method, url, data, headers):
+        body = data.to_string() if hasattr(data, "to_string") else data.read()
+        with self.lock:
+            self.calls.append((method, body))
+            status = self.statuses.pop(0) if self.statuses else 200
+        if isinstance(status, Exception):
+            raise status
+        status, headers = status if isinstance(status, tuple) else (status, None)
+        return _Response(status, f"status {status}", headers)
+
+    def post(self, url, data, headers):
+        return self._send("post", url, data, headers)
+
+    def put(self, url, data, headers):
+        return self._send("put", url, data, headers)
+
+
+def test_iter_parts():
+    lines = [b"%03d\n" % i for i in range(10)]
+    parts = [part.read() for part in upload.iter_parts(lines, 9)]
+    assert parts == [
+        b"000\n001\n002\n",
+        b"003\n004\n005\n",
+        b"006\n007\n008\n",
+        b"009\n",
+    ]
+
+
+def test_iter_parts_empty():
+    assert [part.read() for part in upload.iter_parts([], 9)] == [b""]
+
+
+def test_iter_parts_compressed():
+    import gzip
+
+    lines = [b"%03d\n" % i for i in range(10)]
+    parts = [
+        gzip.decompress(part.read()) for part in upload.iter_parts(lines, 20, "gzip")
+    ]
+    assert parts == [b"".join(lines[:5]), b"".join(lines[5:])]
+
+
+def test_send_part_retries(monkeypatch):
+    monkeypatch.setattr(upload.time, "sleep", lambda seconds: None)
+    session = _Session([(503, {"Retry-After": "1"}), 429, 200])
+    part = upload.iter_parts([b"abc\n"], 10).__next__()
+    resp = upload.send_part(session, "post", "https://example.com", part)
+    assert resp.status_code == 200
+    assert len(session.calls) == 3
+    assert all(b"abc\n" in body for method, body in session.calls)
+
+
+@pytest.mark.parametrize("method, status", [("post", 429), ("put", 500)])
+def test_send_part_gives_up(monkeypatch, method, status):
+    monkeypatch.setattr(upload.time, "sleep", lambda seconds: None)
+    session = _Session([status] * 10)
+    part = upload.iter_parts([b"abc\n"], 10).__next__()
+    resp = upload.send_part(session, method, "https://example.com", part, retries=2)
+    assert resp.status_code == status
+    assert len(session.calls) == 3
+
+
+@pytest.mark.parametrize("status", [500, 502, 503, 504])
+def test_send_part_does_not_retry_append(monkeypatch, status):
+    monkeypatch.setattr(upload.time, "sleep", lambda seconds: None)
+    session = _Session([status, 200])
+    part = upload.iter_parts([b"abc\n"], 10).__next__()
+    resp = upload.send_part(session, "post", "https://example.com", part)
+    assert resp.status_code == status
+    assert len(session.calls) == 1
+
+
+def test_send_part_progress_counts_retried_bytes_once(monkeypatch):
+    monkeypatch.setattr(upload.time, "sleep", lambda seconds: None)
+    session = _Session([(503, {"Retry-After": "1"}), 429, 200])
+    part = upload.iter_parts([b"abc\n"], 10).__next__()
+    progress = []
+    resp = upload.send_part(
+        session, "post", "https://example.com", part, on_progress=progress.append
+    )
+    assert resp.status_code == 200
+    # the bar counts the bytes of the part, not of the multipart body
+    assert sum(progress) == 4
+    assert min(progress) < 0
+
+
+def test_send_part_retries_connection_not_made(monkeypatch):
+    import requests
+    from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+    monkeypatch.setattr(upload.time, "sleep", lambda seconds: None)
+    refused = requests.ConnectionError(
+        MaxRetryError(None, "/", NewConnectionError(None, "refused"))
+    )
+    session = _Session([refused, requests.ConnectTimeout(), 200])
+    part = upload.iter_parts([b"abc\n"], 10).__next__()
+    resp = upload.send_part(session, "post", "https://example.com", part)
+    assert resp.status_code == 200
+    assert len(session.calls) == 3
+
+
+@pytest.mark.parametrize(
+    "error",
+    ["ConnectionError", "ReadTimeout"],
+)
+def test_send_part_does_not_resend(monkeypatch, error):
+    import requests
+
+    monkeypatch.setattr(upload.time, "sleep", lambda seconds: None)
+    session = _Session([getattr(requests, error)("lost"), 200])
+    part = upload.iter_parts([b"abc\n"], 10).__next__()
+    with pytest.raises(getattr(requests, error)):
+        upload.send_part(session, "post", "https://example.com", part)
+    assert len(session.calls) == 1
+
+
+def test_upload_parts_replace_sends_first_part_first():
+    session = _Session([])
+    lines = [b"%03d\n" % i for i in range(10)]
+    parts = enumerate(upload.iter_parts(lines, 4))
+    resp = upload.upload_parts(session, "put", "https://example.com", parts, 3)
+    assert resp.status_code == 200
+    assert [method for method, body in session.calls] == ["put"] + ["post"] * 9
+    assert b"000\n" in session.calls[0][1]
+    assert (
+        sorted(body.split(b"\r\n\r\n")[1][:4] for method, body in session.calls)
+        == lines
+    )
+
+
+def test_upload_parts_failure():
+    session = _Session([400])
+    parts = enumerate(upload.iter_parts([b"abc\n"], 10))
+    with pytest.raises(TilesetsError, match="Part 0 failed: status 400"):
+        upload.upload_parts(session, "post", "https://example.com", parts, 2)
+
+
+def test_upload_manifest_round_trip(tmp_path):
+    manifest = upload.UploadManifest.open(str(tmp_path), "key")
+    assert manifest.add_part(0, 3, 0, 30) == 0
+    assert manifest.add_part(3, 5, 30, 20) == 1
+    manifest.complete(0)
+
+    reopened = upload.UploadManifest.open(str(tmp_path), "key", resume=True)
+    assert reopened.parts == manifest.parts
+    assert reopened.completed == 1
+    assert upload.UploadManifest.open(str(tmp_path), "key").parts == []
+
+    reopened.remove()
+    assert not (tmp_path / "uploads" / "key.json").exists()
+
+
+def test_iter_resumable_parts(tmp_path):
+    features = [{"id": i} for i in range(10)]
+    manifest = upload.UploadManifest.open(str(tmp_path), "key")
+    parts = list(upload.iter_resumable_parts(features, manifest, 20, validate=False))
+    contents = [part.read() for index, part in parts]
+    assert [index for index, part in parts] == [0, 1, 2, 3]
+    manifest.complete(0)
+    manifest.complete(2)
+
+    manifest = upload.UploadManifest.open(str(tmp_path), "key", resume=True)
+    parts = list(upload.iter_resumable_parts(features, manifest, 20, validate=False))
+    assert [(index, part.read()) for index, part in parts] == [
+        (1, contents[1]),
+        (3, contents[3]),
+    ]
+    assert len(manifest.parts) == 4
+
+
+def test_mapped_lines(tmp_path):
+    first = tmp_path / "first.ldgeojson"
+    first.write_bytes(b"a\nbb")
+    empty = tmp_path / "empty.ldgeojson"
+    empty.write_bytes(b"")
+    second = tmp_path / "second.ldgeojson"
+    second.write_bytes(b"ccc\n")
+
+    with upload.MappedLines([str(first), str(empty), str(second)]) as mapped:
+        assert len(mapped) == 9
+        assert mapped.line_end(0) == 2
+        assert mapped.line_end(2) == 5
+        assert mapped.line_end(5) == 9
+        assert mapped.read(3) == b"a\nb"
+        assert len(mapped) == 6
+        assert mapped.read() == b"b\nccc\n"
+
+        window = mapped.window(2, 7)
+        assert window.read() == b"bb\ncc"
+        assert window.seek(1) == 1
+        assert b"".join(window.iter_blocks(block_size=2)) == b"b\ncc"
+
+
+def test_iter_mapped_parts(tmp_path):
+    import gzip
+
+    path = tmp_path / "lines.ldgeojson"
+    path.write_bytes(b"".join(b"%03d\n" % i for i in range(10)))
+
+    with upload.MappedLines([str(path)]) as mapped:
+        manifest = upload.UploadManifest.open(str(tmp_path), "key")
+        parts = list(upload.iter_mapped_parts(mapped, manifest, 10))
+        contents = [part.read() for index, part in parts]
+        assert contents == [
+            b"000\n001\n002\n",
+            b"003\n004\n005\n",
+            b"006\n007\n008\n",
+            b"009\n",
+        ]
+        assert [part["start"] for part in manifest.parts] == [None] * 4
+        manifest.complete(0)
+        manifest.complete(2)
+
+        manifest = upload.UploadManifest.open(str(tmp_path), "key", resume=True)
+        parts = list(upload.iter_mapped_parts(mapped, manifest, 10, "gzip"))
+        assert [(index, gzip.decompress(part.read())) for index, part in parts] == [
+            (1, contents[1]),
+            (3, contents[3]),
+        ]
+
+
+def test_iter_mapped_parts_validate(tmp_path, monkeypatch):
+    feature = {
+        "type": "Feature",
+        "properties": {},
+        "geometry": {"type": "Point", "coordinates": [1, 2]},
+    }
+    line = json.dumps(feature, separators=(",", ":")).encode() + b"\n"
+    path = tmp_path / "lines.ldgeojson"
+    path.write_bytes(line * 6)
+
+    with upload.MappedLines([str(path)]) as mapped:
+        manifest = upload.UploadManifest.open(str(tmp_path), "key")
+        parts = list(
+            upload.iter_mapped_parts(mapped, manifest, 2 * len(line), validate=True)
+        )
+        assert [part.read() for index, part in parts] == [line * 2] * 3
+        assert [(part["start"], part["end"]) for part in manifest.parts] == [
+            (0, 2),
+            (2, 4),
+            (4, 6),
+        ]
+        manifest.complete(0)
+        manifest.complete(2)
+
+        # acknowledged parts are skipped without being read, and features
+        # are validated with their index in the whole input
+        indices = []
+        monkeypatch.setattr(
+            upload.utils,
+            "validate_geojson",
+            lambda index, feature, *args, **kwargs: indices.append(index),
+        )
+        manifest = upload.UploadManifest.open(str(tmp_path), "key", resume=True)
+        parts = list(
+            upload.iter_mapped_parts(mapped, manifest, 2 * len(line), validate=True)
+        )
+        assert [index for index, part in parts] == [1]
+        assert indices == [2, 3]
+
+
+def test_iter_mapped_parts_invalid_feature(tmp_path):
+    path = tmp_path / "lines.ldgeojson"
+    path.write_bytes(
+        b'{"type":"Feature","properties":{},"geometry":{"type":"Point","coordinates":[1,2]}}\n'
+        b'{"type":"Feature"}\n'
+    )
+
+    with upload.MappedLines([str(path)]) as mapped:
+        manifest = upload.UploadManifest.open(str(tmp_path), "key")
+        with pytest.raises(ClickException, match="geometry"):
+            list(upload.iter_mapped_parts(mapped, manifest, 10, validate=True))
@@ -1,16 +1,24 @@
+import json
 import os
+
 import pytest
-import json
+from click import ClickException
+
+from mapbox_tilesets.errors import TilesetsError
 from mapbox_tilesets.utils import (
+    _convert_precision_to_zoom,
+    _get_adapter,
     _get_api,
     _get_session,
     _get_token,
+    _get_validator,
+    calculate_tiles_area,
+    fast_geojson_validate,
     geojson_validate,
+    validate_geojson,
+    validate_geojson_files,
     validate_tileset_id,
-    _convert_precision_to_zoom,
-    calculate_tiles_area,
 )
-from mapbox_tilesets.errors import TilesetsError
 
 
 def test_get_api():
@@ -114,6 +122,185 @@ def test_geojson_validate_closed_ring_incorrect_winding_order():
     assert geojson_validate(2, geometry) is None
 
 
+@pytest.mark.parametrize(
+    "geometry",
+    [
+        {"type": "Point", "coordinates": [1, 2]},
+        {"type": "Point", "coordinates": [1, 2, 3, 4]},
+        {"type": "Point", "coordinates": [[1, 2], [3, 4]]},
+        {"type": "MultiPoint", "coordinates": [[1, 2], [3]]},
+        {"type": "LineString", "coordinates": [[1, 2]]},
+        {"type": "LineString", "coordinates": [[1, 2], [3, 4]]},
+        {"type": "MultiLineString", "coordinates": [[[1, 2]], [[3, 4]]]},
+        {"type": "Polygon", "coordinates": [[[1, 2], [3, 4], [5, 6]]]},
+        {"type": "Polygon", "coordinates": [[[1, 2], [3, 4], [5, 6], [7, 8]]]},
+        {"type": "Polygon", "coordinates": [[[1, 2], [3, 4], [5, 6], [1, 2]]]},
+        {"type": "Polygon", "coordinates": [[1, 2]]},
+        {
+            "type": "Polygon",
+            "coordinates": [[[1, 2], [3, 4], [5, 6], [1.0000001, 2.0000001]]],
+        },
+        {
+            "type": "MultiPolygon",
+            "coordinates": [
+                [[[1, 2], [3, 4], [5, 6]]],
+                [[[1, 2], [3, 4], [5, 6], [7, 8]]],
+            ],
+        },
+    ],
+)
+def test_fast_geojson_validate_matches_geojson(geometry):
+    try:
+        geojson_validate(2, geometry)
+        expected = None
+    except TilesetsError as e:
+        expected = str(e)
+
+    try:
+        fast_geojson_validate(2, geometry)
+        actual = None
+    except TilesetsError as e:
+        actual = str(e)
+
+    assert actual == expected
+
+
+def test_fast_geojson_validate_polygon_position_arity():
+    feature = {
+        "type": "Feature",
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [[[1, 2], [3, 4], [5], [1, 2]]],
+        },
+        "properties": {},
+    }
+    with pytest.raises(TilesetsError) as excinfo:
+        fast_geojson_validate(7, feature)
+
+    assert (
+        str(excinfo.value)
+        == "Error in feature number 7: a position must have exactly 2 or 3 values"
+    )
+
+
+@pytest.mark.parametrize(
+    "geometry",
+    [
+        {"type": "Point", "coordinates": [float("nan"), 1]},
+        {"type": "LineString", "coordinates": [[0, 0], [float("inf"), 1]]},
+        {
+            "type": "Polygon",
+            "coordinates": [[[0, 0], [1, 0], [float("-inf"), 1], [0, 0]]],
+        },
+    ],
+)
+@pytest.mark.parametrize("strict", [False, True])
+def test_validate_geojson_rejects_non_finite_coordinates(geometry, strict):
+    feature = {"type": "Feature", "geometry": geometry, "properties": {}}
+    with pytest.raises((TilesetsError, ValueError), match="is not JSON compliant"):
+        validate_geojson(3, feature, strict=strict)
+
+
+def test_fast_geojson_validate_flat_ring():
+    feature = {
+        "type": "Feature",
+        "geometry": {"type": "Polygon", "coordinates": [[0, 0, 1, 0, 1, 1, 0, 0]]},
+        "properties": {},
+    }
+    with pytest.raises(TilesetsError) as excinfo:
+        fast_geojson_validate(7, feature)
+
+    assert (
+        str(excinfo.value)
+        == "Error in feature number 7: Each linear ring must be a list of positions"
+    )
+
+
+def test_fast_geojson_validate_unknown_type():
+    feature = {
+        "type": "Feature",
+        "geometry": {"type": "Circle", "coordinates": [1, 2]},
+        "properties": {},
+    }
+    with pytest.raises(TilesetsError) as excinfo:
+        fast_geojson_validate(0, feature)
+
+    assert (
+        str(excinfo.value)
+        == "Error in feature number 0: 'Circle' is not a valid geometry type"
+    )
+
+
+@pytest.mark.parametrize("strict", [False, True])
+def test_validate_geojson_schema_error_strict(strict):
+    feature = {"type": "Feature", "geometry": {"type": "Point"}, "properties": {}}
+    with pytest.raises(ClickException) as excinfo:
+        validate_geojson(0, feature, strict=strict)
+
+    assert "'coordinates' is a required property" in str(excinfo.value)
+
+
+def write_features(path, count, invalid=None):
+    with open(path, "w") as dst:
+        for i in range(count):
+            ring = [[i, 0], [i + 1, 0], [i + 1, 1], [i, 0]]
+            if i == invalid:
+                ring = ring[:-1]
+            feature = {
+                "type": "Feature",
+                "geometry": {"type": "Polygon", "coordinates": [ring]},
+                "properties": {"id": i},
+            }
+            dst.write(json.dumps(feature) + "\n")
+            if i % 10 == 0:
+                dst.write("\n")
+
+
+def test_validate_geojson_files(tmp_path):
+    paths = [str(tmp_path / "a.ldgeojson"), str(tmp_path / "b.ldgeojson")]
+    write_features(paths[0], 50)
+    write_features(paths[1], 30)
+    assert validate_geojson_files(paths, 2, chunk_size=256) == 80
+
+
+def test_validate_geojson_files_reports_global_index(tmp_path):
+    paths = [str(tmp_path / "a.ldgeojson"), str(tmp_path / "b.ldgeojson")]
+    write_features(paths[0], 50)
+    write_features(paths[1], 30, invalid=17)
+    with pytest.raises(TilesetsError) as excinfo:
+        validate_geojson_files(paths, 3, chunk_size=200)
+
+    assert (
+        str(excinfo.value)
+        == "Error in feature number 67: Each linear ring must contain at least 4 positions"
+    )
+
+
+def test_validate_geojson_files_not_line_delimited():
+    assert (
+        validate_geojson_files(["tests/fixtures/invalid-polygon.ldgeojson"], 2) is None
+    )
+
+
+def test_get_validator_is_compiled_once():
+    assert _get_validator("feature") is _get_validator("feature")
+    assert _get_validator("delete") is not _get_validator("feature")
+
+
+def test_validate_geojson_schema_error():
+    feature = {"type": "Feature", "geometry": {"type": "Point", "coordinates": [1, 2]}}
+    with pytest.raises(ClickException) as excinfo:
+        validate_geojson(0, feature)
+
+    assert "'properties' is a required property" in str(excinfo.value)
+
+
+def test_validate_geojson_allow_delete():
+    assert validate_geojson(0, {"id": 1, "delete": True}, allow_delete=True) is None
+    with pytest.raises(ClickException):
+        validate_geojson(0, {"id": 1, "delete": True})
+
+
 def test_convert_precision_to_zoom_10m():
     precision = "10m"
     assert _convert_precision_to_zoom(precision) == 6
@@ -165,3 +352,86 @@ def test_calculate_tiles_area_with_1cm_precision():
     features = json.load(f)
     area = round(calculate_tiles_area(features, "1cm"))
     assert area == 2
+
+
+def test_get_session_shared(monkeypatch):
+    monkeypatch.delenv("TILESETS_POOL_SIZE", raising=False)
+    monkeypatch.delenv("TILESETS_MAX_RETRIES", raising=False)
+    s = _get_session()
+    assert _get_session() is s
+
+    adapter = s.get_adapter("https://api.mapbox.com")
+    assert adapter._pool_maxsize == 10
+    assert adapter.max_retries.total == 3
+    assert adapter.max_retries.respect_retry_after_header
+    assert 429 in adapter.max_retries.status_forcelist
+    assert "POST" not in adapter.max_retries.allowed_methods
+
+
+def test_get_session_environment(monkeypatch):
+    monkeypatch.setenv("TILESETS_POOL_SIZE", "32")
+    monkeypatch.setenv("TILESETS_MAX_RETRIES", "5")
+    monkeypatch.setenv("TILESETS_BACKOFF_FACTOR", "2")
+    adapter = _get_session().get_adapter("https://api.mapbox.com")
+    assert adapter._pool_maxsize == 32
+    assert adapter.max_retries.total == 5
+    assert adapter.max_retries.backoff_factor == 2
+
+
+def test_get_session_invalid_environment(monkeypatch):
+    monkeypatch.setenv("TILESETS_MAX_RETRIES", "many")
+    with pytest.raises(TilesetsError) as excinfo:
+        _get_session()
+
+    assert (
+        str(excinfo.value)
+        == "TILESETS_MAX_RETRIES must be a non-negative number, got 'many'"
+    )
+
+
+def test_get_adapter_backoff_jitter(monkeypatch):
+    monkeypatch.setenv("TILESETS_BACKOFF_FACTOR", "1")
+    retry = _get_adapter(64).max_retries
+    for attempt in range(3):
+        retry = retry.increment(method="GET", url="/")
+    assert all(0 <= retry.get_backoff_time() <= 4 for i in range(20))
+    assert _get_adapter(64)._pool_maxsize == 64
+
+
+def test_pool_size_restores_adapters():
+    from requests import Session
+
+    from mapbox_tilesets.utils import _mount_adapter, _pool_size
+
+    s = Session()
+    _mount_adapter(s, _get_adapter())
+    original = s.get_adapter("https://api.mapbox.com")
+    with _pool_size(s, 64):
+        assert s.get_adapter("https://api.mapbox.com")._pool_maxsize == 64
+    assert s.get_adapter("https://api.mapbox.com") is original
+    assert s.get_adapter("http://example.com") is original
+
+
+def test_iter_concurrent():
+    from mapbox_tilesets.utils import _iter_concurrent
+
+    results = _iter_concurrent(lambda x: x * x, iter(range(100)), 4)
+    assert sorted(results) == [x * x for x in range(100)]
+
+
+def test_request_with_backoff(monkeypatch):
+    from unittest import mock
+
+    from mapbox_tilesets.utils import _request_with_backoff
+
+    sleeps = []
+    monkeypatch.setattr("mapbox_tilesets.utils.time.sleep", sleeps.append)
+    response = mock.Mock(status_code=429, headers={})
+    s = mock.Mock()
+    s.post.return_value = response
+    assert _request_with_backoff(s, "post", "https://example.com", retries=2) is (
+        response
+    )
+    assert s.post.call_count == 3
+    assert len(sleeps) == 2
+    assert all(0 <= delay <= 1.0 for delay in sleeps)